@@ -0,0 +1,320 @@
+import math
+import random
+import time
+
+
+def make_class_model(n, seed=0):
+    """Synthetisch klassenmodel: overervingsbomen plus compositie-, aggregatie- en associatierelaties."""
+    rng = random.Random(seed)
+    classes = []
+    for i in range(n):
+        relationships = []
+        if i and rng.random() < 0.6:
+            relationships.append({"type": "inheritance", "target": f"Class{rng.randrange(i)}"})
+        for _ in range(rng.randint(0, 2)):
+            relationships.append({"type": rng.choice(["composition", "aggregation", "association"]),
+                                  "target": f"Class{rng.randrange(n)}",
+                                  "source_multiplicity": "1", "target_multiplicity": "*"})
+        classes.append({
+            "name": f"Class{i}",
+            "attributes": [{"name": f"attr{a}", "type": "int", "access": "private"}
+                           for a in range(rng.randint(1, 5))],
+            "methods": [{"name": f"method{m}", "parameters": ["int x"], "return_type": "void", "access": "public"}
+                        for m in range(rng.randint(0, 4))],
+            "relationships": relationships,
+        })
+    return classes
+
+
+def make_table_model(n, seed=0):
+    """Synthetisch tables.json-model: elke tabel heeft een PK, een paar kolommen en 0-2 FK's."""
+    rng = random.Random(seed)
+    tables = []
+    for i in range(n):
+        fields = [{"type": "PK", "name": f"ID{i}", "datatype": "INT", "not_null": True, "unique": True}]
+        fields += [{"type": "", "name": f"col{c}", "datatype": "VARCHAR(50)"} for c in range(rng.randint(1, 8))]
+        for r in range(rng.randint(0, 2) if i else 0):
+            target = rng.randrange(i)
+            fields.append({"type": "FK", "name": f"ref{r}", "datatype": "INT",
+                           "references": {"table": f"Table{target}", "field": f"ID{target}"}})
+        tables.append({"title": f"Table{i}", "fields": fields})
+    return tables
+
+
+def make_obstacle_layout(n, seed=0):
+    """
+    Synthetische layout van n blokken in rijen met smalle, wisselende tussenruimtes. Elke relatie
+    slaat 1-3 blokken over, dus er staan altijd blokken tussen de verwante paren en de standaardkanalen
+    (50 px links van en boven een blok) vallen vaak in een buurblok: de router moet omleggen.
+    """
+    rng = random.Random(seed)
+    per_row = max(3, int(math.sqrt(n)))
+    boxes, y = {}, 0
+    for row in range(math.ceil(n / per_row)):
+        x, row_height = 0, 0
+        for i in range(row * per_row, min(n, (row + 1) * per_row)):
+            w, h = rng.randint(100, 300), rng.randint(80, 240)
+            boxes[f"Block{i}"] = (x, y, w, h)
+            x += w + rng.randint(20, 140)
+            row_height = max(row_height, h)
+        y += row_height + rng.randint(40, 140)
+    edges = [(f"Block{i}", f"Block{i + skip}") for i in range(n) for skip in [rng.randint(2, 4)] if i + skip < n]
+    return boxes, edges
+
+
+def make_usecase_model(n, seed=0):
+    """Synthetisch use-case model: ~n/20 actoren, 1-3 actoren per use case en include/extend-ketens."""
+    rng = random.Random(seed)
+    actors = [{"id": f"A{i}", "name": f"Actor{i}"} for i in range(max(1, n // 20))]
+    use_cases, relations = [], []
+    for i in range(n):
+        use_case = {"id": f"UC{i}", "name": f"Use case {i}"}
+        if i and rng.random() < 0.2:
+            use_case[rng.choice(["includes", "extends"])] = [f"UC{rng.randrange(i)}"]
+        use_cases.append(use_case)
+        for actor in rng.sample(actors, min(len(actors), rng.randint(1, 3))):
+            relations.append({"actor_id": actor["id"], "use_case_id": use_case["id"]})
+    return {"system": "Benchmark", "actors": actors, "use_cases": use_cases, "relations": relations}
+
+
+def make_story_projects(root, projects, stories_per_project, seed=0):
+    """Schrijft synthetische projectmappen met userstories.json, naratives.json en usecasediagram.json."""
+    import json
+    import os
+
+    rng = random.Random(seed)
+    actors = ["student", "docent", "beheerder", "ouder", "mentor"]
+    verbs = ["bekijken", "invoeren", "wijzigen", "verwijderen", "exporteren", "goedkeuren"]
+    subjects = ["cijfers", "rooster", "profiel", "wachtwoord", "aanwezigheid", "opdrachten", "berichten", "rapport"]
+    for p in range(projects):
+        folder = os.path.join(root, f"project{p}")
+        os.makedirs(folder, exist_ok=True)
+        names = [f"{s.capitalize()} {v}" for s in subjects for v in verbs]
+        use_cases = [{"id": f"UC{i + 1}", "name": name} for i, name in enumerate(names[:12])]
+        stories = []
+        for i in range(stories_per_project):
+            subject, verb, actor = rng.choice(subjects), rng.choice(verbs), rng.choice(actors)
+            stories.append({"id": f"US{i + 1}", "title": f"{subject.capitalize()} {verb} {actor}",
+                            "user_story": {"as_a": actor, "i_want": f"{subject} {verb}",
+                                           "so_that": f"ik mijn {rng.choice(subjects)} op orde heb"},
+                            "description": f"De {actor} moet {subject} kunnen {verb} via het portaal.",
+                            "acceptance_criteria": [f"Criterium {c} voor {subject}" for c in range(3)]})
+        narratives = [{"id": f"N{i + 1}", "title": name, "actor": " / ".join(rng.sample(actors, 2)),
+                       "goal": name, "story": f"De gebruiker wil {name.lower()}.", "result": "Gelukt."}
+                      for i, name in enumerate(names[:20])]
+        for name, data in (("userstories.json", stories), ("naratives.json", {"narratives": narratives}),
+                           ("usecasediagram.json", {"system": f"Project {p}", "actors": [],
+                                                    "use_cases": use_cases, "relations": []})):
+            with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+                json.dump(data, f)
+
+
+def _report(title, sizes, timings, unit):
+    print(f"\n{title}")
+    base = None
+    for size, seconds in zip(sizes, timings):
+        per_item = seconds / size * 1e6
+        base = base or per_item
+        print(f"  {size:>7} {unit}: {seconds * 1000:9.1f} ms  ({per_item:6.1f} µs/{unit}, x{per_item / base:.2f})")
+
+
+def bench_class_diagram(sizes=(1000, 2000, 5000)):
+    """Tijd per klasse hoort nagenoeg constant te blijven bij groeiende modellen (lineaire schaling)."""
+    from classdiagramtest import DrawioClassDiagramGenerator
+
+    timings = []
+    for size in sizes:
+        model = make_class_model(size)
+        start = time.perf_counter()
+        DrawioClassDiagramGenerator().run(model)
+        timings.append(time.perf_counter() - start)
+    _report("DrawioClassDiagramGenerator.run", sizes, timings, "klassen")
+    return timings
+
+
+def bench_edge_routing(sizes=(1000, 2000, 5000)):
+    """
+    Routing van FK- en klasserelaties; het aantal spatial queries per relatie hoort constant te blijven.
+    In de obstakel-layout moeten routes omgelegd worden en mag geen vrij gerouteerde lijn een blok kruisen.
+    """
+    from compiler import DrawioERDGenerator
+    from classdiagramtest import DrawioClassDiagramGenerator
+
+    passed = True
+    for title, make_stats in (("ERD (FK-relaties)", _erd_routing_stats), ("Klassendiagram", _class_routing_stats),
+                              ("Obstakels tussen verwante blokken", _obstacle_routing_stats)):
+        results = [make_stats(size, DrawioERDGenerator, DrawioClassDiagramGenerator) for size in sizes]
+        _report(f"OrthogonalRouter: {title}", [r["edges"] for r in results], [r["seconds"] for r in results],
+                "relaties")
+        for size, r in zip(sizes, results):
+            print(f"  {size:>7} blokken: {r['queries_per_edge']:.2f} queries/relatie (max {r['max_queries_per_edge']}), "
+                  f"{r['rerouted']} omgelegd, {r['blocked']} niet vrij te routeren")
+            if "crossings" not in r:
+                continue
+            if not r["rerouted"]:
+                print(f"❌ {size} blokken: geen enkele route omgelegd, de obstakel-layout test niets")
+                passed = False
+            if r["crossings"]:
+                print(f"❌ {size} blokken: {r['crossings']} omgelegde segment(en) kruisen een blok")
+                passed = False
+    if passed:
+        print("✅ Omgelegde routes kruisen geen blokken")
+    return passed
+
+
+def _erd_routing_stats(size, erd_generator, _):
+    generator = erd_generator(json_file=None, validate=False)
+    generator.tables_input = make_table_model(size)
+    generator.make_multiple_tables_drawio()
+    return generator.routing_stats
+
+
+def _class_routing_stats(size, _, class_generator):
+    generator = class_generator()
+    generator.run(make_class_model(size))
+    return generator.routing_stats
+
+
+def _obstacle_routing_stats(size, _, __):
+    """Routeert de obstakel-layout zoals het ERD dat doet en telt segmenten die een blok kruisen."""
+    from edgerouter import OrthogonalRouter, SpatialGrid
+
+    boxes, edges = make_obstacle_layout(size)
+    router = OrthogonalRouter(boxes, clearance=10)
+    # Controle-index zonder marge: alleen echte overlap met een blok telt als kruising
+    check = SpatialGrid.from_boxes(boxes)
+    crossings = 0
+    for source, target in edges:
+        sx, sy, _, sh = boxes[source]
+        tx, ty, _, _ = boxes[target]
+        start, end = (sx, sy + sh / 2), (tx, ty + 20)
+        blocked = router.blocked
+        points = router.route(start, end, sx - 50, tx - 50, None if sx == tx else sy - 50,
+                              source=source, target=target)
+        if router.blocked > blocked:
+            continue
+        path = [start] + points + [end]
+        for i in range(len(path) - 1):
+            ignore = (source,) if i == 0 else (target,) if i == len(path) - 2 else ()
+            crossings += bool(check.query(*path[i], *path[i + 1], ignore))
+    return dict(router.metrics(), crossings=crossings)
+
+
+def bench_usecase_layout(sizes=(1000, 2000, 5000)):
+    """Layout met barycenter-iteraties; rapporteert ook hoeveel actor-kruisingen er overblijven."""
+    from usecasegenerator import DrawioUseCaseDiagramGenerator
+
+    timings, stats = [], []
+    for size in sizes:
+        model = make_usecase_model(size)
+        generator = DrawioUseCaseDiagramGenerator()
+        start = time.perf_counter()
+        generator.run(model)
+        timings.append(time.perf_counter() - start)
+        stats.append(generator.layout_stats)
+    _report("DrawioUseCaseDiagramGenerator.run", sizes, timings, "use cases")
+    for size, s in zip(sizes, stats):
+        print(f"  {size:>7} use cases: {s['initial_crossings']} -> {s['crossings']} kruisingen "
+              f"({s['groups']} groepen, {s['relations']} actor-relaties)")
+    return timings
+
+
+def bench_traceability(projects=200, stories_per_project=100):
+    """Koude opbouw, warme start vanaf de index op schijf, één gewijzigd bestand en querylatency."""
+    import os
+    import tempfile
+    from traceability import TraceabilityIndex
+
+    with tempfile.TemporaryDirectory() as root:
+        make_story_projects(root, projects, stories_per_project)
+        timings = {}
+        start = time.perf_counter()
+        TraceabilityIndex(data_root=root).run()
+        timings["koud (alles indexeren + genereren)"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = TraceabilityIndex(data_root=root)
+        index.scan()
+        index.generate()
+        timings["warm (niets gewijzigd)"] = time.perf_counter() - start
+
+        changed = os.path.join(root, "project7", "userstories.json")
+        with open(changed, "a", encoding="utf-8") as f:
+            f.write("\n")
+        start = time.perf_counter()
+        index = TraceabilityIndex(data_root=root)
+        index.scan()
+        written = index.generate()
+        timings[f"incrementeel ({len(written)} model opnieuw)"] = time.perf_counter() - start
+
+        queries = [lambda: index.for_actor("docent"), lambda: index.trace("UC3", project="project7"),
+                   lambda: index.search("rooster", "exporteren")]
+        start = time.perf_counter()
+        for _ in range(100):
+            for query in queries:
+                query()
+        timings["query (gemiddeld)"] = (time.perf_counter() - start) / (100 * len(queries))
+
+    print(f"\nTraceabilityIndex: {projects * stories_per_project} stories in {projects} projecten")
+    for title, seconds in timings.items():
+        print(f"  {title:<36} {seconds * 1000:9.2f} ms")
+    return timings
+
+
+CLI_MODULES = ("createsql", "compiler", "createcrudtestscripts", "sqlimporter", "classdiagramtest", "classextractor",
+               "usecasegenerator", "usecasebatch", "traceability", "schemacache", "schemavalidator", "benchmarks")
+
+
+def bench_cli_startup(runs=15, budget_ms=50):
+    """
+    Koude start van main.py (`--help`) in een nieuw proces; de mediaan moet onder `budget_ms`
+    blijven en bij het opstarten mag geen generator-module geïmporteerd worden.
+    """
+    import os
+    import statistics
+    import subprocess
+    import sys
+
+    main_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, main_file, "--help"], check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    baseline = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        baseline.append((time.perf_counter() - start) * 1000)
+
+    # -X importtime schrijft elke geïmporteerde module naar stderr
+    trace = subprocess.run([sys.executable, "-X", "importtime", main_file, "--help"], check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    imported = {line.rsplit("|", 1)[-1].strip() for line in trace.splitlines() if "|" in line}
+    eager = sorted(module for module in CLI_MODULES if module in imported)
+
+    median = statistics.median(timings)
+    print(f"\nmain.py koude start: mediaan {median:.1f} ms, min {min(timings):.1f} ms "
+          f"(kale interpreter {statistics.median(baseline):.1f} ms), budget {budget_ms} ms")
+    if eager:
+        print(f"❌ Bij het opstarten geïmporteerd: {', '.join(eager)}")
+    if median >= budget_ms:
+        print(f"❌ Koude start boven het budget van {budget_ms} ms")
+    passed = not eager and median < budget_ms
+    if passed:
+        print("✅ Koude start binnen budget, geen generatoren geïmporteerd")
+    return passed
+
+
+BENCHMARKS = {
+    "classes": bench_class_diagram,
+    "routing": bench_edge_routing,
+    "usecases": bench_usecase_layout,
+    "traceability": bench_traceability,
+    "startup": bench_cli_startup,
+}
+
+
+if __name__ == "__main__":
+    for bench in BENCHMARKS.values():
+        bench()
@@ -1,7 +1,36 @@
+import hashlib
 import json
 import math
+import time
 import xml.sax.saxutils as saxutils
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from drawiopatcher import DrawioPatcher, split_cell_id
+from edgerouter import LaneAllocator, OrthogonalRouter
+
+
+def normalize_class_model(data: Any) -> List[Dict[str, Any]]:
+    """
+    Zet een model met losse "classes" en "relations" (from/to, methodes als tekst zoals
+    data/classdiagram.json) om naar de lijst met klassen die run() verwacht. Een lijst blijft ongewijzigd.
+    """
+    if not isinstance(data, dict):
+        return data
+    classes = []
+    for class_json in data.get("classes", []):
+        methods = [{"name": m.split("(", 1)[0].strip(), "access": "public",
+                    "parameters": [p.strip() for p in m.split("(", 1)[1].rstrip(")").split(",") if p.strip()]
+                    if "(" in m else []} if isinstance(m, str) else m
+                   for m in class_json.get("methods", [])]
+        classes.append(dict(class_json, methods=methods, relationships=list(class_json.get("relationships", []))))
+    by_name = {c["name"]: c for c in classes}
+    for rel in data.get("relations", []):
+        if rel.get("from") in by_name:
+            by_name[rel["from"]]["relationships"].append({
+                "type": rel.get("type", "association"), "target": rel.get("to"),
+                "source_multiplicity": rel.get("multiplicity_from", ""),
+                "target_multiplicity": rel.get("multiplicity_to", "")})
+    return classes
 
 
 class DrawioClassDiagramGenerator:
@@ -11,9 +40,15 @@ class DrawioClassDiagramGenerator:
     voor het doortellen van cell IDs.
     """
 
-    def __init__(self, padding: int = 150, class_width: int = 240):
+    def __init__(self, padding: int = 150, class_width: int = 240, stable_ids: bool = False):
         self.padding = padding
         self.class_width = class_width
+        # Stabiele IDs (cls:<klasse>:<n>, rel:<klasse>.<i>) plus erdHash maken patch_file mogelijk;
+        # standaard uit, zodat gewone uitvoer de numerieke IDs houdt
+        self.stable_ids = stable_ids
+        # Minimale afstand tussen relatielijnen en klassen; routing_stats bevat de router-metrics
+        self.route_clearance = 10
+        self.routing_stats: Dict[str, Any] = {}
         self.classes_input: List[Dict[str, Any]] = []
         self.colors = ["#FF0000", "#00AA00", "#0000FF", "#FFAA00", "#00AAAA", "#AA00AA", "#000000"]
         self.container_style = "swimlane;fontStyle=0;childLayout=stackLayout;horizontal=1;startSize=30;horizontalStack=0;resizeParent=1;resizeParentCheck=0;collapsible=0;marginBottom=0;html=1;"
@@ -30,8 +65,23 @@ class DrawioClassDiagramGenerator:
     def _escape(self, text: str) -> str:
         return saxutils.escape(text, {"\"": "&quot;", "'": "&apos;"})
 
-    def _create_cell(self, id_: int, x: int, y: int, w: int, h: int, text: str, style: str) -> str:
-        return f'\n    <mxCell id="{id_}" value="{self._escape(text)}" style="{style}" vertex="1" parent="1">\n      <mxGeometry x="{x}" y="{y}" width="{w}" height="{h}" as="geometry" />\n    </mxCell>'
+    def _create_cell(self, id_, x: int, y: int, w: int, h: int, text: str, style: str) -> str:
+        return f'\n    <mxCell id="{self._escape(str(id_))}" value="{self._escape(text)}" style="{style}" vertex="1" parent="1">\n      <mxGeometry x="{x}" y="{y}" width="{w}" height="{h}" as="geometry" />\n    </mxCell>'
+
+    def _class_hash(self, json_data: Dict[str, Any]) -> str:
+        source = json.dumps([self.class_width, json_data], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+
+    def _cell_id(self, json_data: Dict[str, Any], start_id: int, cell_id: int):
+        if self.stable_ids:
+            return f"cls:{json_data['name']}:{cell_id - start_id}"
+        return cell_id
+
+    def _class_height(self, json_data: Dict[str, Any]) -> int:
+        line_h, min_comp_h, title_h, line_separator_h = 20, 25, 30, 1
+        attr_h = max(min_comp_h, len(json_data.get("attributes", [])) * line_h)
+        meth_h = max(min_comp_h, len(json_data.get("methods", [])) * line_h)
+        return title_h + attr_h + line_separator_h + meth_h
 
     def _make_class_cell(self, json_data: Dict[str, Any], x: int, y: int, start_id: int) -> Tuple[
         str, int, int, int, Dict]:
@@ -58,22 +108,30 @@ class DrawioClassDiagramGenerator:
         meth_h = max(min_comp_h, len(json_data.get("methods", [])) * line_h)
         total_h = title_h + attr_h + line_separator_h + meth_h
 
+        container_style = self.container_style
+        if self.stable_ids:
+            container_style += f"erdHash={self._class_hash(json_data)};"
+
         cells, cell_id = [], start_id
-        cells.append(self._create_cell(cell_id, x, y, self.class_width, total_h, "", self.container_style))
+        cells.append(self._create_cell(self._cell_id(json_data, start_id, cell_id), x, y, self.class_width, total_h, "",
+                                       container_style))
         cell_id += 1
-        cells.append(self._create_cell(cell_id, x, y, self.class_width, title_h, json_data['name'], self.title_style))
+        cells.append(self._create_cell(self._cell_id(json_data, start_id, cell_id), x, y, self.class_width, title_h,
+                                       json_data['name'], self.title_style))
         cell_id += 1
         cells.append(
-            self._create_cell(cell_id, x, y + title_h, self.class_width, attr_h, attributes_str, self.member_style))
+            self._create_cell(self._cell_id(json_data, start_id, cell_id), x, y + title_h, self.class_width, attr_h,
+                              attributes_str, self.member_style))
         cell_id += 1
 
         # Nieuwe cel voor de horizontale lijn
         separator_style = "line;strokeWidth=1;html=1;fontStyle=1;align=center;verticalAlign=middle;"
-        cells.append(self._create_cell(cell_id, x, y + title_h + attr_h, self.class_width, line_separator_h, "",
-                                       separator_style))
+        cells.append(self._create_cell(self._cell_id(json_data, start_id, cell_id), x, y + title_h + attr_h,
+                                       self.class_width, line_separator_h, "", separator_style))
         cell_id += 1
 
-        cells.append(self._create_cell(cell_id, x, y + title_h + attr_h + line_separator_h, self.class_width, meth_h,
+        cells.append(self._create_cell(self._cell_id(json_data, start_id, cell_id), x,
+                                       y + title_h + attr_h + line_separator_h, self.class_width, meth_h,
                                        methods_str,
                                        self.member_style))
         cell_id += 1
@@ -82,6 +140,66 @@ class DrawioClassDiagramGenerator:
                       "json": json_data}
         return "\n".join(cells), cell_id, self.class_width, total_h, class_data
 
+    def _order_classes(self) -> List[List[int]]:
+        """
+        Verdeelt de klassen in lagen volgens de overervingshiërarchie (basisklassen bovenaan)
+        en ordent elke laag zodat subklassen onder hun ouder staan en compositie-/aggregatie-
+        partners naast elkaar clusteren. Alles in O(n + relaties).
+        """
+        index = {c["name"]: i for i, c in enumerate(self.classes_input)}
+        n = len(self.classes_input)
+        parent = [-1] * n
+        children: List[List[int]] = [[] for _ in range(n)]
+        cluster = list(range(n))
+
+        def find(i: int) -> int:
+            while cluster[i] != i:
+                cluster[i] = cluster[cluster[i]]
+                i = cluster[i]
+            return i
+
+        for i, class_json in enumerate(self.classes_input):
+            for rel in class_json.get("relationships", []):
+                target = index.get(rel.get("target"))
+                if target is None or target == i:
+                    continue
+                if rel.get("type") == "inheritance" and parent[i] == -1:
+                    parent[i] = target
+                    children[target].append(i)
+                elif rel.get("type") in ("composition", "aggregation"):
+                    cluster[find(i)] = find(target)
+
+        # Clusters krijgen een rang op volgorde van eerste voorkomen
+        cluster_rank: Dict[int, int] = {}
+        for i in range(n):
+            cluster_rank.setdefault(find(i), len(cluster_rank))
+
+        # DFS over het overervingsbos: wortels per cluster, subklassen direct na hun ouder
+        roots = sorted((i for i in range(n) if parent[i] == -1), key=lambda i: (cluster_rank[find(i)], i))
+        depth, dfs_order, visited = [0] * n, [], [False] * n
+        for root in roots + list(range(n)):  # tweede deel vangt klassen in een (foutieve) overervingscyclus
+            if visited[root]:
+                continue
+            stack = [root]
+            visited[root] = True
+            while stack:
+                i = stack.pop()
+                dfs_order.append(i)
+                for child in sorted(children[i], key=lambda c: (cluster_rank[find(c)], c), reverse=True):
+                    if not visited[child]:
+                        visited[child] = True
+                        depth[child] = depth[i] + 1
+                        stack.append(child)
+
+        position = {i: p for p, i in enumerate(dfs_order)}
+        layers: List[List[int]] = [[] for _ in range(max(depth) + 1)]
+        for i in dfs_order:
+            layers[depth[i]].append(i)
+        for layer in layers:
+            layer.sort(key=lambda i: (position[parent[i]] if parent[i] != -1 else -1, cluster_rank[find(i)],
+                                      position[i]))
+        return layers
+
     def _generate_diagram_layout(self) -> Tuple[List[Dict[str, Any]], int]:  # GEWIJZIGD
         """Berekent de layout en genereert de cellen voor alle klassen."""
         if not self.classes_input: return [], 2
@@ -92,20 +210,19 @@ class DrawioClassDiagramGenerator:
         temp_heights = [max(25, len(c.get("attributes", [])) * 20) + max(25, len(c.get("methods", [])) * 20) + 30 for c
                         in self.classes_input]
 
-        y_positions, current_y = [], 0
-        for row in range(math.ceil(total_classes / columns)):
-            row_indices = range(row * columns, min((row + 1) * columns, total_classes))
-            if not row_indices: continue
-            max_h = max(temp_heights[i] for i in row_indices)
-            y_positions.append(current_y)
-            current_y += max_h + self.padding
+        # Elke laag begint op een nieuwe rij en loopt door over meerdere rijen van `columns` breed
+        positions: List[Tuple[int, int]] = [(0, 0)] * total_classes
+        current_y = 0
+        for layer in self._order_classes():
+            for row_start in range(0, len(layer), columns):
+                row_indices = layer[row_start:row_start + columns]
+                for col, i in enumerate(row_indices):
+                    positions[i] = (col * (self.class_width + self.padding), current_y)
+                current_y += max(temp_heights[i] for i in row_indices) + self.padding
 
         cell_id, classes_info = 2, []
         for i, class_json in enumerate(self.classes_input):
-            col, row = i % columns, i // columns
-            x = col * (self.class_width + self.padding)
-            y = y_positions[row]
-
+            x, y = positions[i]
             xml, next_id, w, h, data = self._make_class_cell(class_json, x, y, cell_id)
             data['xml'] = xml
             classes_info.append(data)
@@ -113,25 +230,28 @@ class DrawioClassDiagramGenerator:
 
         return classes_info, cell_id  # GEWIJZIGD: geef de laatst gebruikte cell_id terug
 
-    def _generate_relationship_cells(self, classes_info: List[Dict[str, Any]], start_cell_id: int) -> str:  # GEWIJZIGD
-        """Genereert de XML voor alle relatielijnen tussen de klassen."""
+    def _generate_relationship_cells(self, classes_info: List[Dict[str, Any]], start_cell_id: int,
+                                     only_classes: Optional[Set[str]] = None) -> str:  # GEWIJZIGD
+        """
+        Genereert de XML voor alle relatielijnen tussen de klassen.
+        only_classes: alleen relaties die één van deze klassen raken (patch-modus); banen en
+        kleuren worden wel voor alle relaties toegekend zodat ze stabiel blijven.
+        """
         class_map = {c["name"]: c for c in classes_info}
 
         # GEWIJZIGD: Verwijder de foute berekening en gebruik de doorgegeven startwaarde
         cell_id = start_cell_id
 
-        relation_cells, rel_idx, used_waypoints = [], 0, set()
-
-        def get_unique_waypoint_x(x: float) -> Tuple[float, float]:
-            offset, original_x = 0, x
-            while x in used_waypoints:
-                offset += 10
-                x = original_x - offset
-            used_waypoints.add(x)
-            return x, offset
+        relation_cells, rel_idx = [], 0
+        # Verticale banen van 10px binnen het kanaal tussen twee kolommen; de router legt
+        # routes die toch een klasse raken om die klasse heen
+        half_pad = self.padding / 2
+        lanes = LaneAllocator(10, half_pad - self.route_clearance)
+        router = OrthogonalRouter({c["name"]: (c["pos"][0], c["pos"][1], c["width"], c["height"]) for c in classes_info},
+                                  clearance=self.route_clearance)
 
         for source_info in classes_info:
-            for rel in source_info["json"].get("relationships", []):
+            for rel_pos, rel in enumerate(source_info["json"].get("relationships", [])):
                 target_name = rel.get("target")
                 if not target_name or target_name not in class_map: continue
 
@@ -142,29 +262,33 @@ class DrawioClassDiagramGenerator:
                                               source_info["height"] / 2
                 target_x_edge, target_y_mid = target_info["pos"][0], target_info["pos"][1] + target_info["height"] / 2
 
-                half_pad = self.padding / 2
-                wp1_x, _ = get_unique_waypoint_x(source_x_edge + half_pad)
-                wp4_x, _ = get_unique_waypoint_x(target_x_edge - half_pad)
-
-                points_arr = []
-                if source_info["pos"][0] != target_info["pos"][0]:
-                    shared_y = min(source_info["pos"][1], target_info["pos"][1]) - half_pad
-                    points_arr.extend(
-                        [f'<mxPoint x="{wp1_x}" y="{source_y_mid}" />', f'<mxPoint x="{wp1_x}" y="{shared_y}" />',
-                         f'<mxPoint x="{wp4_x}" y="{shared_y}" />', f'<mxPoint x="{wp4_x}" y="{target_y_mid}" />'])
-                else:
-                    points_arr.extend(
-                        [f'<mxPoint x="{wp1_x}" y="{source_y_mid}" />', f'<mxPoint x="{wp4_x}" y="{target_y_mid}" />'])
-
-                points = f'\n<Array as="points">\n{"".join(p for p in points_arr)}\n</Array>'
+                wp1_x = source_x_edge + half_pad
+                wp1_x += lanes.offset(wp1_x)
+                wp4_x = target_x_edge - half_pad
+                wp4_x += lanes.offset(wp4_x)
+                # Corridor boven de hoogste van de twee klassen, ook als ze in dezelfde kolom staan
+                shared_y = min(source_info["pos"][1], target_info["pos"][1]) - half_pad
+                route = router.route((source_x_edge, source_y_mid), (target_x_edge, target_y_mid), wp1_x, wp4_x,
+                                     shared_y, source=source_info["name"], target=target_name)
+
+                # Banen zijn toegekend; relaties buiten de patch hoeven geen XML
+                if only_classes is not None and source_info["name"] not in only_classes \
+                        and target_name not in only_classes:
+                    cell_id += 1
+                    rel_idx += 1
+                    continue
+
+                points = "".join(f'<mxPoint x="{x}" y="{y}" />' for x, y in route)
+                points = f'\n<Array as="points">\n{points}\n</Array>'
 
                 color = self.colors[rel_idx % len(self.colors)]
                 line_style = f"edgeStyle=orthogonalEdgeStyle;rounded=0;html=1;strokeColor={color};strokeWidth=2;" + "".join(
                     f"{k}={v};" for k, v in
                     style_props.items()) + f"sourceLabel={self._escape(rel.get('source_multiplicity', ''))};targetLabel={self._escape(rel.get('target_multiplicity', ''))};"
 
+                edge_id = f"rel:{source_info['name']}.{rel_pos}" if self.stable_ids else cell_id
                 relation_cells.append(f'''
-                <mxCell id="{cell_id}" style="{line_style}" edge="1" parent="1">
+                <mxCell id="{self._escape(str(edge_id))}" style="{line_style}" edge="1" parent="1">
                   <mxGeometry relative="1" as="geometry">
                     <mxPoint x="{source_x_edge}" y="{source_y_mid}" as="sourcePoint" />
                     <mxPoint x="{target_x_edge}" y="{target_y_mid}" as="targetPoint" />{points}
@@ -173,8 +297,70 @@ class DrawioClassDiagramGenerator:
                 cell_id += 1
                 rel_idx += 1
 
+        self.routing_stats = router.metrics()
         return "\n".join(relation_cells)
 
+    def patch_file(self, json_data: List[Dict[str, Any]], drawio_file: str) -> Dict[str, Any]:
+        """
+        Werkt een eerder gegenereerd klassendiagram bij: alleen klassen waarvan de definitie
+        veranderde (andere erdHash) en hun relaties worden opnieuw gegenereerd, op de positie waar
+        de gebruiker ze liet staan. Nieuwe klassen komen in een raster onder de bestaande inhoud.
+        """
+        start = time.perf_counter()
+        self.stable_ids = True
+        self.classes_input = json_data
+        patcher = DrawioPatcher(drawio_file)
+        existing = patcher.scan("cls")
+
+        new_count = sum(1 for c in json_data if c["name"] not in existing)
+        columns = max(1, math.ceil(math.sqrt(new_count)))
+        new_y, row_h, new_idx = patcher.bottom + self.padding if existing else 0, 0, 0
+
+        classes_info, changed, new_cells = [], set(), []
+        for class_json in json_data:
+            name = class_json["name"]
+            old = existing.get(name)
+            if old is not None:
+                x, y = old["x"], old["y"]
+            else:
+                if new_idx and new_idx % columns == 0:
+                    new_y += row_h + self.padding
+                    row_h = 0
+                x, y = (new_idx % columns) * (self.class_width + self.padding), new_y
+                new_idx += 1
+            if old is None or old["hash"] != self._class_hash(class_json):
+                xml, _, w, h, data = self._make_class_cell(class_json, x, y, 0)
+                changed.add(name)
+                new_cells.append(xml)
+            else:
+                # Ongewijzigde klassen: alleen de geometrie voor de relaties
+                h = self._class_height(class_json)
+                data = {"name": name, "pos": (x, y), "width": self.class_width, "height": h, "json": class_json}
+            if old is None:
+                row_h = max(row_h, h)
+            classes_info.append(data)
+
+        removed = set(existing) - {c["name"] for c in json_data}
+        affected = changed | removed
+        new_cells.append(self._generate_relationship_cells(classes_info, 0, only_classes=affected))
+        regenerated = {f"rel:{c['name']}.{i}" for c in json_data for i, rel in enumerate(c.get("relationships", []))
+                       if rel.get("target") in affected}
+
+        def drop(cell_id: str) -> bool:
+            if cell_id.startswith("cls:"):
+                return split_cell_id(cell_id)[1] in affected
+            if cell_id.startswith("rel:"):
+                # Relaties van of naar een gewijzigde klasse zijn opnieuw gegenereerd
+                source = cell_id[4:].rsplit(".", 1)[0]
+                return source in affected or cell_id in regenerated
+            return False
+
+        counts = patcher.write(drop, new_cells)
+        elapsed = time.perf_counter() - start
+        print(f"✅ Klassendiagram bijgewerkt in: {drawio_file} ({len(changed)} klasse(n) vernieuwd, "
+              f"{len(removed)} verwijderd, {counts['kept']} cellen behouden, {elapsed * 1000:.0f} ms)")
+        return {"changed": sorted(changed), "removed": sorted(removed), **counts, "seconds": elapsed}
+
     def run(self, json_data: List[Dict[str, Any]]) -> str:
         """Hoofdfunctie om de volledige Draw.io XML te genereren."""
         self.classes_input = json_data
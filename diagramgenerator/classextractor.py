@@ -0,0 +1,212 @@
+import ast
+import hashlib
+import json
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+SKIPPED_DIRS = {".git", ".hg", ".venv", "venv", "__pycache__", "build", "dist", "node_modules", ".tox"}
+CONTAINER_TYPES = {"list", "List", "set", "Set", "tuple", "Tuple", "Sequence", "Iterable", "dict", "Dict",
+                   "Mapping", "frozenset", "FrozenSet", "deque"}
+
+
+def _access(name):
+    if name.startswith("__") and not name.endswith("__"):
+        return "private"
+    if name.startswith("_") and not name.startswith("__"):
+        return "protected"
+    return "public"
+
+
+def _annotation(node):
+    return ast.unparse(node) if node is not None else ""
+
+
+def _extract_file(path):
+    """Parset één bestand (draait in een worker-proces) en geeft ruwe klasse-informatie terug."""
+    with open(path, "rb") as f:
+        source = f.read()
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError):
+        return []
+
+    classes = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        attributes, methods, composed = {}, [], set()
+        for item in node.body:
+            if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
+                attributes[item.target.id] = _annotation(item.annotation)
+            elif isinstance(item, ast.Assign):
+                for target in item.targets:
+                    if isinstance(target, ast.Name):
+                        attributes.setdefault(target.id, "")
+            elif isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                args = item.args.posonlyargs + item.args.args + item.args.kwonlyargs
+                params = [f"{a.arg}: {_annotation(a.annotation)}" if a.annotation else a.arg
+                          for a in args if a.arg not in ("self", "cls")]
+                methods.append({"name": item.name, "parameters": params,
+                                "return_type": _annotation(item.returns) or "None",
+                                "access": _access(item.name)})
+                if item.name == "__init__":
+                    # self.x: T = ... en self.x = Klasse(...) in de constructor
+                    for stmt in ast.walk(item):
+                        if isinstance(stmt, ast.AnnAssign):
+                            targets, value, annotation = [stmt.target], stmt.value, _annotation(stmt.annotation)
+                        elif isinstance(stmt, ast.Assign):
+                            targets, value, annotation = stmt.targets, stmt.value, ""
+                        else:
+                            continue
+                        for target in targets:
+                            if (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                                    and target.value.id == "self"):
+                                if isinstance(value, ast.Call) and isinstance(value.func, ast.Name):
+                                    composed.add((target.attr, value.func.id))
+                                    annotation = annotation or value.func.id
+                                if annotation or target.attr not in attributes:
+                                    attributes[target.attr] = annotation
+        classes.append({
+            "name": node.name,
+            "bases": [_annotation(b).split(".")[-1] for b in node.bases],
+            "attributes": attributes,
+            "methods": methods,
+            "composed": sorted(composed),
+        })
+    return classes
+
+
+def _hash_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class PythonClassExtractor:
+    """
+    Extraheert een klassenmodel uit Python-broncode met `ast`, in de JSON-vorm die
+    DrawioClassDiagramGenerator.run verwacht. Bestanden worden parallel geparst op een
+    process pool; een cache per bestand (mtime/grootte, daarna sha256) zorgt dat na een
+    kleine wijziging alleen de gewijzigde bestanden opnieuw geparst worden.
+    """
+
+    def __init__(self, source_root, output_file="data/classdiagram_extracted.json", cache_file=None,
+                 max_workers=None):
+        self.source_root = source_root
+        self.output_file = output_file
+        self.cache_file = cache_file or output_file + ".cache"
+        self.max_workers = max_workers
+        self.cache = {}
+        self.classes = []
+        self.stats = {"files": 0, "parsed": 0, "cached": 0}
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, "rb") as f:
+                self.cache = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.cache = {}
+
+    def _save_cache(self):
+        with open(self.cache_file, "wb") as f:
+            pickle.dump(self.cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _python_files(self):
+        for root, dirs, files in os.walk(self.source_root):
+            dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+            for name in files:
+                if name.endswith(".py"):
+                    yield os.path.join(root, name)
+
+    def scan(self):
+        """Verzamelt per bestand de klassen; alleen gewijzigde bestanden worden geparst."""
+        self._load_cache()
+        new_cache, to_parse = {}, []
+        for path in self._python_files():
+            stat = os.stat(path)
+            entry = self.cache.get(path)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                new_cache[path] = entry
+                continue
+            digest = _hash_file(path)
+            if entry and entry["sha256"] == digest:
+                new_cache[path] = dict(entry, mtime_ns=stat.st_mtime_ns)
+                continue
+            new_cache[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+            to_parse.append(path)
+
+        if len(to_parse) > 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = pool.map(_extract_file, to_parse, chunksize=max(1, len(to_parse) // 64))
+                for path, classes in zip(to_parse, results):
+                    new_cache[path]["classes"] = classes
+        else:
+            for path in to_parse:
+                new_cache[path]["classes"] = _extract_file(path)
+
+        self.stats = {"files": len(new_cache), "parsed": len(to_parse), "cached": len(new_cache) - len(to_parse)}
+        self.cache = new_cache
+        self._save_cache()
+        return new_cache
+
+    def build_model(self):
+        """Zet de ruwe klasse-informatie om naar klassen met relaties."""
+        raw = []
+        for path in sorted(self.cache):
+            module = os.path.splitext(os.path.relpath(path, self.source_root))[0].replace(os.sep, ".")
+            raw.extend((module, c) for c in self.cache[path]["classes"])
+
+        # Dubbele klassenamen krijgen hun modulenaam als prefix; verwijzingen gaan naar de eerste
+        counts = {}
+        for _, c in raw:
+            counts[c["name"]] = counts.get(c["name"], 0) + 1
+        names = [c["name"] if counts[c["name"]] == 1 else f"{module}.{c['name']}" for module, c in raw]
+        by_simple_name = {}
+        for name, (_, c) in zip(names, raw):
+            by_simple_name.setdefault(c["name"], name)
+
+        self.classes = []
+        for name, (_, c) in zip(names, raw):
+            relationships, linked = [], set()
+            for base in c["bases"]:
+                if base in by_simple_name and by_simple_name[base] != name:
+                    relationships.append({"type": "inheritance", "target": by_simple_name[base]})
+            for attr, target in c["composed"]:
+                if target in by_simple_name and target not in linked:
+                    linked.add(target)
+                    relationships.append({"type": "composition", "target": by_simple_name[target],
+                                          "source_multiplicity": "1", "target_multiplicity": "1"})
+            for attr, annotation in c["attributes"].items():
+                tokens = re.findall(r"[A-Za-z_][A-Za-z0-9_]*", annotation)
+                many = any(t in CONTAINER_TYPES for t in tokens)
+                for token in tokens:
+                    if token in by_simple_name and token not in linked and by_simple_name[token] != name:
+                        linked.add(token)
+                        relationships.append({"type": "association", "target": by_simple_name[token],
+                                              "source_multiplicity": "1", "target_multiplicity": "*" if many else "1"})
+            self.classes.append({
+                "name": name,
+                "attributes": [{"name": attr, "type": annotation or "Any", "access": _access(attr)}
+                               for attr, annotation in c["attributes"].items()],
+                "methods": c["methods"],
+                "relationships": relationships,
+            })
+        return self.classes
+
+    def save_to_file(self):
+        with open(self.output_file, "w", encoding="utf-8") as f:
+            json.dump(self.classes, f, indent=2, ensure_ascii=False)
+        print(f"✅ {len(self.classes)} klassen uit {self.stats['files']} bestanden "
+              f"({self.stats['parsed']} geparst, {self.stats['cached']} uit cache) opgeslagen in '{self.output_file}'.")
+
+    def run(self):
+        self.scan()
+        self.build_model()
+        self.save_to_file()
+        return self.classes
+
+
+if __name__ == "__main__":
+    extractor = PythonClassExtractor(source_root=".", output_file="data/classdiagram_extracted.json")
+    extractor.run()
@@ -1,36 +1,78 @@
+import hashlib
 import json
 import math
+import os
+import time
 import xml.sax.saxutils as saxutils
 
+from drawiopatcher import DrawioPatcher, split_cell_id
+from edgerouter import LaneAllocator, OrthogonalRouter
+
+from schemacache import load_schema
+from schemavalidator import SchemaValidator, SchemaValidationError
+
 
 class DrawioERDGenerator:
-    def __init__(self, json_file, output_file="output.drawio", padding=100):
+    def __init__(self, json_file, output_file="output.drawio", padding=100, compact=False, validate=True,
+                 stable_ids=False, tables=None):
         self.json_file = json_file
+        self.tables = tables
         self.output_file = output_file
         self.padding = padding
+        self.compact = compact
+        self.validate = validate
+        # Stabiele, van de inhoud afgeleide IDs (tbl:<tabel>:<n>, fk:<tabel>.<veld>) plus erdHash maken
+        # patchen mogelijk; standaard uit, run(patch=True) en patch() zetten ze aan
+        self.stable_ids = stable_ids
+        # Minimale afstand tussen relatielijnen en tabellen; routing_stats bevat de router-metrics
+        self.route_clearance = 10
+        self.routing_stats = {}
         self.tables_input = []
         self.colors = [
             "#FF0000", "#00AA00", "#0000FF", "#FFAA00",
             "#00AAAA", "#AA00AA", "#000000", "#AAAAAA",
         ]
+        # Compacte modus: één HTML-cel per tabel. De stijl bouwt voort op de ingebouwde
+        # draw.io-stijl "text" en wordt door alle tabellen gedeeld.
+        self.compact_table_style = ("text;html=1;overflow=fill;whiteSpace=wrap;spacing=0;"
+                                    "strokeColor=#000000;fillColor=#FFFFFF;fontFamily=Arial;")
+        # Gedeelde relatiestijlen, één per kleur/pijl-combinatie (zie edge_style)
+        self._edge_styles = {}
+        self._layout = []
 
     def load_json(self):
-        with open(self.json_file, "r", encoding="utf-8") as f:
-            self.tables_input = json.load(f)
+        self.tables_input = self.tables if self.tables is not None else load_schema(self.json_file)
 
     def escape_text(self, text):
         return saxutils.escape(text, {"\"": "&quot;", "'": "&apos;"})
 
+    default_cell_style = ("shape=rectangle;whiteSpace=wrap;html=1;"
+                          "strokeColor=#000000;fillColor=#FFFFFF;fontSize=14;fontFamily=Arial;fontStyle=1")
+
     def create_rectangle_cell(self, id_, x, y, w, h, text, style=None):
         if style is None:
-            style = ("shape=rectangle;whiteSpace=wrap;html=1;"
-                     "strokeColor=#000000;fillColor=#FFFFFF;fontSize=14;fontFamily=Arial;fontStyle=1")
+            style = self.default_cell_style
         text_escaped = self.escape_text(text)
         return f'''
-    <mxCell id="{id_}" value="{text_escaped}" style="{style}" vertex="1" parent="1">
+    <mxCell id="{self.escape_text(str(id_))}" value="{text_escaped}" style="{style}" vertex="1" parent="1">
       <mxGeometry x="{x}" y="{y}" width="{w}" height="{h}" as="geometry" />
     </mxCell>'''
 
+    def table_hash(self, json_data):
+        """Inhoudshash van een tabeldefinitie; bepaalt bij patchen of de cellen opnieuw moeten."""
+        source = json.dumps([self.compact, json_data], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+
+    def cell_id(self, json_data, start_id, n):
+        if self.stable_ids:
+            return f"tbl:{json_data['title']}:{n}"
+        return str(start_id + n)
+
+    def background_style(self, json_data, style):
+        if self.stable_ids:
+            return f"{style.rstrip(';')};erdHash={self.table_hash(json_data)};"
+        return style
+
     def make_table_drawio(self, json_data, start_x, start_y, start_id):
         col1_w, col2_w, row_h = 60, 320, 40
         rows = 1 + len(json_data["fields"])
@@ -40,13 +82,15 @@ class DrawioERDGenerator:
         cell_id = start_id
 
         # Achtergrond
-        cells.append(self.create_rectangle_cell(str(cell_id), start_x, start_y, width, height, ""))
+        cells.append(self.create_rectangle_cell(self.cell_id(json_data, start_id, 0), start_x, start_y, width, height, "",
+                                                self.background_style(json_data, self.default_cell_style)))
         background_id = cell_id
         cell_id += 1
 
         title_style = ("shape=rectangle;whiteSpace=wrap;html=1;"
                        "strokeColor=#000000;fillColor=#FFFFFF;fontSize=16;fontFamily=Arial;fontStyle=1;")
-        cells.append(self.create_rectangle_cell(str(cell_id), start_x, start_y, width, row_h, json_data['title'], title_style))
+        cells.append(self.create_rectangle_cell(self.cell_id(json_data, start_id, cell_id - start_id), start_x, start_y,
+                                                width, row_h, json_data['title'], title_style))
         title_id = cell_id
         cell_id += 1
 
@@ -54,7 +98,8 @@ class DrawioERDGenerator:
         for i, field in enumerate(json_data["fields"]):
             y = start_y + row_h * (i + 1)
             type_id = cell_id
-            cells.append(self.create_rectangle_cell(str(cell_id), start_x, y, col1_w, row_h, field["type"]))
+            cells.append(self.create_rectangle_cell(self.cell_id(json_data, start_id, cell_id - start_id), start_x, y,
+                                                    col1_w, row_h, field["type"]))
             cell_id += 1
             name_id = cell_id
             # Bouw veldbeschrijving
@@ -67,7 +112,8 @@ class DrawioERDGenerator:
             if props:
                 desc += "\n" + ", ".join(props)
 
-            cells.append(self.create_rectangle_cell(str(cell_id), start_x + col1_w, y, col2_w, row_h, desc))
+            cells.append(self.create_rectangle_cell(self.cell_id(json_data, start_id, cell_id - start_id),
+                                                    start_x + col1_w, y, col2_w, row_h, desc))
 
             cell_id += 1
             fields_cells.append({
@@ -86,7 +132,7 @@ class DrawioERDGenerator:
         # Verticale lijn
         line_style = "strokeColor=#000000;strokeWidth=2;endArrow=none;endFill=0;"
         vertical_line = f'''
-    <mxCell id="{cell_id}" style="{line_style}" edge="1" parent="1">
+    <mxCell id="{self.escape_text(self.cell_id(json_data, start_id, cell_id - start_id))}" style="{line_style}" edge="1" parent="1">
       <mxGeometry relative="1" as="geometry">
         <mxPoint x="{start_x + col1_w}" y="{start_y + row_h}" as="sourcePoint" />
         <mxPoint x="{start_x + col1_w}" y="{start_y + height}" as="targetPoint" />
@@ -107,6 +153,86 @@ class DrawioERDGenerator:
 
         return "\n".join(cells), cell_id, width, height, table_data
 
+    def make_table_drawio_compact(self, json_data, start_x, start_y, start_id):
+        """
+        Zelfde layout als make_table_drawio, maar als één cel met een HTML-tabel als label.
+        De rijhoogte blijft gelijk zodat relaties nog steeds op de veldrijen aansluiten.
+        """
+        col1_w, col2_w, row_h = 60, 320, 40
+        rows = 1 + len(json_data["fields"])
+        width, height = col1_w + col2_w, row_h * rows
+        html = ['<table border="1" style="width:100%;height:100%;border-collapse:collapse;font-size:11px;">'
+                f'<tr height="{row_h}"><td colspan="2" align="center" style="font-size:16px;">'
+                f'<b>{self.escape_text(json_data["title"])}</b></td></tr>']
+        fields_cells = []
+        for i, field in enumerate(json_data["fields"]):
+            props = []
+            if field.get("not_null", False):
+                props.append("NOT NULL")
+            if field.get("unique", False):
+                props.append("UNIQUE")
+            desc = "<br>".join(self.escape_text(part) for part in
+                               [field["name"], field["datatype"], ", ".join(props)] if part)
+            html.append(f'<tr height="{row_h}"><td width="{col1_w}" align="center"><b>'
+                        f'{self.escape_text(field["type"])}</b></td><td>{desc}</td></tr>')
+            fields_cells.append({
+                "type": field["type"],
+                "name": field["name"],
+                "references": field.get("references"),
+                "type_cell_id": start_id,
+                "name_cell_id": start_id,
+                "x": start_x,
+                "y": start_y + row_h * (i + 1),
+                "width_type": col1_w,
+                "width_name": col2_w,
+                "height": row_h,
+            })
+        html.append("</table>")
+
+        cell = self.create_rectangle_cell(self.cell_id(json_data, start_id, 0), start_x, start_y, width, height,
+                                          "".join(html), self.background_style(json_data, self.compact_table_style))
+        table_data = {
+            "background_id": start_id,
+            "title_id": start_id,
+            "fields_cells": fields_cells,
+            "position": (start_x, start_y),
+            "width": width,
+            "height": height,
+            "title": json_data['title'],
+        }
+        return cell, start_id + 1, width, height, table_data
+
+    def table_layout(self, json_data, start_x, start_y):
+        """Alleen de geometrie van een tabel (zoals make_table_drawio die teruggeeft), zonder XML."""
+        col1_w, col2_w, row_h = 60, 320, 40
+        width, height = col1_w + col2_w, row_h * (1 + len(json_data["fields"]))
+        fields_cells = [{
+            "type": field["type"],
+            "name": field["name"],
+            "references": field.get("references"),
+            "x": start_x,
+            "y": start_y + row_h * (i + 1),
+            "width_type": col1_w,
+            "width_name": col2_w,
+            "height": row_h,
+        } for i, field in enumerate(json_data["fields"])]
+        return width, height, {"fields_cells": fields_cells, "position": (start_x, start_y),
+                               "width": width, "height": height, "title": json_data["title"]}
+
+    def edge_style(self, color, start_arrow, end_arrow):
+        """
+        Gedeelde stijlstring per kleur/pijl-combinatie. In de compacte modus zonder de
+        eigenschappen die al de draw.io-standaard zijn (endFill=1), zodat elke relatie korter wordt.
+        """
+        key = (color, start_arrow, end_arrow)
+        style = self._edge_styles.get(key)
+        if style is None:
+            end_fill = "" if self.compact else "endFill=1;"
+            style = (f"strokeColor={color};strokeWidth=2;endArrow={end_arrow};"
+                     f"{end_fill}startArrow={start_arrow};startFill=0;")
+            self._edge_styles[key] = style
+        return style
+
     def make_multiple_tables_drawio(self):
         import logging
         logging.basicConfig(level=logging.DEBUG)
@@ -114,11 +240,14 @@ class DrawioERDGenerator:
 
         total_tables = len(self.tables_input)
         columns = math.ceil(math.sqrt(total_tables))
-        cells, cell_id, relation_idx = [], 2, 0
+        cells, cell_id = [], 2
         tables_info, temp_tables = [], []
 
+        make_table = self.make_table_drawio_compact if self.compact else self.make_table_drawio
+        self._edge_styles = {}
+
         for table_json in self.tables_input:
-            _, next_id, w, h, data = self.make_table_drawio(table_json, 0, 0, start_id=cell_id)
+            _, next_id, w, h, data = make_table(table_json, 0, 0, start_id=cell_id)
             temp_tables.append({"json": table_json, "width": w, "height": h})
             cell_id = next_id
 
@@ -135,35 +264,32 @@ class DrawioERDGenerator:
             x = col * (400 + self.padding)
             y = y_positions[row]
 
-            table_cells, next_id, w, h, data = self.make_table_drawio(t["json"], x, y, cell_id)
+            table_cells, next_id, w, h, data = make_table(t["json"], x, y, cell_id)
             cells.append(table_cells)
             cell_id = next_id
-            tables_info.append({"json": t["json"], "data": data, "pos": (x, y), "width": w, "height": h})
-
+            tables_info.append({"json": t["json"], "data": data, "pos": (x, y), "width": w, "height": h,
+                                "bytes": len(table_cells.encode("utf-8"))})
+
+        self._layout = tables_info
+        return "\n".join(cells) + "\n" + self.make_relations_drawio(tables_info, cell_id)
+
+    def make_relations_drawio(self, tables_info, cell_id, only_tables=None):
+        """
+        Genereert de FK-relaties tussen de geplaatste tabellen.
+        only_tables: als gezet, alleen relaties die één van deze tabellen raken (patch-modus);
+        kleuren en banen worden voor alle relaties toegekend zodat ze stabiel blijven.
+        """
         table_map = {t["data"]["title"]: t for t in tables_info}
         relations_cells = []
+        relation_idx = 0
 
-        used_wp14_x = set()
-        used_wp23_pairs = set()
-        used_pk_y_per_field = {}
-
-        def get_unique_x_wp14(x):
-            offset = 0
-            original_x = x
-            while x in used_wp14_x:
-                offset += 5
-                x = original_x - offset
-            used_wp14_x.add(x)
-            return x, -offset
-
-        def get_unique_wp23_y(y):
-            offset = 0
-            original_y = y
-            while (y, y) in used_wp23_pairs:
-                offset += 5
-                y = original_y + offset
-            used_wp23_pairs.add((y, y))
-            return y
+        # Banen per kanaal blijven binnen de halve padding; de router legt geblokkeerde routes om
+        half_pad = self.padding / 2
+        channel_lanes = LaneAllocator(5, half_pad - self.route_clearance)
+        corridor_lanes = LaneAllocator(5, half_pad - self.route_clearance)
+        pk_lanes = LaneAllocator(5, 15)
+        router = OrthogonalRouter({t["data"]["title"]: (t["pos"][0], t["pos"][1], t["width"], t["height"])
+                                   for t in tables_info}, clearance=self.route_clearance)
 
         for t in tables_info:
             for f in t["data"]["fields_cells"]:
@@ -199,63 +325,40 @@ class DrawioERDGenerator:
 
                     # === Posities en punten voor pijlen ===
                     fk_x, fk_y = t["pos"][0], f["y"] + f["height"] / 2
-                    pk_x, pk_y = ref_table["pos"][0], ref_field["y"] + ref_field["height"] / 2
-                    half_pad = self.padding / 2
-
-                    raw_wp1_x = f["x"] - half_pad
-                    wp1_x, offset1 = get_unique_x_wp14(raw_wp1_x)
-                    wp1_y = fk_y
-
-                    raw_wp4_x = ref_field["x"] - half_pad
-                    wp4_x, offset4 = get_unique_x_wp14(raw_wp4_x)
-                    wp4_y = pk_y
-
-                    key = (ref_table_name, ref_field_name)
-                    if key not in used_pk_y_per_field:
-                        used_pk_y_per_field[key] = set()
-
-                    offset_y = 0
-                    while (pk_y + offset_y) in used_pk_y_per_field[key]:
-                        offset_y += 5
-
-                    if offset_y > 0:
-                        pk_y += offset_y
-                        wp4_y += offset_y
-
-                    used_pk_y_per_field[key].add(pk_y)
-
-                    shared_y = get_unique_wp23_y(t["pos"][1] - half_pad)
-
-                    wp2_x = t["pos"][0] - half_pad + offset1
-                    wp2_y = shared_y
-
-                    wp3_x = ref_table["pos"][0] - half_pad + offset4
-                    wp3_y = shared_y
+                    pk_x = ref_table["pos"][0]
+                    pk_y = ref_field["y"] + ref_field["height"] / 2 + pk_lanes.offset((ref_table_name, ref_field_name))
+
+                    exit_x = f["x"] - half_pad
+                    exit_x += channel_lanes.offset(exit_x)
+                    entry_x = ref_field["x"] - half_pad
+                    entry_x += channel_lanes.offset(entry_x)
+                    corridor_y = t["pos"][1] - half_pad
+                    corridor_y += corridor_lanes.offset(corridor_y)
+                    if t["pos"][0] == ref_table["pos"][0]:
+                        # Zelfde kolom: één verticaal kanaal links van de tabellen
+                        corridor_y = None
+
+                    route = router.route((fk_x, fk_y), (pk_x, pk_y), exit_x, entry_x, corridor_y,
+                                         source=t["data"]["title"], target=ref_table_name)
+
+                    # Banen zijn toegekend; relaties buiten de patch hoeven geen XML
+                    if (only_tables is not None and t["data"]["title"] not in only_tables
+                            and ref_table_name not in only_tables):
+                        relation_idx += 1
+                        continue
 
-                    if t["pos"][0] != ref_table["pos"][0]:
-                        points = f'''
-                          <Array as="points">
-                            <mxPoint x="{wp1_x}" y="{wp1_y}" />
-                            <mxPoint x="{wp2_x}" y="{wp2_y}" />
-                            <mxPoint x="{wp3_x}" y="{wp3_y}" />
-                            <mxPoint x="{wp4_x}" y="{wp4_y}" />
+                    points = "".join(f'''
+                            <mxPoint x="{x}" y="{y}" />''' for x, y in route)
+                    points = f'''
+                          <Array as="points">{points}
                           </Array>'''
-                    else:
-                        wp4_x = wp1_x
-                        points = f'''
-                              <Array as="points">
-                                <mxPoint x="{wp1_x}" y="{wp1_y}" />
-                                <mxPoint x="{wp4_x}" y="{wp4_y}" />
-                              </Array>'''
 
                     color = self.colors[relation_idx % len(self.colors)]
-                    line_style = (
-                        f"strokeColor={color};strokeWidth=2;endArrow={end_arrow};"
-                        f"endFill=1;startArrow={start_arrow};startFill=0;"
-                    )
+                    line_style = self.edge_style(color, start_arrow, end_arrow)
 
+                    edge_id = f"fk:{t['data']['title']}.{f['name']}" if self.stable_ids else str(cell_id)
                     relations_cells.append(f'''
-                    <mxCell id="{cell_id}" style="{line_style}" edge="1" parent="1">
+                    <mxCell id="{self.escape_text(edge_id)}" style="{line_style}" edge="1" parent="1">
                       <mxGeometry relative="1" as="geometry">
                         <mxPoint x="{fk_x}" y="{fk_y}" as="sourcePoint" />{points}
                         <mxPoint x="{pk_x}" y="{pk_y}" as="targetPoint" />
@@ -264,7 +367,8 @@ class DrawioERDGenerator:
                     cell_id += 1
                     relation_idx += 1
 
-        return "\n".join(cells) + "\n" + "\n".join(relations_cells)
+        self.routing_stats = router.metrics()
+        return "\n".join(relations_cells)
 
     def create_full_drawio_xml(self):
         header = '''<?xml version="1.0" encoding="UTF-8"?>
@@ -281,12 +385,121 @@ class DrawioERDGenerator:
 </mxfile>'''
         return header + self.make_multiple_tables_drawio() + footer
 
-    def run(self):
+    def compact_report(self, compact_xml):
+        """
+        Vergelijkt de compacte uitvoer met de volledige uitvoer (cellen en bestandsgrootte) zonder
+        het ERD opnieuw te genereren of te routeren. Alleen de tabelcellen verschillen: die worden
+        op de al berekende posities in volledige vorm opgebouwd en verrekend met de compacte cel.
+        Relaties verschillen alleen in stijl en, zonder stabiele IDs, in de lengte van hun ID.
+        """
+        compact_cells, compact_size = compact_xml.count("<mxCell "), len(compact_xml.encode("utf-8"))
+        full_cells, full_size, full_id = compact_cells, compact_size, 2
+        for t in self._layout:
+            table_cells, next_id, *_ = self.make_table_drawio(t["json"], *t["pos"], start_id=full_id)
+            full_cells += 2 + 2 * len(t["json"]["fields"])
+            full_size += len(table_cells.encode("utf-8")) - t["bytes"]
+            full_id = next_id
+        edges = self.routing_stats.get("edges", 0)
+        full_size += len("endFill=1;") * edges
+        if not self.stable_ids:
+            compact_id = 2 + len(self._layout)
+            full_size += sum(len(str(full_id + k)) - len(str(compact_id + k)) for k in range(edges))
+        return {
+            "cells": (full_cells, compact_cells),
+            "bytes": (full_size, compact_size),
+            "cell_reduction": 1 - compact_cells / full_cells if full_cells else 0.0,
+            "size_reduction": 1 - compact_size / full_size if full_size else 0.0,
+        }
+
+    def patch(self, drawio_file=None):
+        """
+        Werkt een eerder gegenereerd ERD bij: alleen tabellen waarvan de definitie veranderde
+        (andere erdHash) en hun relaties worden opnieuw gegenereerd, op de positie waar de
+        gebruiker ze liet staan. Alle andere cellen en handmatige wijzigingen blijven behouden.
+        """
+        drawio_file = drawio_file or self.output_file
+        start = time.perf_counter()
+        self.stable_ids = True
+        patcher = DrawioPatcher(drawio_file)
+        existing = patcher.scan("tbl")
+
+        make_table = self.make_table_drawio_compact if self.compact else self.make_table_drawio
+        self._edge_styles = {}
+        new_tables = [t for t in self.tables_input if t["title"] not in existing]
+        columns = max(1, math.ceil(math.sqrt(len(new_tables))))
+        new_y, row_h, new_idx = patcher.bottom + self.padding if existing else 0, 0, 0
+
+        tables_info, changed, new_cells = [], set(), []
+        for table_json in self.tables_input:
+            title = table_json["title"]
+            old = existing.get(title)
+            if old is not None:
+                x, y = old["x"], old["y"]
+            else:
+                # Nieuwe tabellen in een raster onder de bestaande inhoud
+                if new_idx and new_idx % columns == 0:
+                    new_y += row_h + self.padding
+                    row_h = 0
+                x, y = (new_idx % columns) * (400 + self.padding), new_y
+                new_idx += 1
+            if old is None or old["hash"] != self.table_hash(table_json):
+                table_cells, _, w, h, data = make_table(table_json, x, y, 0)
+                changed.add(title)
+                new_cells.append(table_cells)
+            else:
+                # Ongewijzigde tabellen: alleen de geometrie voor de relaties
+                w, h, data = self.table_layout(table_json, x, y)
+            if old is None:
+                row_h = max(row_h, h)
+            tables_info.append({"json": table_json, "data": data, "pos": (x, y), "width": w, "height": h})
+
+        removed = set(existing) - {t["title"] for t in self.tables_input}
+        affected = changed | removed
+        regenerated_edges = {f"fk:{t['title']}.{f['name']}" for t in self.tables_input for f in t["fields"]
+                             if f["type"] == "FK" and f.get("references")
+                             and (t["title"] in affected or f["references"].get("table") in affected)}
+        new_cells.append(self.make_relations_drawio(tables_info, 0, only_tables=affected))
+
+        def drop(cell_id):
+            if cell_id.startswith("tbl:"):
+                return split_cell_id(cell_id)[1] in affected
+            if cell_id.startswith("fk:"):
+                return cell_id in regenerated_edges or cell_id[3:].rsplit(".", 1)[0] in affected
+            return False
+
+        counts = patcher.write(drop, new_cells)
+        elapsed = time.perf_counter() - start
+        print(f"✅ Drawio ERD bijgewerkt in: {drawio_file} ({len(changed)} tabel(len) vernieuwd, "
+              f"{len(removed)} verwijderd, {counts['kept']} cellen behouden, {elapsed * 1000:.0f} ms)")
+        return {"changed": sorted(changed), "removed": sorted(removed), **counts, "seconds": elapsed}
+
+    def run(self, patch=False):
         self.load_json()
+        if self.validate:
+            try:
+                SchemaValidator(self.tables_input, cycles="warning").check()
+            except SchemaValidationError as e:
+                print(f"⚠ ERD niet gegenereerd: {e}")
+                return
+        if patch:
+            # Ook een volledige hergeneratie in patch-modus krijgt stabiele IDs, zodat de volgende keer patchen lukt
+            self.stable_ids = True
+            if os.path.isfile(self.output_file):
+                try:
+                    return self.patch()
+                except ValueError as e:
+                    print(f"⚠ Patchen niet mogelijk ({e}); volledig opnieuw genereren.")
         xml_content = self.create_full_drawio_xml()
         with open(self.output_file, "w", encoding="utf-8") as f:
             f.write(xml_content)
         print(f"✅ Drawio ERD gegenereerd in: {self.output_file}")
+        if self.routing_stats.get("blocked"):
+            print(f"⚠ {self.routing_stats['blocked']} relatie(s) konden niet zonder overlap met tabellen gerouteerd worden.")
+        if self.compact:
+            report = self.compact_report(xml_content)
+            print(f"📉 Compacte modus: {report['cells'][0]} → {report['cells'][1]} cellen "
+                  f"(-{report['cell_reduction']:.0%}), {report['bytes'][0]} → {report['bytes'][1]} bytes "
+                  f"(-{report['size_reduction']:.0%})")
 
 
 
@@ -1,14 +1,26 @@
-import json
+from schemacache import load_schema
 
 class CRUDGenerator:
-    def __init__(self, json_path):
+    PLACEHOLDERS = {"sqlite": "?", "mysql": "%s", "postgresql": "%s"}
+
+    def __init__(self, json_path, db_type="mysql", batch_sizes=(10, 100), tables=None, variants=False):
+        """
+        db_type: bepaalt de placeholder ('?' voor SQLite, '%s' voor MySQL/PostgreSQL);
+                 de conversie gebeurt hier eenmalig in plaats van per uitvoering.
+        batch_sizes: aantal rijen/sleutels per bulk INSERT-, READ- en DELETE-template.
+        tables: een al geladen model; dan wordt json_path niet gelezen.
+        variants: ook de bulk- (INSERT_BATCH, READ_IN, DELETE_IN) en pagineringsvarianten
+                  genereren; standaard alleen READ, INSERT, UPDATE en DELETE.
+        """
         self.json_path = json_path
-        self.tables = self._load_tables()
+        self.placeholder = self.PLACEHOLDERS[db_type]
+        self.batch_sizes = batch_sizes
+        self.variants = variants
+        self.tables = tables if tables is not None else self._load_tables()
         self.crud_statements = {}
 
     def _load_tables(self):
-        with open(self.json_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_schema(self.json_path)
 
     def generate_crud(self):
         for table in self.tables:
@@ -22,16 +34,33 @@ class CRUDGenerator:
                 print(f"⚠️  Geen primaire sleutel gevonden voor tabel '{table_name}', overslaan...")
                 continue
 
+            ph = self.placeholder
             col_names = [f['name'] for f in columns]
-            insert_placeholders = ["%s"] * len(col_names)
-            update_assignments = [f"{col} = %s" for col in col_names]
-
-            self.crud_statements[table_name] = {
-                "READ": f"SELECT * FROM {table_name} WHERE {pk['name']} = %s;",
-                "INSERT": f"INSERT INTO {table_name} ({', '.join(col_names)}) VALUES ({', '.join(insert_placeholders)});",
-                "UPDATE": f"UPDATE {table_name} SET {', '.join(update_assignments)} WHERE {pk['name']} = %s;",
-                "DELETE": f"DELETE FROM {table_name} WHERE {pk['name']} = %s;"
+            row_placeholders = f"({', '.join([ph] * len(col_names))})"
+            update_assignments = [f"{col} = {ph}" for col in col_names]
+
+            statements = {
+                "READ": f"SELECT * FROM {table_name} WHERE {pk['name']} = {ph};",
+                "INSERT": f"INSERT INTO {table_name} ({', '.join(col_names)}) VALUES {row_placeholders};",
+                "UPDATE": f"UPDATE {table_name} SET {', '.join(update_assignments)} WHERE {pk['name']} = {ph};",
+                "DELETE": f"DELETE FROM {table_name} WHERE {pk['name']} = {ph};",
             }
+            if not self.variants:
+                self.crud_statements[table_name] = statements
+                continue
+
+            # Keyset-paginering: eerste pagina, daarna verder vanaf de laatst geziene PK
+            statements["READ_FIRST_PAGE"] = f"SELECT * FROM {table_name} ORDER BY {pk['name']} LIMIT {ph};"
+            statements["READ_PAGE"] = (f"SELECT * FROM {table_name} WHERE {pk['name']} > {ph} "
+                                       f"ORDER BY {pk['name']} LIMIT {ph};")
+            for size in self.batch_sizes:
+                in_list = f"({', '.join([ph] * size)})"
+                statements[f"INSERT_BATCH_{size}"] = (f"INSERT INTO {table_name} ({', '.join(col_names)}) "
+                                                      f"VALUES {', '.join([row_placeholders] * size)};")
+                statements[f"READ_IN_{size}"] = f"SELECT * FROM {table_name} WHERE {pk['name']} IN {in_list};"
+                statements[f"DELETE_IN_{size}"] = f"DELETE FROM {table_name} WHERE {pk['name']} IN {in_list};"
+
+            self.crud_statements[table_name] = statements
 
     def print_crud(self):
         for table, statements in self.crud_statements.items():
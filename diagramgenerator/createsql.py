@@ -1,16 +1,23 @@
 import json
 
+from schemacache import load_schema
+from schemavalidator import SchemaValidator, SchemaValidationError
+
 class SQLGenerator:
-    def __init__(self, json_file, output_file="output.sql", db_name="WebshopDB"):
+    def __init__(self, json_file, output_file="output.sql", db_name="WebshopDB", index_foreign_keys=True,
+                 validate=True, tables=None):
         self.json_file = json_file
+        # Een al geladen model (bv. gedeeld door meerdere CLI-subcommando's) wordt niet opnieuw ingelezen
+        self.tables = tables
         self.output_file = output_file
         self.db_name = db_name
+        self.index_foreign_keys = index_foreign_keys
+        self.validate = validate
         self.data = []
         self.created_tables = set()
 
     def load_json(self):
-        with open(self.json_file, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+        self.data = self.tables if self.tables is not None else load_schema(self.json_file)
 
     def generate_sql_field(self, field):
         line = f"{field['name']} {field['datatype']}"
@@ -36,8 +43,9 @@ class SQLGenerator:
                 ref = field.get("references", {})
                 ref_table = ref.get("table")
                 ref_field = ref.get("field")
-                if ref_table in self.created_tables:
-                    constraints.append(f"FOREIGN KEY ({field['name']}) REFERENCES {ref_table}({ref_field})")
+                if ref_table in self.created_tables or ref_table == table['title']:
+                    constraints.append(f"CONSTRAINT {self.foreign_key_name(table['title'], field['name'])} "
+                                       f"FOREIGN KEY ({field['name']}) REFERENCES {ref_table}({ref_field})")
                 else:
                     return None  # FK refereert naar niet-bestaande table
             else:
@@ -46,6 +54,44 @@ class SQLGenerator:
         full_definition = lines + constraints
         return f"CREATE TABLE {table['title']} (\n  " + ",\n  ".join(full_definition) + "\n);"
 
+    @staticmethod
+    def foreign_key_name(table_title, field_name):
+        # Vaste naam, zodat een migratie de constraint later weer kan droppen
+        return f"fk_{table_title}_{field_name}"
+
+    @staticmethod
+    def index_name(table_title, columns):
+        return f"idx_{table_title}_{'_'.join(columns)}"
+
+    def generate_index_sql(self, table):
+        """
+        Genereert CREATE INDEX statements voor een tabel:
+        - één index per FK-kolom (tenzij de kolom al UNIQUE is)
+        - extra samengestelde/covering indexes uit table["indexes"], bv.
+          {"columns": ["SpelerID", "WereldID"], "include": ["X"], "unique": false}
+        """
+        index_columns = []
+        if self.index_foreign_keys:
+            for field in table["fields"]:
+                if field["type"] == "FK" and not field.get("unique"):
+                    index_columns.append(([field["name"]], False))
+
+        for index in table.get("indexes", []):
+            # Covering: include-kolommen achteraan, zodat de index de query volledig kan bedienen
+            columns = list(index["columns"]) + [c for c in index.get("include", []) if c not in index["columns"]]
+            index_columns.append((columns, index.get("unique", False)))
+
+        statements, seen = [], set()
+        for columns, unique in index_columns:
+            key = tuple(columns)
+            if key in seen:
+                continue
+            seen.add(key)
+            name = self.index_name(table["title"], columns)
+            unique_sql = "UNIQUE " if unique else ""
+            statements.append(f"CREATE {unique_sql}INDEX {name} ON {table['title']} ({', '.join(columns)});")
+        return statements
+
     def generate_full_sql(self):
         sql_lines = [
             f"DROP DATABASE IF EXISTS {self.db_name};",
@@ -62,6 +108,7 @@ class SQLGenerator:
                 sql = self.convert_table_to_sql(table)
                 if sql:
                     sql_lines.append(sql)
+                    sql_lines.extend(self.generate_index_sql(table))
                     sql_lines.append("")
                     self.created_tables.add(table['title'])
                     remaining_tables.remove(table)
@@ -85,9 +132,13 @@ class SQLGenerator:
     def run(self):
         try:
             self.load_json()
+            if self.validate:
+                SchemaValidator(self.data).check()
             sql_script = self.generate_full_sql()
             self.save_sql_to_file(sql_script)
         except FileNotFoundError:
             print(f"⚠ Bestand '{self.json_file}' niet gevonden.")
         except json.JSONDecodeError as e:
             print(f"⚠ JSON fout: {e}")
+        except SchemaValidationError as e:
+            print(f"⚠ SQL niet gegenereerd: {e}")
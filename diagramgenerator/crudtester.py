@@ -1,9 +1,69 @@
 import sqlite3
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+
+class PKResultCache:
+    """
+    LRU cache for rows read by primary key, keyed by (table, pk).
+    Entries expire after `ttl` seconds (None = never).
+    """
+
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            rows, stored_at = entry
+            if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return rows
+            del self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, rows):
+        self.entries[key] = (rows, time.monotonic())
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        if self.entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
 
 class CRUDExecutor:
-    def __init__(self, db_type=None, **kwargs):
+    def __init__(self, db_type=None, cache_size=0, cache_ttl=None, **kwargs):
         """
         db_type: 'sqlite' (default), 'mysql', or 'postgresql'
+        cache_size: max number of (table, pk) READ results to cache; 0 disables the cache
+        cache_ttl: seconds a cached READ result stays valid (None = until invalidated)
         kwargs: connection parameters depending on db_type
 
         For SQLite (default):
@@ -16,6 +76,9 @@ class CRUDExecutor:
             - host, user, password, database, port (optional)
         """
         self.db_type = db_type or 'sqlite'
+        self.cache = PKResultCache(cache_size, cache_ttl) if cache_size > 0 else None
+        # query -> (table, action); gevuld via register_crud()
+        self._crud_queries = {}
 
         if self.db_type == 'sqlite':
             db_name = kwargs.get('db_name', 'default.db')
@@ -46,10 +109,64 @@ class CRUDExecutor:
         else:
             raise ValueError(f"Unsupported db_type '{self.db_type}'")
 
+    def register_crud(self, crud_statements):
+        """
+        Register the statements from CRUDGenerator.get_crud() so the executor can
+        recognise PK reads (cached) and the UPDATE/DELETE templates that invalidate them.
+        """
+        for table, statements in crud_statements.items():
+            for action, query in statements.items():
+                self._crud_queries[query] = (table, action)
+                self._crud_queries[self.format_query(query)] = (table, action)
+
+    # Begin van statements die rijen kunnen wijzigen; alleen die maken de cache ongeldig
+    WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE", "MERGE", "UPSERT", "ALTER", "DROP", "TRUNCATE")
+
+    @staticmethod
+    def _cache_key(table, pk):
+        # 1 en "1" zijn dezelfde rij: numerieke strings worden als int gesleuteld
+        if isinstance(pk, str) and pk.strip().lstrip("-").isdigit():
+            pk = int(pk)
+        return table, pk
+
+    def _invalidate(self, query, params):
+        table, action = self._crud_queries.get(query, (None, None))
+        if action == "UPDATE":
+            self.cache.invalidate(self._cache_key(table, params[-1]))
+        elif action == "DELETE" or (action or "").startswith("DELETE_IN_"):
+            for pk in params:
+                self.cache.invalidate(self._cache_key(table, pk))
+        elif action is None and query.lstrip().upper().startswith(self.WRITE_PREFIXES):
+            # Onbekende schrijfquery: we weten niet welke rijen wijzigen
+            self.cache.clear()
+
     def execute(self, query, params=(), fetch=False):
         """
         Execute a single query with optional parameters.
+        PK reads registered via register_crud() and run with fetch=True are served from the cache
+        when enabled. Writes invalidate it: the registered UPDATE/DELETE templates per row, other
+        INSERT/UPDATE/DELETE/DDL statements the whole cache. Numeric PKs given as strings share the
+        cache entry with their int value.
         """
+        if self.cache is not None:
+            table, action = self._crud_queries.get(query, (None, None))
+            if action == "READ" and fetch:
+                key = self._cache_key(table, params[0])
+                rows = self.cache.get(key)
+                if rows is None:
+                    rows = self._execute(query, params, fetch=True)
+                    # Lege resultaten niet cachen: een latere INSERT kan de rij alsnog aanmaken
+                    if rows:
+                        self.cache.put(key, rows)
+                return list(rows)
+            self._invalidate(query, params)
+        return self._execute(query, params, fetch)
+
+    def cache_stats(self):
+        """Return hit/miss counters of the PK read cache (None when disabled)."""
+        return self.cache.stats() if self.cache is not None else None
+
+    def _execute(self, query, params=(), fetch=False):
         try:
             self.cursor.execute(query, params)
             if fetch:
@@ -68,11 +185,19 @@ class CRUDExecutor:
     def format_query(self, query_template):
         """
         Optional helper to replace all %s with the correct placeholder for SQLite.
-        Use this if queries are defined with %s but target SQLite.
+        Use this if queries are defined with %s but target SQLite. Prefer generating the
+        statements with CRUDGenerator(db_type=...) so no conversion is needed at all;
+        converted templates are kept in a bounded LRU cache.
         """
-        if self.db_type == 'sqlite':
-            return query_template.replace("%s", "?")
-        return query_template
+        if self.db_type != 'sqlite':
+            return query_template
+        return _to_sqlite_placeholders(query_template)
+
+
+@lru_cache(maxsize=1024)
+def _to_sqlite_placeholders(query_template):
+    return query_template.replace("%s", "?")
+
 
 if __name__ == "__main__":
     executor = CRUDExecutor(
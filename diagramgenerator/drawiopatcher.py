@@ -0,0 +1,154 @@
+import mmap
+import os
+import re
+from xml.sax.saxutils import unescape
+
+HASH_PATTERN = re.compile(rb"(?:^|;)erdHash=([0-9a-f]+)")
+CELL_PATTERN = re.compile(rb'<(?:mxCell|object|UserObject)\s[^>]*?\bid="([^"]*)"')
+STYLE_PATTERN = re.compile(rb'<mxCell\s[^>]*?\bstyle="([^"]*)"')
+GEOMETRY_PATTERN = re.compile(rb"<mxGeometry(\s[^>]*)>")
+# y en height van een niet-relatieve geometrie; draw.io laat attributen met waarde 0 weg
+BOTTOM_PATTERN = re.compile(rb'<mxGeometry(?![^>]*\srelative="1")(?:[^>]*?\sy="([^"]*)")?(?:[^>]*?\sheight="([^"]*)")?')
+ATTRIBUTE_PATTERN = re.compile(rb'([\w:.-]+)="([^"]*)"')
+
+
+def split_cell_id(cell_id):
+    """'tbl:Speler:3' -> ('tbl', 'Speler', 3); 'fk:Ban.SpelerID' -> ('fk', 'Ban.SpelerID', None)."""
+    kind, sep, rest = (cell_id or "").partition(":")
+    if not sep:
+        return None, None, None
+    key, sep, n = rest.rpartition(":")
+    if sep and n.isdigit():
+        return kind, key, int(n)
+    return kind, rest, None
+
+
+class DrawioPatcher:
+    """
+    Werkt een bestaand .drawio-bestand bij zonder het volledig opnieuw op te bouwen.
+    Het bestand wordt via mmap één keer gescand zonder een XML-boom op te bouwen; daarna worden
+    behouden cellen als ruwe bytes gekopieerd en dus nooit opnieuw geserialiseerd.
+
+    Cellen van generatoren hebben IDs als <soort>:<sleutel>:<n>; de cel met n == 0 draagt de
+    inhoudshash (erdHash=... in de stijl) en de positie van het blok zoals de gebruiker het liet.
+    """
+
+    def __init__(self, drawio_file):
+        self.drawio_file = drawio_file
+        self.bottom = 0
+        self.cell_count = 0
+        self.root_end = None
+        self.spans = []
+        self.scanned = None
+
+    def scan(self, kind):
+        """
+        Geeft per blok van soort `kind` de hash en geometrie van de hoofdcel terug. Onthoudt
+        daarnaast de byte-spans van alle gegenereerde cellen (IDs met een <soort>:-prefix), zodat
+        write() ze zonder tweede pass kan overslaan of kopiëren.
+        """
+        groups, spans = {}, []
+        self.bottom, self.cell_count = 0, 0
+        with open(self.drawio_file, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                root_start = mm.find(b"<root>")
+                if root_start < 0:
+                    if mm.find(b"<diagram") >= 0 and mm.find(b"<mxGraphModel") < 0:
+                        raise ValueError(f"'{self.drawio_file}' bevat een gecomprimeerd diagram; patchen is niet mogelijk.")
+                    raise ValueError(f"'{self.drawio_file}' bevat geen <root>; patchen is niet mogelijk.")
+                self.root_end = mm.find(b"</root>", root_start)
+                if self.root_end < 0:
+                    raise ValueError(f"'{self.drawio_file}' is geen geldig diagram (geen </root>).")
+
+                # Elk kind van <root> heeft een id; een omhulde mxCell in <object> heeft er geen.
+                # Een cel loopt tot aan het begin van de volgende cel (of het einde van <root>).
+                cells = [(m.start(), m.group(1)) for m in CELL_PATTERN.finditer(mm, root_start, self.root_end)]
+                self.cell_count = len(cells)
+                ends = [start for start, _ in cells[1:]] + [self.root_end]
+                spans = [(start, end, _decode(cell_id)) for (start, cell_id), end in zip(cells, ends) if b":" in cell_id]
+
+                prefix = kind + ":"
+                for start, end, cell_id in spans:
+                    if not (cell_id.startswith(prefix) and cell_id.endswith(":0")):
+                        continue
+                    # Bij een <object>/<UserObject> staan stijl en geometrie op de omhulde mxCell
+                    cell = mm[start:end]
+                    style = STYLE_PATTERN.search(cell)
+                    geometry = GEOMETRY_PATTERN.search(cell)
+                    geometry = _attributes(geometry.group(1)) if geometry else {}
+                    match = HASH_PATTERN.search(style.group(1)) if style else None
+                    groups[split_cell_id(cell_id)[1]] = {
+                        "hash": match.group(1).decode() if match else None,
+                        "x": _number(geometry.get("x", 0)), "y": _number(geometry.get("y", 0)),
+                        "width": float(geometry.get("width", 0)), "height": float(geometry.get("height", 0))}
+
+                # Cellen zonder één gegenereerd blok (numerieke IDs van een ouder of handmatig diagram):
+                # niet erbij plakken, anders staat alles dubbel; de aanroeper genereert volledig opnieuw
+                if not groups and any(cell_id not in (b"0", b"1") for _, cell_id in cells):
+                    raise ValueError(f"'{self.drawio_file}' bevat geen gegenereerde {kind}:-IDs; "
+                                     f"patchen is niet mogelijk.")
+
+                # Onderkant van de inhoud, voor het plaatsen van nieuwe blokken. Gegenereerde cellen
+                # liggen binnen hun blok; alleen de overige (handmatige) cellen moeten gelezen worden.
+                bottoms = [group["y"] + group["height"] for group in groups.values()]
+                for (start, cell_id), end in zip(cells, ends):
+                    if b":" not in cell_id:
+                        bottoms.extend(float(y or 0) + float(height or 0)
+                                       for y, height in BOTTOM_PATTERN.findall(mm, start, end))
+                self.bottom = max(bottoms, default=0)
+            finally:
+                mm.close()
+        self.bottom = _number(self.bottom)
+        self.spans = spans
+        self.scanned = os.stat(self.drawio_file)
+        return groups
+
+    def write(self, drop, new_cells, output_file=None):
+        """
+        Schrijft het diagram opnieuw weg op basis van de spans uit scan(): gegenereerde cellen
+        waarvoor drop(id) waar is vervallen, alle andere cellen (ook handmatig toegevoegde of
+        verplaatste) worden als ruwe bytes overgenomen en nooit opnieuw geserialiseerd. new_cells
+        komt aan het einde van de eerste <root>.
+        """
+        stat = os.stat(self.drawio_file)
+        if (stat.st_mtime_ns, stat.st_size) != (self.scanned.st_mtime_ns, self.scanned.st_size):
+            raise ValueError(f"'{self.drawio_file}' is gewijzigd sinds de scan.")
+
+        output_file = output_file or self.drawio_file
+        tmp_file = output_file + ".tmp"
+        dropped = 0
+        with open(self.drawio_file, "rb") as src, open(tmp_file, "wb") as out:
+            mm = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                copy_from = 0
+                for start, end, cell_id in self.spans:
+                    if drop(cell_id):
+                        out.write(mm[copy_from:start])
+                        copy_from = end
+                        dropped += 1
+                out.write(mm[copy_from:self.root_end])
+                out.write(("".join(new_cells) + "\n").encode("utf-8"))
+                out.write(mm[self.root_end:])
+            except BaseException:
+                out.close()
+                os.remove(tmp_file)
+                raise
+            finally:
+                mm.close()
+        os.replace(tmp_file, output_file)
+        return {"kept": self.cell_count - dropped, "dropped": dropped}
+
+
+def _decode(value):
+    value = value.decode("utf-8")
+    return unescape(value, {"&quot;": '"', "&apos;": "'"}) if "&" in value else value
+
+
+def _attributes(source):
+    return {name.decode(): value.decode("utf-8") for name, value in ATTRIBUTE_PATTERN.findall(source)}
+
+
+def _number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
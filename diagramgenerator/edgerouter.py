@@ -0,0 +1,247 @@
+import bisect
+import math
+import time
+
+
+class SpatialGrid:
+    """
+    Uniform grid over de geplaatste blokken (tabellen of klassen). Een query met een
+    rechthoek (of een lijnsegment) bekijkt alleen de gridcellen die hij raakt, dus de kosten
+    hangen af van de lengte van het segment en niet van het aantal blokken in het diagram.
+    """
+
+    def __init__(self, cell_size=400, margin=0):
+        self.cell_size = cell_size
+        self.margin = margin
+        self.cells = {}
+        self.boxes = {}
+        self.queries = 0
+
+    @classmethod
+    def from_boxes(cls, boxes, margin=0):
+        """boxes: {sleutel: (x, y, breedte, hoogte)}; de celgrootte volgt de gemiddelde blokgrootte."""
+        if boxes:
+            average = sum(max(w, h) for _, _, w, h in boxes.values()) / len(boxes)
+            grid = cls(cell_size=max(50, int(average)), margin=margin)
+        else:
+            grid = cls(margin=margin)
+        for key, (x, y, w, h) in boxes.items():
+            grid.insert(key, x, y, w, h)
+        return grid
+
+    def _span(self, low, high):
+        return range(math.floor(low / self.cell_size), math.floor(high / self.cell_size) + 1)
+
+    def insert(self, key, x, y, w, h):
+        # Blokken worden met `margin` vergroot, zodat lijnen niet rakelings langs een rand lopen
+        box = (x - self.margin, y - self.margin, x + w + self.margin, y + h + self.margin)
+        self.boxes[key] = box
+        for cx in self._span(box[0], box[2]):
+            for cy in self._span(box[1], box[3]):
+                self.cells.setdefault((cx, cy), []).append(key)
+
+    def query(self, x1, y1, x2, y2, ignore=()):
+        """Geeft de blokken waarvan het inwendige de rechthoek (x1, y1)-(x2, y2) snijdt."""
+        self.queries += 1
+        if x1 > x2:
+            x1, x2 = x2, x1
+        if y1 > y2:
+            y1, y2 = y2, y1
+        hits, seen = [], set(ignore)
+        cells, boxes = self.cells, self.boxes
+        rows = self._span(y1, y2)
+        for cx in self._span(x1, x2):
+            for cy in rows:
+                bucket = cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for key in bucket:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    bx1, by1, bx2, by2 = boxes[key]
+                    if x1 < bx2 and x2 > bx1 and y1 < by2 and y2 > by1:
+                        hits.append(key)
+        return hits
+
+
+class LaneAllocator:
+    """
+    Verdeelt parallelle lijnen over banen rond een kanaal: 0, +step, -step, +2*step, ...
+    en begint opnieuw zodra `max_offset` bereikt is, zodat lijnen in hun kanaal blijven. O(1).
+    """
+
+    def __init__(self, step, max_offset):
+        self.step = step
+        self.lane_count = max(1, 2 * int(max_offset // step) + 1)
+        self.used = {}
+
+    def offset(self, key):
+        n = self.used.get(key, 0)
+        self.used[key] = n + 1
+        lane = n % self.lane_count
+        return ((lane + 1) // 2) * self.step * (1 if lane % 2 else -1)
+
+
+class OrthogonalRouter:
+    """
+    Orthogonale router voor relatielijnen. Een lijn loopt van de poort op het bronblok
+    horizontaal naar een verticaal kanaal (exit_x), via een horizontale corridor (corridor_y)
+    naar het kanaal bij het doelblok (entry_x) en zo naar de poort op het doelblok. Elk segment
+    wordt met één query op de SpatialGrid gecontroleerd; raakt het een blok, dan wordt het
+    kanaal of de corridor net voorbij die blokken gelegd en opnieuw gecontroleerd.
+    """
+
+    def __init__(self, boxes, clearance=10, max_attempts=4):
+        self.index = SpatialGrid.from_boxes(boxes, margin=clearance // 2)
+        self.clearance = clearance
+        self.max_attempts = max_attempts
+        self.edges = 0
+        self.rerouted = 0
+        self.blocked = 0
+        self.max_queries = 0
+        self.seconds = 0.0
+
+    def _points(self, start, end, exit_x, entry_x, corridor_y):
+        if corridor_y is None:
+            return [(exit_x, start[1]), (exit_x, end[1])]
+        return [(exit_x, start[1]), (exit_x, corridor_y), (entry_x, corridor_y), (entry_x, end[1])]
+
+    def route(self, start, end, exit_x, entry_x=None, corridor_y=None, source=None, target=None):
+        """
+        Geeft de tussenpunten van een obstakelvrije route (zo mogelijk).
+        start/end: poorten (x, y) op bron- en doelblok; source/target: hun sleutels in de index.
+        Zonder corridor_y loopt de lijn via één verticaal kanaal op exit_x. Lukt het niet met de
+        corridor bij de bron, dan wordt dezelfde corridor bij het doelblok geprobeerd.
+        """
+        began = time.perf_counter()
+        queries_before = self.index.queries
+        corridors = [corridor_y]
+        if corridor_y is not None and source in self.index.boxes and target in self.index.boxes:
+            mirrored = self.index.boxes[target][1] - (self.index.boxes[source][1] - corridor_y)
+            if mirrored != corridor_y:
+                corridors.append(mirrored)
+
+        clear, fallback, route = set(), None, None
+        for corridor in corridors:
+            state = (exit_x, entry_x, corridor)
+            route = self._attempt(start, end, state, source, target, clear)
+            if route is not None:
+                break
+            fallback = fallback or self._points(start, end, *state)
+        points = route if route is not None else fallback
+
+        queries = self.index.queries - queries_before
+        self.edges += 1
+        self.max_queries = max(self.max_queries, queries)
+        self.rerouted += points != self._points(start, end, exit_x, entry_x, corridor_y)
+        self.blocked += route is None
+        self.seconds += time.perf_counter() - began
+        return points
+
+    def _attempt(self, start, end, state, source, target, clear):
+        """Controleert de route segment voor segment en verlegt wat geblokkeerd is; None als het niet lukt."""
+        seen = set()
+        for _ in range(self.max_attempts):
+            if state in seen:
+                return None
+            seen.add(state)
+            points = self._points(start, end, *state)
+            path = [start] + points + [end]
+            hit = None
+            for i in range(len(path) - 1):
+                (x1, y1), (x2, y2) = path[i], path[i + 1]
+                segment = (x1, y1, x2, y2)
+                if segment in clear:
+                    continue
+                ignore = (source,) if i == 0 else (target,) if i == len(path) - 2 else ()
+                hits = self.index.query(x1, y1, x2, y2, ignore)
+                if not hits:
+                    clear.add(segment)
+                    continue
+                hit = (i, [self.index.boxes[key] for key in hits])
+                break
+            if hit is None:
+                return points
+            state = self._nudge(hit, start, end, *state)
+        return None
+
+    def _free_line(self, horizontal, position, span, low=-math.inf, high=math.inf):
+        """
+        Zoekt de vrije lijn het dichtst bij `position` die over `span` geen blok raakt: een
+        horizontale lijn (y) of een verticale lijn (x), binnen [low, high]. Eén query op een band
+        rond de lijn; alleen als de band te smal blijkt, wordt hij breder gemaakt.
+        """
+        window = self.index.cell_size / 2
+        for _ in range(2):
+            if horizontal:
+                keys = self.index.query(span[0], position - window, span[1], position + window)
+                intervals = sorted((self.index.boxes[key][1], self.index.boxes[key][3]) for key in keys)
+            else:
+                keys = self.index.query(position - window, span[0], position + window, span[1])
+                intervals = sorted((self.index.boxes[key][0], self.index.boxes[key][2]) for key in keys)
+            # Bezette intervallen samenvoegen; vrije kandidaten zijn de positie zelf en de randen
+            merged = []
+            for a, b in intervals:
+                if merged and a < merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], b)
+                else:
+                    merged.append([a, b])
+            best = None
+            for value in [position] + [edge for interval in merged for edge in interval]:
+                if not (low <= value <= high) or abs(value - position) >= window:
+                    continue
+                if best is not None and abs(value - position) >= abs(best - position):
+                    continue
+                k = bisect.bisect_right(merged, [value, math.inf]) - 1
+                if k < 0 or not (merged[k][0] < value < merged[k][1]):
+                    best = value
+            if best is not None:
+                return best
+            window *= 4
+        return None
+
+    def _nudge(self, hit, start, end, exit_x, entry_x, corridor_y):
+        """Verlegt het kanaal of de corridor van het geblokkeerde segment naar de dichtstbijzijnde vrije lijn."""
+        i, boxes = hit
+        gap = self.clearance
+        last = 4 if corridor_y is not None else 2
+        exit_left = exit_x < start[0]
+
+        if i == 0:
+            # Blok tussen de bronpoort en het kanaal: kanaal net voor dat blok
+            return (max(b[2] for b in boxes) + gap if exit_left else min(b[0] for b in boxes) - gap,
+                    entry_x, corridor_y)
+        if i == last:
+            # Blok tussen het kanaal en de doelpoort: kanaal net na dat blok
+            x = entry_x if corridor_y is not None else exit_x
+            x = max(b[2] for b in boxes) + gap if x < end[0] else min(b[0] for b in boxes) - gap
+            return (exit_x, x, corridor_y) if corridor_y is not None else (x, entry_x, corridor_y)
+        if i == 1:
+            # Verticaal kanaal bij de bron, aan dezelfde kant van het bronblok blijven
+            other_y = corridor_y if corridor_y is not None else end[1]
+            span = (min(start[1], other_y), max(start[1], other_y))
+            limits = (-math.inf, start[0] - gap) if exit_left else (start[0] + gap, math.inf)
+            x = self._free_line(False, exit_x, span, *limits)
+            return (x if x is not None else exit_x), entry_x, corridor_y
+        if i == 2:
+            span = (min(exit_x, entry_x), max(exit_x, entry_x))
+            y = self._free_line(True, corridor_y, span)
+            return exit_x, entry_x, (y if y is not None else corridor_y)
+        # Verticaal kanaal bij het doel, aan dezelfde kant van het doelblok blijven
+        span = (min(corridor_y, end[1]), max(corridor_y, end[1]))
+        limits = (-math.inf, end[0] - gap) if entry_x < end[0] else (end[0] + gap, math.inf)
+        x = self._free_line(False, entry_x, span, *limits)
+        return exit_x, (x if x is not None else entry_x), corridor_y
+
+    def metrics(self):
+        queries = self.index.queries
+        return {
+            "edges": self.edges,
+            "queries": queries,
+            "queries_per_edge": queries / self.edges if self.edges else 0.0,
+            "max_queries_per_edge": self.max_queries,
+            "rerouted": self.rerouted,
+            "blocked": self.blocked,
+            "seconds": self.seconds,
+        }
@@ -0,0 +1,115 @@
+import argparse
+import fnmatch
+import sys
+import time
+from collections import deque
+
+from compiler import DrawioERDGenerator
+from schemacache import load_schema
+
+
+class RelationshipIndex:
+    """
+    FK-adjacency-index over tables.json, in beide richtingen, eenmalig opgebouwd.
+    Hiermee worden deelselecties (focus-views) van het ERD berekend zonder
+    niet-gerelateerde tabellen te bekijken.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.by_title = {}
+        self.position = {}
+        self.outgoing = {}  # tabel -> tabellen waarnaar de FK's verwijzen
+        self.incoming = {}  # tabel -> tabellen die ernaar verwijzen
+
+        for i, table in enumerate(tables):
+            title = table["title"]
+            self.by_title[title] = table
+            self.position[title] = i
+            self.outgoing.setdefault(title, set())
+            self.incoming.setdefault(title, set())
+
+        for table in tables:
+            for field in table["fields"]:
+                ref = field.get("references")
+                if field["type"] == "FK" and ref and ref.get("table") in self.by_title:
+                    self.outgoing[table["title"]].add(ref["table"])
+                    self.incoming[ref["table"]].add(table["title"])
+
+    @classmethod
+    def from_json(cls, json_file):
+        return cls(load_schema(json_file))
+
+    def neighbourhood(self, title, hops=1):
+        """Tabel `title` plus alle tabellen binnen `hops` FK-stappen (beide richtingen)."""
+        if title not in self.by_title:
+            raise KeyError(f"Tabel '{title}' niet gevonden.")
+        seen = {title: 0}
+        queue = deque([title])
+        while queue:
+            current = queue.popleft()
+            depth = seen[current]
+            if depth == hops:
+                continue
+            for neighbour in self.outgoing[current] | self.incoming[current]:
+                if neighbour not in seen:
+                    seen[neighbour] = depth + 1
+                    queue.append(neighbour)
+        return self._ordered(seen)
+
+    def matching(self, pattern):
+        """Tabellen waarvan de naam op `pattern` (glob) past, plus hun FK-afsluiting."""
+        seeds = [title for title in self.by_title if fnmatch.fnmatchcase(title, pattern)]
+        seen = set(seeds)
+        stack = list(seeds)
+        while stack:
+            for target in self.outgoing[stack.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return self._ordered(seen)
+
+    def _ordered(self, titles):
+        # Originele volgorde uit tables.json behouden voor een stabiele layout
+        return [self.by_title[t] for t in sorted(titles, key=self.position.__getitem__)]
+
+    def render(self, tables, output_file, compact=False):
+        generator = DrawioERDGenerator(json_file=None, output_file=output_file, compact=compact)
+        generator.tables_input = tables
+        xml_content = generator.create_full_drawio_xml()
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(xml_content)
+        return xml_content
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genereer een focus-ERD rond één of meer tabellen.")
+    parser.add_argument("json_file", nargs="?", default="data/tables.json")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--table", help="centrale tabel")
+    group.add_argument("--pattern", help="glob-patroon van tabelnamen, bv. 'Crafting*'")
+    parser.add_argument("--hops", type=int, default=1, help="aantal FK-stappen rond --table")
+    parser.add_argument("-o", "--output", default="focus.drawio")
+    parser.add_argument("--compact", action="store_true")
+    args = parser.parse_args(argv)
+
+    index = RelationshipIndex.from_json(args.json_file)
+    start = time.perf_counter()
+    if args.table:
+        if args.table not in index.by_title:
+            print(f"⚠ Tabel '{args.table}' niet gevonden in '{args.json_file}'.")
+            return 1
+        tables = index.neighbourhood(args.table, args.hops)
+    else:
+        tables = index.matching(args.pattern)
+        if not tables:
+            print(f"⚠ Geen tabellen gevonden die op '{args.pattern}' passen; geen ERD gegenereerd.")
+            return 1
+    index.render(tables, args.output, compact=args.compact)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"✅ Focus-ERD met {len(tables)} tabel(len) gegenereerd in: {args.output} ({elapsed:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,276 @@
-from createsql import SQLGenerator
-from compiler import DrawioERDGenerator
-from sqlimporter import SQLImporter
-from createcrudtestscripts import CRUDGenerator
+import argparse
+import os
+import sys
+import time
 
-if __name__ == "__main__":
-    sqlgenerator = SQLGenerator(json_file="data/tables.json", output_file="output.sql", db_name="minecraft")
-    sqlgenerator.run()
-    erdgenerator = DrawioERDGenerator(json_file="data/tables.json", output_file="output.drawio")
-    erdgenerator.run()
-    generator = CRUDGenerator(json_path="data/tables.json")
-    generator.generate_crud()
-    generator.save_to_file()
-    #importer = SQLImporter()  # Maakt 'default.db' aan in de huidige map
-    #importer.import_sql_file('output.sql')
-    #importer.close()
-    #mysql:
-    importer = SQLImporter(
-        db_type='mysql',
-        host='localhost',
-        user='root',
-        password='D@vi7596',
-    )
-    importer.import_sql_file('output.sql')
-    importer.close()
-    #postgres:
-    #importer = SQLImporter(
-    #    db_type='postgresql',
-    #    host='localhost',
-    #    user='postgres',
-    #    password='wachtwoord',
-    #    database='WebshopDB'
-    #)
-    #importer.import_sql_file('output.sql')
-    #importer.close()
+# Alleen stdlib op moduleniveau: elk subcommando importeert zijn eigen generator pas bij gebruik,
+# zodat `main.py --help` of één subcommando niet betaalt voor de rest (zie benchmarks.bench_cli_startup).
+COMMANDS = ("sql", "erd", "crud", "classes", "usecases", "import", "bench")
+DEFAULT_COMMANDS = ("sql", "erd", "crud")
+CONFIG_FILE = "erdgenerator.json"
+
+DEFAULTS = {
+    "schema": "data/tables.json",
+    "sql": {"output": "output.sql", "db_name": "minecraft"},
+    "erd": {"output": "output.drawio", "compact": False, "patch": False},
+    "crud": {"output": "crudtestscripts.sql", "db_type": "mysql", "variants": False},
+    "classes": {"input": "data/classdiagram.json", "source": None, "output": "class_diagram.drawio"},
+    "usecases": {"input": "data/usecasediagram.json", "output": "use_case_diagram.drawio", "trace": False},
+    # Wachtwoorden staan nooit in de config of in de code: alleen de naam van de omgevingsvariabele
+    "import": {"file": None, "db_type": "sqlite", "db_name": "default.db", "host": "localhost", "user": None,
+               "database": None, "password_env": "ERDGEN_DB_PASSWORD"},
+    "bench": {"names": "startup"},
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Genereert SQL, ERD, CRUD-scripts, klassen- en use-case diagrammen. Meerdere subcommando's "
+                    "na elkaar (bv. 'sql erd crud') delen één ingeladen tables.json.")
+    parser.add_argument("commands", nargs="*", metavar="command",
+                        help=f"één of meer van: {', '.join(COMMANDS)} (standaard: {' '.join(DEFAULT_COMMANDS)})")
+    parser.add_argument("--config", help=f"JSON-configuratie (standaard '{CONFIG_FILE}' als die bestaat)")
+    parser.add_argument("--schema", help="tables.json voor sql, erd en crud")
+    parser.add_argument("--no-validate", action="store_true", help="schema niet valideren")
+
+    group = parser.add_argument_group("sql")
+    group.add_argument("--sql-output")
+    group.add_argument("--db-name", help="databasenaam in het SQL-script")
+    group = parser.add_argument_group("erd")
+    group.add_argument("--erd-output")
+    group.add_argument("--compact", action="store_true", default=None)
+    group.add_argument("--patch", action="store_true", default=None, help="bestaand .drawio-bestand bijwerken")
+    group = parser.add_argument_group("crud")
+    group.add_argument("--crud-output")
+    group.add_argument("--crud-db-type", choices=("sqlite", "mysql", "postgresql"))
+    group.add_argument("--crud-variants", action="store_true", default=None,
+                       help="ook bulk-, IN-lijst- en pagineringsvarianten genereren")
+    group = parser.add_argument_group("classes")
+    group.add_argument("--classes-input", help="klassenmodel (JSON)")
+    group.add_argument("--classes-source", help="map met Python-code; het model wordt daaruit geëxtraheerd "
+                       "(opgeslagen in data/classdiagram_extracted.json)")
+    group.add_argument("--classes-output")
+    group = parser.add_argument_group("usecases")
+    group.add_argument("--usecases-input", help="use-case model of glob-patroon (meerdere modellen -> batch)")
+    group.add_argument("--usecases-output", help="uitvoerbestand (één model of alle modellen als pagina's)")
+    group.add_argument("--trace", action="store_true", default=None,
+                       help="eerst de modellen uit user stories en narratives (bij)werken")
+    group = parser.add_argument_group("import")
+    group.add_argument("--import-file", help="SQL-bestand (standaard de uitvoer van sql)")
+    group.add_argument("--db-type", choices=("sqlite", "mysql", "postgresql"))
+    group.add_argument("--sqlite-db", help="SQLite-bestand")
+    group.add_argument("--host")
+    group.add_argument("--user")
+    group.add_argument("--database")
+    group.add_argument("--password-env", help="omgevingsvariabele met het databasewachtwoord")
+    group = parser.add_argument_group("bench")
+    group.add_argument("--bench", help="komma-gescheiden benchmarks, bv. 'startup,classes' of 'all'")
+    return parser
+
+
+class Options:
+    """Waarde per optie: vlag op de commandline, anders het configbestand, anders de standaardwaarde."""
+
+    FLAGS = {
+        ("sql", "output"): "sql_output", ("sql", "db_name"): "db_name",
+        ("erd", "output"): "erd_output", ("erd", "compact"): "compact", ("erd", "patch"): "patch",
+        ("crud", "output"): "crud_output", ("crud", "db_type"): "crud_db_type",
+        ("crud", "variants"): "crud_variants",
+        ("classes", "input"): "classes_input", ("classes", "source"): "classes_source",
+        ("classes", "output"): "classes_output",
+        ("usecases", "input"): "usecases_input", ("usecases", "output"): "usecases_output",
+        ("usecases", "trace"): "trace",
+        ("import", "file"): "import_file", ("import", "db_type"): "db_type", ("import", "db_name"): "sqlite_db",
+        ("import", "host"): "host", ("import", "user"): "user", ("import", "database"): "database",
+        ("import", "password_env"): "password_env",
+        ("bench", "names"): "bench",
+    }
+
+    def __init__(self, args, config):
+        self.args = args
+        self.config = config
+
+    def get(self, section, key=None):
+        if key is None:
+            value = getattr(self.args, section, None)
+            return value if value is not None else self.config.get(section, DEFAULTS[section])
+        value = getattr(self.args, self.FLAGS[(section, key)], None)
+        if value is not None:
+            return value
+        return self.config.get(section, {}).get(key, DEFAULTS[section][key])
+
+
+def load_config(path):
+    if path is None:
+        if not os.path.isfile(CONFIG_FILE):
+            return {}
+        path = CONFIG_FILE
+    import json
+
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    if isinstance(config.get("import"), dict) and "password" in config["import"]:
+        raise ValueError(f"'{path}' bevat een wachtwoord; gebruik 'password_env' met de naam van een "
+                         f"omgevingsvariabele.")
+    return config
+
+
+class Session:
+    """Eén CLI-aanroep: het tabelmodel wordt hooguit één keer geladen en gevalideerd."""
+
+    def __init__(self, options, commands=DEFAULT_COMMANDS):
+        self.options = options
+        # FK-cycli blokkeren alleen de CREATE-volgorde van het SQL-script
+        self.cycles = "error" if "sql" in commands else "warning"
+        self._tables = None
+        self.sql_file = None
+
+    def tables(self):
+        if self._tables is None:
+            from schemacache import load_schema
+
+            schema = self.options.get("schema")
+            self._tables = load_schema(schema)
+            if not self.options.args.no_validate:
+                from schemavalidator import SchemaValidator
+
+                SchemaValidator(self._tables, cycles=self.cycles).check()
+        return self._tables
+
+    def run_sql(self):
+        from createsql import SQLGenerator
+
+        generator = SQLGenerator(json_file=self.options.get("schema"), output_file=self.options.get("sql", "output"),
+                                 db_name=self.options.get("sql", "db_name"), validate=False, tables=self.tables())
+        generator.run()
+        self.sql_file = generator.output_file
+
+    def run_erd(self):
+        from compiler import DrawioERDGenerator
 
+        generator = DrawioERDGenerator(json_file=self.options.get("schema"),
+                                       output_file=self.options.get("erd", "output"),
+                                       compact=self.options.get("erd", "compact"), validate=False,
+                                       tables=self.tables())
+        generator.run(patch=self.options.get("erd", "patch"))
+
+    def run_crud(self):
+        from createcrudtestscripts import CRUDGenerator
+
+        generator = CRUDGenerator(json_path=self.options.get("schema"), db_type=self.options.get("crud", "db_type"),
+                                  tables=self.tables(), variants=self.options.get("crud", "variants"))
+        generator.generate_crud()
+        generator.save_to_file(self.options.get("crud", "output"))
+
+    def run_classes(self):
+        from classdiagramtest import DrawioClassDiagramGenerator, normalize_class_model
+
+        source = self.options.get("classes", "source")
+        if source:
+            from classextractor import PythonClassExtractor
+
+            # Eigen uitvoerbestand: het handgeschreven klassenmodel (classes.input) blijft onaangeroerd
+            model = PythonClassExtractor(source_root=source).run()
+        else:
+            from schemacache import load_schema
+
+            model = normalize_class_model(load_schema(self.options.get("classes", "input")))
+        output_file = self.options.get("classes", "output")
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(DrawioClassDiagramGenerator().run(model))
+        print(f"✅ Klassendiagram met {len(model)} klasse(n) gegenereerd in: {output_file}")
+
+    def run_usecases(self):
+        import glob
+
+        pattern = self.options.get("usecases", "input")
+        if self.options.get("usecases", "trace"):
+            from traceability import TraceabilityIndex
+
+            index = TraceabilityIndex(data_root=os.path.dirname(pattern.split("*", 1)[0]) or ".")
+            index.run()
+            pattern = os.path.join(os.path.dirname(pattern), index.output_name)
+        model_files = sorted(glob.glob(pattern, recursive=True))
+        if not model_files:
+            raise FileNotFoundError(pattern)
+        output_file = self.options.get("usecases", "output")
+        if len(model_files) > 1:
+            from usecasebatch import UseCaseBatchGenerator
+
+            UseCaseBatchGenerator(model_files, single_file=output_file).run()
+            return
+        from schemacache import load_schema
+        from usecasegenerator import DrawioUseCaseDiagramGenerator
+
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(DrawioUseCaseDiagramGenerator().run(load_schema(model_files[0])))
+        print(f"✅ Use-case diagram gegenereerd in: {output_file}")
+
+    def run_import(self):
+        from sqlimporter import SQLImporter
+
+        sql_file = self.options.get("import", "file") or self.sql_file or self.options.get("sql", "output")
+        db_type = self.options.get("import", "db_type")
+        if db_type == "sqlite":
+            importer = SQLImporter(db_name=self.options.get("import", "db_name"))
+        else:
+            password_env = self.options.get("import", "password_env")
+            password = os.environ.get(password_env)
+            if password is None:
+                raise ValueError(f"geen wachtwoord voor {db_type}: zet de omgevingsvariabele '{password_env}'.")
+            importer = SQLImporter(db_type=db_type, host=self.options.get("import", "host"),
+                                   user=self.options.get("import", "user") or ("root" if db_type == "mysql"
+                                                                                else "postgres"),
+                                   password=password, database=self.options.get("import", "database"))
+        try:
+            importer.import_sql_file(sql_file)
+        finally:
+            importer.close()
+
+    def run_bench(self):
+        import benchmarks
+
+        names = self.options.get("bench", "names")
+        names = list(benchmarks.BENCHMARKS) if names == "all" else [n.strip() for n in names.split(",") if n.strip()]
+        unknown = [name for name in names if name not in benchmarks.BENCHMARKS]
+        if unknown:
+            raise ValueError(f"onbekende benchmark(s): {', '.join(unknown)}")
+        failed = [name for name in names if benchmarks.BENCHMARKS[name]() is False]
+        if failed:
+            raise RuntimeError(f"benchmark(s) niet gehaald: {', '.join(failed)}")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    commands = list(dict.fromkeys(args.commands or DEFAULT_COMMANDS))
+    unknown = [command for command in commands if command not in COMMANDS]
+    if unknown:
+        print(f"❌ Onbekend subcommando: {', '.join(unknown)} (kies uit {', '.join(COMMANDS)})")
+        return 2
+    try:
+        session = Session(Options(args, load_config(args.config)), commands)
+    except (OSError, ValueError) as e:
+        print(f"❌ Configuratie niet geladen: {e}")
+        return 2
+
+    timings = []
+    for command in commands:
+        start = time.perf_counter()
+        try:
+            getattr(session, f"run_{command}")()
+        except FileNotFoundError as e:
+            print(f"⚠ {command}: bestand '{e.filename or e}' niet gevonden.")
+            return 1
+        except Exception as e:
+            # Validatiefouten, ontbrekende drivers, databasefouten: melden en de rest niet meer uitvoeren
+            print(f"❌ {command} mislukt: {e}")
+            return 1
+        timings.append(f"{command} {(time.perf_counter() - start) * 1000:.0f} ms")
+    if len(timings) > 1:
+        print(f"⏱ {', '.join(timings)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import sqlite3
+
+from createcrudtestscripts import CRUDGenerator
+from sqlimporter import SQLImporter
+
+
+class QueryPlanChecker:
+    """
+    Importeert een gegenereerd SQL-script in een lokale SQLite-database (standaard in-memory)
+    en controleert met EXPLAIN QUERY PLAN of de READ, UPDATE en DELETE statements van
+    CRUDGenerator (inclusief de bulk- en pagina-varianten) een index gebruiken. Voor elke FK
+    wordt ook de lookup gecontroleerd die een DELETE op de oudertabel uitvoert
+    (SELECT ... FROM kind WHERE fk = ?).
+    """
+
+    CHECKED_ACTIONS = ("READ", "UPDATE", "DELETE")
+    # De eerste pagina leest per definitie vanaf het begin van de PK-index (begrensd door LIMIT)
+    SKIPPED_ACTIONS = ("READ_FIRST_PAGE",)
+
+    def __init__(self, json_path, sql_file="output.sql", db_name=":memory:"):
+        self.json_path = json_path
+        self.sql_file = sql_file
+        self.db_name = db_name
+        self.problems = []
+
+    def _import_schema(self, conn):
+        for stmt in SQLImporter.parse_sql_file(self.sql_file):
+            if SQLImporter.is_supported(stmt, 'sqlite'):
+                conn.execute(stmt)
+
+    def _statements_to_check(self, generator):
+        for table_name, statements in generator.get_crud().items():
+            for action, query in statements.items():
+                if action.split("_")[0] in self.CHECKED_ACTIONS and action not in self.SKIPPED_ACTIONS:
+                    yield table_name, action, query
+
+        for table in generator.tables:
+            for field in table["fields"]:
+                if field["type"] == "FK" and field.get("references"):
+                    yield (table["title"], f"FK {field['name']}",
+                           f"SELECT 1 FROM {table['title']} WHERE {field['name']} = {generator.placeholder};")
+
+    def check(self):
+        generator = CRUDGenerator(json_path=self.json_path, db_type="sqlite", variants=True)
+        generator.generate_crud()
+
+        conn = sqlite3.connect(self.db_name)
+        try:
+            self._import_schema(conn)
+            self.problems = []
+            for table_name, action, query in self._statements_to_check(generator):
+                params = (None,) * query.count("?")
+                plan = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+                scans = [row[-1] for row in plan if row[-1].startswith("SCAN")]
+                if scans:
+                    self.problems.append({"table": table_name, "action": action, "query": query,
+                                          "plan": scans})
+        finally:
+            conn.close()
+        return self.problems
+
+    def run(self):
+        problems = self.check()
+        if not problems:
+            print("✅ Alle CRUD-statements gebruiken een index.")
+            return True
+        for problem in problems:
+            print(f"⚠ {problem['table']} {problem['action']}: {'; '.join(problem['plan'])}")
+        print(f"❌ {len(problems)} statement(s) scannen een volledige tabel.")
+        return False
+
+
+if __name__ == "__main__":
+    checker = QueryPlanChecker(json_path="data/tables.json", sql_file="output.sql")
+    checker.run()
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+
+# Bestandsindeling van het gecompileerde schema (<bron>.erdcache, naast de JSON):
+#   header : magic, versie, bron-mtime (ns), bron-grootte, sha256 van de bron, offset/lengte van de index
+#   blobs  : één pickle per top-level element (tabel, klasse, ...) of per top-level sleutel
+#   index  : pickle met het type van de top-level JSON, de sleutels/namen en (offset, lengte) per blob
+# Lezers mappen het bestand en unpicklen alleen de index; elementen worden pas bij gebruik gedecodeerd.
+MAGIC = b"ERDC"
+VERSION = 1
+HEADER = struct.Struct("<4sHQQ32sQQ")
+CACHE_SUFFIX = ".erdcache"
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def cache_path_for(json_file):
+    return json_file + CACHE_SUFFIX
+
+
+def compile_schema(json_file, cache_file=None):
+    """Parset de JSON eenmalig en schrijft het binaire artefact naast de bron."""
+    cache_file = cache_file or cache_path_for(json_file)
+    stat = os.stat(json_file)
+    source_hash = _hash_file(json_file)
+    with open(json_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        kind, keys, items = "dict", list(data), list(data.values())
+        names = keys
+    else:
+        kind, keys, items = "list", None, data
+        names = [item.get("title", item.get("name")) if isinstance(item, dict) else None for item in items]
+
+    # Eigen tijdelijk bestand per schrijver: parallelle compiles (bv. de batch-pool) lopen elkaar niet in de weg
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(cache_file) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"\0" * HEADER.size)
+            spans = []
+            for item in items:
+                blob = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+                spans.append((f.tell(), len(blob)))
+                f.write(blob)
+            index_offset = f.tell()
+            index_blob = pickle.dumps({"kind": kind, "keys": keys, "names": names, "spans": spans},
+                                      protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(index_blob)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, stat.st_mtime_ns, stat.st_size, source_hash,
+                                index_offset, len(index_blob)))
+        os.replace(tmp_file, cache_file)
+    except BaseException:
+        os.unlink(tmp_file)
+        raise
+    return data
+
+
+class MappedSchema:
+    """
+    Read-only, memory-mapped view op een gecompileerd schema. Elementen worden pas
+    gedecodeerd wanneer ze opgevraagd worden (op positie of op titel/naam/sleutel).
+    """
+
+    def __init__(self, cache_file):
+        with open(cache_file, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.source_mtime_ns, self.source_size, self.source_hash,
+         index_offset, index_length) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"'{cache_file}' is geen geldig schema-artefact (versie {VERSION}).")
+        index = pickle.loads(self._mm[index_offset:index_offset + index_length])
+        self.kind = index["kind"]
+        self.keys = index["keys"]
+        self.names = index["names"]
+        self._spans = index["spans"]
+        self._by_name = {name: i for i, name in enumerate(self.names) if name is not None}
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __getitem__(self, key):
+        i = key if isinstance(key, int) else self._by_name[key]
+        offset, length = self._spans[i]
+        return pickle.loads(self._mm[offset:offset + length])
+
+    def __iter__(self):
+        for i in range(len(self._spans)):
+            yield self[i]
+
+    def load(self):
+        """Decodeert alles naar dezelfde Python-structuur als json.load."""
+        items = list(self)
+        return dict(zip(self.keys, items)) if self.kind == "dict" else items
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_cache(json_file, cache_file):
+    """(geldig, header) waarbij header alleen gezet is als de header een nieuwe bron-mtime nodig heeft."""
+    try:
+        with open(cache_file, "rb") as f:
+            header = f.read(HEADER.size)
+        magic, version, mtime_ns, size, source_hash, index_offset, index_length = HEADER.unpack(header)
+    except (OSError, struct.error):
+        return False, None
+    if magic != MAGIC or version != VERSION:
+        return False, None
+    stat = os.stat(json_file)
+    if stat.st_mtime_ns == mtime_ns and stat.st_size == size:
+        return True, None
+    if stat.st_size != size or _hash_file(json_file) != source_hash:
+        return False, None
+    # Alleen de mtime is veranderd (bv. na een checkout): inhoud is gelijk, header moet bij
+    return True, HEADER.pack(MAGIC, VERSION, stat.st_mtime_ns, size, source_hash, index_offset, index_length)
+
+
+def is_cache_valid(json_file, cache_file=None):
+    """Geldig als mtime en grootte overeenkomen, of anders als de sha256 van de bron overeenkomt. Schrijft niets."""
+    return _check_cache(json_file, cache_file or cache_path_for(json_file))[0]
+
+
+def open_schema(json_file):
+    """Geeft een MappedSchema terug en (her)compileert het artefact alleen als dat nodig is."""
+    cache_file = cache_path_for(json_file)
+    valid, refreshed_header = _check_cache(json_file, cache_file)
+    if not valid:
+        compile_schema(json_file, cache_file)
+    elif refreshed_header is not None:
+        # Zelfde inhoud, nieuwe mtime: alleen de header bijwerken, zodat de volgende keer de hash niet nodig is
+        with open(cache_file, "r+b") as f:
+            f.write(refreshed_header)
+    return MappedSchema(cache_file)
+
+
+def load_schema(json_file):
+    """
+    Drop-in vervanger voor json.load op tables.json, classdiagram.json en usecasediagram.json.
+    Valt terug op gewone JSON als het artefact niet geschreven kan worden.
+    """
+    try:
+        with open_schema(json_file) as schema:
+            return schema.load()
+    except OSError:
+        with open(json_file, "r", encoding="utf-8") as f:
+            return json.load(f)
@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlimporter import SQLImporter
+
+
+class SchemaDeployer:
+    """
+    Rolt hetzelfde SQL-script tegelijk uit naar meerdere databases.
+
+    targets: lijst met SQLImporter-kwargs per doel, bv.
+        [{"db_type": "sqlite", "db_name": "shard01.db"},
+         {"db_type": "postgresql", "host": "...", "user": "...", "password": "...", "database": "..."}]
+    Het script wordt één keer geparst; elk doel krijgt een eigen verbinding en transactie.
+    Elk doel verbindt direct met zijn eigen database; DROP/CREATE DATABASE en USE uit het
+    script worden daarom voor alle dialecten weggelaten.
+    """
+
+    def __init__(self, targets, max_workers=8):
+        self.targets = targets
+        self.max_workers = max_workers
+        self.results = []
+        self.elapsed = 0.0
+
+    @staticmethod
+    def describe(target):
+        db_type = target.get("db_type") or "sqlite"
+        if db_type == "sqlite":
+            return f"sqlite:{target.get('db_name', 'default.db')}"
+        return f"{db_type}:{target.get('host', 'localhost')}/{target.get('database', '')}"
+
+    def _deploy_one(self, target, statements):
+        start = time.perf_counter()
+        result = {"target": self.describe(target), "ok": False, "seconds": 0.0, "error": None}
+        importer = None
+        try:
+            if (target.get("db_type") or "sqlite") != "sqlite" and not target.get("database"):
+                raise ValueError("geen 'database' opgegeven")
+            importer = SQLImporter(**target)
+            importer.execute_statements(statements)
+            result["ok"] = True
+        except Exception as e:
+            result["error"] = str(e)
+        finally:
+            if importer is not None:
+                importer.close()
+            result["seconds"] = time.perf_counter() - start
+        return result
+
+    def deploy(self, filepath):
+        # Elk doel is al met zijn eigen database verbonden
+        statements = [s for s in SQLImporter.parse_sql_file(filepath) if not SQLImporter.is_database_statement(s)]
+        # Filteren per dialect gebeurt één keer per db_type, niet per doel
+        per_type = {}
+        for target in self.targets:
+            db_type = target.get("db_type") or "sqlite"
+            if db_type not in per_type:
+                per_type[db_type] = [s for s in statements if SQLImporter.is_supported(s, db_type)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self._deploy_one, target, per_type[target.get("db_type") or "sqlite"])
+                       for target in self.targets]
+            self.results = [future.result() for future in futures]
+        self.elapsed = time.perf_counter() - start
+        return self.results
+
+    def report(self):
+        for result in self.results:
+            if result["ok"]:
+                print(f"✅ {result['target']} ({result['seconds']:.2f}s)")
+            else:
+                print(f"❌ {result['target']} ({result['seconds']:.2f}s): {result['error']}")
+        failed = sum(not r["ok"] for r in self.results)
+        print(f"{len(self.results) - failed}/{len(self.results)} doelen geslaagd in {self.elapsed:.2f}s")
+
+    def run(self, filepath):
+        self.deploy(filepath)
+        self.report()
+        return all(r["ok"] for r in self.results)
+
+
+if __name__ == "__main__":
+    shards = [{"db_type": "sqlite", "db_name": f"shard{i:02d}.db"} for i in range(4)]
+    deployer = SchemaDeployer(shards)
+    deployer.run("output.sql")
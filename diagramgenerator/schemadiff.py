@@ -0,0 +1,287 @@
+import json
+
+from createsql import SQLGenerator
+from schemacache import load_schema
+from schemaintrospector import SchemaIntrospector
+
+
+class SchemaDiffer:
+    """
+    Vergelijkt twee revisies van tables.json (of een revisie met een live SQLite-database)
+    en genereert de minimale, geordende migratie in plaats van DROP DATABASE.
+
+    dialect: 'mysql' (default), 'postgresql' of 'sqlite'
+    """
+
+    def __init__(self, old_source, new_json_file, output_file="migration.sql", dialect="mysql"):
+        self.old_source = old_source
+        self.new_json_file = new_json_file
+        self.output_file = output_file
+        self.dialect = dialect
+        self.old_tables = []
+        self.new_tables = []
+
+    def load(self):
+        self.new_tables = load_schema(self.new_json_file)
+
+        if self.old_source.endswith(".json"):
+            self.old_tables = load_schema(self.old_source)
+        else:
+            introspector = SchemaIntrospector(db_name=self.old_source)
+            try:
+                self.old_tables = introspector.introspect()
+            finally:
+                introspector.close()
+
+    @staticmethod
+    def _field_signature(field):
+        references = field.get("references") or {}
+        # Een PK is altijd uniek; de introspector zet dat expliciet, tables.json meestal niet
+        is_pk = field.get("type") == "PK"
+        return (field.get("type", ""), field["datatype"].strip().upper(), bool(field.get("not_null")),
+                bool(field.get("unique")) or is_pk, references.get("table"), references.get("field"))
+
+    def _order_new_tables(self, tables):
+        """Topologische sortering (Kahn) zodat FK-doelen eerst worden aangemaakt."""
+        by_title = {t["title"]: t for t in tables}
+        dependents = {title: [] for title in by_title}
+        pending = {}
+        for table in tables:
+            deps = {f["references"]["table"] for f in table["fields"]
+                    if f["type"] == "FK" and f.get("references")
+                    and f["references"]["table"] in by_title and f["references"]["table"] != table["title"]}
+            pending[table["title"]] = len(deps)
+            for dep in deps:
+                dependents[dep].append(table["title"])
+
+        queue = [title for title, count in pending.items() if count == 0]
+        ordered = []
+        for title in queue:
+            ordered.append(by_title[title])
+            for dependent in dependents[title]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    queue.append(dependent)
+        skipped = [t for t in tables if pending[t["title"]] > 0]
+        return ordered, skipped
+
+    @staticmethod
+    def _is_foreign_key(field):
+        return field.get("type") == "FK" and bool(field.get("references"))
+
+    def _has_fk_index(self, field, sql_generator):
+        # generate_index_sql maakt idx_<tabel>_<kolom> voor elke niet-unieke FK-kolom
+        return sql_generator.index_foreign_keys and self._is_foreign_key(field) and not field.get("unique")
+
+    def _add_foreign_key(self, table, field, sql_generator):
+        ref = field["references"]
+        return [f"ALTER TABLE {table} ADD CONSTRAINT {sql_generator.foreign_key_name(table, field['name'])} "
+                f"FOREIGN KEY ({field['name']}) REFERENCES {ref['table']}({ref['field']});"]
+
+    def _drop_foreign_key(self, table, field, sql_generator):
+        """Constraint en FK-index droppen; moet vóór het wijzigen of droppen van de kolom gebeuren."""
+        statements = []
+        if self._is_foreign_key(field):
+            name = sql_generator.foreign_key_name(table, field["name"])
+            if self.dialect == "mysql":
+                statements.append(f"ALTER TABLE {table} DROP FOREIGN KEY {name};")
+            else:
+                # Ook de standaardnaam van PostgreSQL voor constraints zonder eigen naam
+                statements.append(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name};")
+                statements.append(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS "
+                                  f"{table.lower()}_{field['name'].lower()}_fkey;")
+        if self._has_fk_index(field, sql_generator):
+            index = sql_generator.index_name(table, [field["name"]])
+            statements.append(f"DROP INDEX {index} ON {table};" if self.dialect == "mysql"
+                              else f"DROP INDEX IF EXISTS {index};")
+        return statements
+
+    def _add_column(self, table, field, sql_generator):
+        column = sql_generator.generate_sql_field(field)
+        statements = []
+        if self.dialect == "sqlite":
+            if self._is_foreign_key(field):
+                ref = field["references"]
+                column += f" REFERENCES {ref['table']}({ref['field']})"
+            statements.append(f"ALTER TABLE {table} ADD COLUMN {column};")
+            statements.extend(sql_generator.generate_index_sql({"title": table, "fields": [field]}))
+            return statements
+
+        # Index vóór de constraint, anders maakt MySQL er zelf nog een tweede bij
+        statements.append(f"ALTER TABLE {table} ADD COLUMN {column};")
+        statements.extend(sql_generator.generate_index_sql({"title": table, "fields": [field]}))
+        if self._is_foreign_key(field):
+            statements.extend(self._add_foreign_key(table, field, sql_generator))
+        return statements
+
+    def _modify_column(self, table, old_field, field, sql_generator):
+        """
+        Geeft (drop, modify, add): constraints die eerst weg moeten, de kolomwijziging zelf en
+        constraints die daarna terugkomen. Een FK wordt bij elke wijziging gedropt en opnieuw
+        aangemaakt (ander doel, ander type, FK-status erbij of eraf); hetzelfde voor de PK.
+        """
+        drop, modify, add = [], [], []
+        fk_changed = self._is_foreign_key(old_field) or self._is_foreign_key(field)
+        if fk_changed:
+            drop.extend(self._drop_foreign_key(table, old_field, sql_generator))
+        was_pk, is_pk = old_field.get("type") == "PK", field.get("type") == "PK"
+        if was_pk and not is_pk:
+            drop.append(f"ALTER TABLE {table} DROP PRIMARY KEY;" if self.dialect == "mysql"
+                        else f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table.lower()}_pkey;")
+
+        if self.dialect == "mysql":
+            modify.append(f"ALTER TABLE {table} MODIFY COLUMN {sql_generator.generate_sql_field(field)};")
+        else:
+            null_clause = "SET NOT NULL" if field.get("not_null") else "DROP NOT NULL"
+            modify.extend([f"ALTER TABLE {table} ALTER COLUMN {field['name']} TYPE {field['datatype']};",
+                           f"ALTER TABLE {table} ALTER COLUMN {field['name']} {null_clause};"])
+
+        if is_pk and not was_pk:
+            add.append(f"ALTER TABLE {table} ADD PRIMARY KEY ({field['name']});")
+        if fk_changed and self._has_fk_index(field, sql_generator):
+            add.extend(sql_generator.generate_index_sql({"title": table, "fields": [field]}))
+        if fk_changed and self._is_foreign_key(field):
+            add.extend(self._add_foreign_key(table, field, sql_generator))
+        return drop, modify, add
+
+    NUMERIC_TYPES = {"INT", "INTEGER", "BIGINT", "SMALLINT", "TINYINT", "FLOAT", "DOUBLE", "REAL", "DECIMAL",
+                     "NUMERIC", "BOOLEAN", "BOOL", "BIT"}
+    TEMPORAL_DEFAULTS = {"DATE": "'1970-01-01'", "DATETIME": "'1970-01-01 00:00:00'",
+                         "TIMESTAMP": "'1970-01-01 00:00:00'", "TIME": "'00:00:00'"}
+
+    @classmethod
+    def _fill_value(cls, field):
+        """Waarde voor een nieuwe NOT NULL-kolom in bestaande rijen: de default uit het schema of een lege waarde."""
+        default = field.get("default")
+        if isinstance(default, bool):
+            return "1" if default else "0"
+        if isinstance(default, (int, float)):
+            return str(default)
+        if default is not None:
+            return "'" + str(default).replace("'", "''") + "'"
+        base = field["datatype"].upper().split("(")[0].strip()
+        if base in cls.NUMERIC_TYPES:
+            return "0"
+        return cls.TEMPORAL_DEFAULTS.get(base, "''")
+
+    def _rebuild_table(self, old_table, table, sql_generator):
+        """
+        SQLite kan kolommen en constraints niet wijzigen: nieuwe tabel aanmaken, gedeelde
+        kolommen kopiëren, oude tabel droppen en hernoemen (de procedure uit de SQLite-docs).
+        Nieuwe NOT NULL-kolommen krijgen bij het kopiëren hun default of een lege waarde.
+        PRAGMA foreign_keys staat rond het hele script (zie generate_migration_sql).
+        """
+        title = table["title"]
+        tmp_title = f"{title}_new"
+        create = sql_generator.convert_table_to_sql(table)
+        if create is None:
+            return [f"-- {title} kon niet opnieuw opgebouwd worden vanwege ongeldige FK-verwijzingen"]
+        # Alleen de tabelnaam wijzigt; constraintnamen blijven die van de definitieve tabel
+        create = create.replace(f"CREATE TABLE {title} (", f"CREATE TABLE {tmp_title} (", 1)
+        old_names = {f["name"] for f in old_table["fields"]}
+        columns, values = [], []
+        for field in table["fields"]:
+            if field["name"] in old_names:
+                columns.append(field["name"])
+                values.append(field["name"])
+            elif field.get("not_null") and field.get("type") != "PK":
+                columns.append(field["name"])
+                values.append(self._fill_value(field))
+        statements = [create]
+        if columns:
+            statements.append(f"INSERT INTO {tmp_title} ({', '.join(columns)}) "
+                              f"SELECT {', '.join(values)} FROM {title};")
+        statements.extend([f"DROP TABLE {title};", f"ALTER TABLE {tmp_title} RENAME TO {title};"])
+        statements.extend(sql_generator.generate_index_sql(table))
+        return statements
+
+    def generate_migration_sql(self):
+        old_by_title = {t["title"]: t for t in self.old_tables}
+        new_by_title = {t["title"]: t for t in self.new_tables}
+
+        sql_generator = SQLGenerator(json_file=self.new_json_file)
+        sql_generator.created_tables = {title for title in old_by_title if title in new_by_title}
+
+        create_lines, add_lines, modify_lines, drop_column_lines, drop_table_lines = [], [], [], [], []
+        drop_constraint_lines, add_constraint_lines = [], []
+        rebuilt = False
+
+        # 1. Nieuwe tabellen, in FK-volgorde
+        created = [t for t in self.new_tables if t["title"] not in old_by_title]
+        ordered, skipped = self._order_new_tables(created)
+        for table in ordered:
+            sql = sql_generator.convert_table_to_sql(table)
+            if sql is None:
+                skipped.append(table)
+                continue
+            create_lines.extend([sql] + sql_generator.generate_index_sql(table) + [""])
+            sql_generator.created_tables.add(table["title"])
+
+        # 2. Gewijzigde tabellen: velden via hash-lookup vergelijken
+        for table in self.new_tables:
+            old_table = old_by_title.get(table["title"])
+            if old_table is None:
+                continue
+            old_fields = {f["name"]: f for f in old_table["fields"]}
+            new_names = {f["name"] for f in table["fields"]}
+            added = [f for f in table["fields"] if f["name"] not in old_fields]
+            changed = [(old_fields[f["name"]], f) for f in table["fields"] if f["name"] in old_fields
+                       and self._field_signature(old_fields[f["name"]]) != self._field_signature(f)]
+            dropped = [f for f in old_table["fields"] if f["name"] not in new_names]
+
+            # SQLite kan ook geen NOT NULL-kolom zonder default toevoegen
+            if self.dialect == "sqlite" and (changed or dropped or any(f.get("not_null") for f in added)):
+                modify_lines.extend(self._rebuild_table(old_table, table, sql_generator))
+                rebuilt = True
+                continue
+            for field in added:
+                add_lines.extend(self._add_column(table["title"], field, sql_generator))
+            for old_field, field in changed:
+                drop, modify, add = self._modify_column(table["title"], old_field, field, sql_generator)
+                drop_constraint_lines.extend(drop)
+                modify_lines.extend(modify)
+                add_constraint_lines.extend(add)
+            for field in dropped:
+                drop_constraint_lines.extend(self._drop_foreign_key(table["title"], field, sql_generator))
+                drop_column_lines.append(f"ALTER TABLE {table['title']} DROP COLUMN {field['name']};")
+
+        # 3. Verwijderde tabellen: verwijzende tabellen eerst droppen
+        removed = [t for t in self.old_tables if t["title"] not in new_by_title]
+        removed_order, cyclic = self._order_new_tables(removed)
+        for table in reversed(removed_order + cyclic):
+            drop_table_lines.append(f"DROP TABLE IF EXISTS {table['title']};")
+
+        sql_lines = (create_lines + drop_constraint_lines + add_lines + modify_lines + add_constraint_lines
+                     + drop_column_lines + drop_table_lines)
+        if rebuilt:
+            # SQLite negeert deze PRAGMA binnen een transactie: daarom rond het hele script, en
+            # SQLImporter.execute_statements voert ze buiten de transactie uit
+            sql_lines = ["PRAGMA foreign_keys = OFF;"] + sql_lines + ["PRAGMA foreign_keys = ON;"]
+        if skipped:
+            sql_lines.append("-- Tabellen die niet konden worden aangemaakt vanwege ongeldige FK-verwijzingen:")
+            for table in skipped:
+                sql_lines.append(f"-- {table['title']}")
+        if not sql_lines:
+            sql_lines.append("-- Geen schemawijzigingen gevonden.")
+        return "\n".join(sql_lines)
+
+    def save_sql_to_file(self, sql_code):
+        with open(self.output_file, 'w', encoding='utf-8') as f:
+            f.write(sql_code)
+        print(f"✅ Migratiescript succesvol opgeslagen als: {self.output_file}")
+
+    def run(self):
+        try:
+            self.load()
+            sql_script = self.generate_migration_sql()
+            self.save_sql_to_file(sql_script)
+        except FileNotFoundError as e:
+            print(f"⚠ Bestand niet gevonden: {e.filename}")
+        except json.JSONDecodeError as e:
+            print(f"⚠ JSON fout: {e}")
+
+
+if __name__ == "__main__":
+    differ = SchemaDiffer(old_source="default.db", new_json_file="data/tables.json", output_file="migration.sql",
+                          dialect="sqlite")
+    differ.run()
@@ -0,0 +1,203 @@
+import json
+import sqlite3
+
+
+class SchemaIntrospector:
+    """
+    Leest het volledige catalogus van een bestaande database terug naar tables.json,
+    zodat DrawioERDGenerator er een diagram van kan maken. Per database zijn er een vast
+    aantal bulk-queries, nooit één round trip per tabel.
+    """
+
+    SQLITE_CATALOG = """
+        SELECT m.name, p.name, p.type, p."notnull", p.pk > 0,
+               fk."table", fk."to",
+               EXISTS (SELECT 1 FROM pragma_index_list(m.name) il
+                       JOIN pragma_index_info(il.name) ii
+                       WHERE il."unique" = 1 AND il.origin = 'u' AND ii.name = p.name
+                         AND (SELECT COUNT(*) FROM pragma_index_info(il.name)) = 1),
+               0
+        FROM sqlite_master m
+        JOIN pragma_table_info(m.name) p
+        LEFT JOIN pragma_foreign_key_list(m.name) fk ON fk."from" = p.name
+        WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+        ORDER BY m.rowid, p.cid
+    """
+
+    MYSQL_CATALOG = """
+        SELECT c.TABLE_NAME, c.COLUMN_NAME, UPPER(c.COLUMN_TYPE), c.IS_NULLABLE = 'NO', c.COLUMN_KEY = 'PRI',
+               k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME, c.COLUMN_KEY = 'UNI',
+               c.EXTRA LIKE '%%auto_increment%%'
+        FROM information_schema.COLUMNS c
+        JOIN information_schema.TABLES t
+          ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME AND t.TABLE_TYPE = 'BASE TABLE'
+        LEFT JOIN information_schema.KEY_COLUMN_USAGE k
+          ON k.TABLE_SCHEMA = c.TABLE_SCHEMA AND k.TABLE_NAME = c.TABLE_NAME
+         AND k.COLUMN_NAME = c.COLUMN_NAME AND k.REFERENCED_TABLE_NAME IS NOT NULL
+        WHERE c.TABLE_SCHEMA = %s
+        ORDER BY t.CREATE_TIME, c.TABLE_NAME, c.ORDINAL_POSITION
+    """
+
+    POSTGRESQL_CATALOG = """
+        WITH constraint_columns AS (
+            SELECT kcu.table_name, kcu.column_name, tc.constraint_type,
+                   COUNT(*) OVER (PARTITION BY tc.constraint_schema, tc.constraint_name) AS column_count
+            FROM information_schema.table_constraints tc
+            JOIN information_schema.key_column_usage kcu
+              ON kcu.constraint_schema = tc.constraint_schema AND kcu.constraint_name = tc.constraint_name
+            WHERE tc.table_schema = %(schema)s AND tc.constraint_type IN ('PRIMARY KEY', 'UNIQUE')
+        ),
+        keys AS (
+            -- Eén rij per kolom: PK- en UNIQUE-vlaggen worden hier eenmalig samengevoegd
+            SELECT table_name, column_name,
+                   BOOL_OR(constraint_type = 'PRIMARY KEY') AS is_pk,
+                   BOOL_OR(constraint_type = 'UNIQUE' AND column_count = 1) AS is_unique
+            FROM constraint_columns
+            GROUP BY table_name, column_name
+        ),
+        foreign_keys AS (
+            -- Kolom i van de FK hoort bij kolom i van de sleutel waarnaar hij verwijst,
+            -- zodat samengestelde FK's niet kruiselings vermenigvuldigen
+            SELECT DISTINCT ON (kcu.table_name, kcu.column_name)
+                   kcu.table_name, kcu.column_name, ref.table_name AS ref_table, ref.column_name AS ref_column
+            FROM information_schema.referential_constraints rc
+            JOIN information_schema.key_column_usage kcu
+              ON kcu.constraint_schema = rc.constraint_schema AND kcu.constraint_name = rc.constraint_name
+            JOIN information_schema.key_column_usage ref
+              ON ref.constraint_schema = rc.unique_constraint_schema
+             AND ref.constraint_name = rc.unique_constraint_name
+             AND ref.ordinal_position = kcu.position_in_unique_constraint
+            WHERE rc.constraint_schema = %(schema)s
+            ORDER BY kcu.table_name, kcu.column_name, rc.constraint_name
+        )
+        SELECT c.table_name, c.column_name,
+               UPPER(c.data_type) || COALESCE('(' || c.character_maximum_length || ')', ''),
+               c.is_nullable = 'NO', COALESCE(k.is_pk, FALSE),
+               fk.ref_table, fk.ref_column, COALESCE(k.is_unique, FALSE),
+               c.column_default LIKE 'nextval(%%' OR c.is_identity = 'YES'
+        FROM information_schema.columns c
+        JOIN information_schema.tables t
+          ON t.table_schema = c.table_schema AND t.table_name = c.table_name AND t.table_type = 'BASE TABLE'
+        LEFT JOIN keys k
+          ON k.table_name = c.table_name AND k.column_name = c.column_name
+        LEFT JOIN foreign_keys fk
+          ON fk.table_name = c.table_name AND fk.column_name = c.column_name
+        WHERE c.table_schema = %(schema)s
+        ORDER BY c.table_name, c.ordinal_position
+    """
+
+    # PostgreSQL-typenamen terug naar de namen die tables.json gebruikt
+    POSTGRESQL_TYPES = {
+        "CHARACTER VARYING": "VARCHAR",
+        "CHARACTER": "CHAR",
+        "INTEGER": "INT",
+        "TIMESTAMP WITHOUT TIME ZONE": "DATETIME",
+        "DOUBLE PRECISION": "DOUBLE",
+        "REAL": "FLOAT",
+    }
+
+    def __init__(self, db_type=None, **kwargs):
+        """
+        db_type: 'sqlite' (default), 'mysql', or 'postgresql'
+        kwargs: connection parameters depending on db_type
+
+        For SQLite (default):
+            - db_name (optional, default 'default.db')
+
+        For MySQL:
+            - host, user, password, database
+
+        For PostgreSQL:
+            - host, user, password, database, port (optional), schema (optional, default 'public')
+        """
+        self.db_type = db_type or 'sqlite'
+        self.kwargs = kwargs
+        self.tables = []
+
+        if self.db_type == 'sqlite':
+            self.conn = sqlite3.connect(kwargs.get('db_name', 'default.db'))
+        elif self.db_type == 'mysql':
+            import mysql.connector
+            self.conn = mysql.connector.connect(
+                host=kwargs.get('host', 'localhost'),
+                user=kwargs['user'],
+                password=kwargs['password'],
+                database=kwargs['database']
+            )
+        elif self.db_type == 'postgresql':
+            import psycopg2
+            self.conn = psycopg2.connect(
+                host=kwargs.get('host', 'localhost'),
+                user=kwargs['user'],
+                password=kwargs['password'],
+                dbname=kwargs['database'],
+                port=kwargs.get('port', 5432)
+            )
+        else:
+            raise ValueError(f"Unsupported db_type '{self.db_type}'")
+
+    def _fetch_catalog(self):
+        cursor = self.conn.cursor()
+        try:
+            if self.db_type == 'sqlite':
+                cursor.execute(self.SQLITE_CATALOG)
+            elif self.db_type == 'mysql':
+                cursor.execute(self.MYSQL_CATALOG, (self.kwargs['database'],))
+            else:
+                cursor.execute(self.POSTGRESQL_CATALOG, {"schema": self.kwargs.get('schema', 'public')})
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _normalize_type(self, datatype):
+        datatype = (datatype or "").upper()
+        if self.db_type == 'postgresql':
+            base, paren, rest = datatype.partition("(")
+            datatype = self.POSTGRESQL_TYPES.get(base, base) + paren + rest
+        return datatype
+
+    def introspect(self):
+        """Zet de catalogusrijen om naar de structuur van tables.json."""
+        tables, fields_seen = {}, set()
+        for (table_name, name, datatype, not_null, is_pk, ref_table, ref_field,
+             unique, auto_increment) in self._fetch_catalog():
+            # Een kolom met meerdere FK's levert meerdere rijen op; alleen de eerste telt
+            if (table_name, name) in fields_seen:
+                continue
+            fields_seen.add((table_name, name))
+
+            datatype = self._normalize_type(datatype)
+            if datatype.endswith(" AUTO_INCREMENT"):
+                datatype = datatype[:-len(" AUTO_INCREMENT")]
+                auto_increment = True
+
+            field = {"type": "", "name": name, "datatype": datatype, "not_null": bool(not_null),
+                     "unique": bool(unique)}
+            if is_pk:
+                field["type"] = "PK"
+                field["unique"] = True
+                if auto_increment:
+                    field["auto_increment"] = True
+            elif ref_table:
+                field["type"] = "FK"
+                field["references"] = {"table": ref_table, "field": ref_field}
+            tables.setdefault(table_name, {"title": table_name, "fields": []})["fields"].append(field)
+
+        self.tables = list(tables.values())
+        return self.tables
+
+    def save_to_file(self, filename="data/tables_introspected.json"):
+        # Nooit standaard naar data/tables.json: dat is het handgeschreven bronschema
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.tables, f, indent=2, ensure_ascii=False)
+        print(f"✅ {len(self.tables)} tabel(len) geëxporteerd naar '{filename}'.")
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    introspector = SchemaIntrospector(db_name="default.db")
+    introspector.introspect()
+    introspector.save_to_file("introspected_tables.json")
+    introspector.close()
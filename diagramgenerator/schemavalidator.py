@@ -0,0 +1,168 @@
+import re
+
+from schemacache import load_schema
+
+
+class SchemaValidationError(ValueError):
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__(f"{len(problems)} fout(en) in het schema")
+
+
+class SchemaValidator:
+    """
+    Controleert tables.json in lineaire tijd voordat er iets gegenereerd wordt, en
+    rapporteert alle problemen tegelijk in plaats van ze per stap stil over te slaan.
+
+    Fouten (blokkeren generatie): dubbele tabel- of veldnamen, FK zonder verwijzing,
+    onbekende doeltabel of -veld, FK-veld zonder datatype, FK-type dat niet overeenkomt met het doel.
+    Waarschuwingen: tabel zonder PK, meerdere PK-velden, FK naar een veld dat geen PK of UNIQUE is.
+
+    FK-cycli over meerdere tabellen zijn alleen een probleem voor de CREATE-volgorde in SQL;
+    met cycles="warning" (ERD) worden ze als waarschuwing gemeld. Een FK naar de eigen tabel
+    (bv. Werknemer.ManagerID -> Werknemer.WerknemerID) is nooit een cyclus.
+    """
+
+    # Synoniemen die hetzelfde kolomtype opleveren
+    TYPE_ALIASES = {"INTEGER": "INT", "BOOL": "BOOLEAN", "DEC": "DECIMAL", "NUMERIC": "DECIMAL"}
+
+    def __init__(self, tables, cycles="error"):
+        self.tables = tables
+        self.cycles = cycles
+        self.problems = []
+
+    @classmethod
+    def from_json(cls, json_file):
+        return cls(load_schema(json_file))
+
+    def _add(self, severity, table, message):
+        self.problems.append({"severity": severity, "table": table, "message": message})
+
+    def _normalize_type(self, datatype):
+        datatype = re.sub(r"\s+AUTO_INCREMENT\b", "", datatype.strip().upper())
+        base, _, rest = datatype.partition("(")
+        base = self.TYPE_ALIASES.get(base.strip(), base.strip())
+        return base + ("(" + rest if rest else "")
+
+    def validate(self):
+        self.problems = []
+        tables_by_title = {}
+        fields_by_table = {}
+
+        # Pass 1: indexen opbouwen, dubbele namen en PK's controleren. Bij een dubbele tabelnaam
+        # blijft de eerste het FK-doel, maar de velden van beide worden gecontroleerd.
+        field_groups = []
+        for table in self.tables:
+            title = table.get("title")
+            if not title:
+                self._add("error", title, "tabel zonder 'title'")
+            elif title in tables_by_title:
+                self._add("error", title, "dubbele tabelnaam")
+            else:
+                tables_by_title[title] = table
+            fields = {}
+            field_groups.append((title, fields))
+            fields_by_table.setdefault(title, fields)
+            pk_count = 0
+            for position, field in enumerate(table.get("fields", [])):
+                name = field.get("name")
+                if not name:
+                    self._add("error", title, f"veld {position + 1} heeft geen 'name'")
+                    continue
+                if name in fields:
+                    self._add("error", title, f"dubbel veld '{name}'")
+                fields[name] = field
+                pk_count += field.get("type") == "PK"
+            if pk_count == 0:
+                self._add("warning", title, "geen primaire sleutel")
+            elif pk_count > 1:
+                self._add("warning", title, f"{pk_count} PK-velden; alleen het eerste wordt gebruikt")
+
+        # Pass 2: FK's via de hash-indexen controleren en de FK-graaf opbouwen
+        graph = {title: [] for title in tables_by_title}
+        for title, fields in field_groups:
+            for field in fields.values():
+                if field.get("type") != "FK":
+                    continue
+                ref = field.get("references") or {}
+                ref_table, ref_field = ref.get("table"), ref.get("field")
+                location = f"FK '{field['name']}'"
+                if not ref_table or not ref_field:
+                    self._add("error", title, f"{location} heeft geen volledige 'references'")
+                    continue
+                target_fields = fields_by_table.get(ref_table)
+                if target_fields is None:
+                    self._add("error", title, f"{location} verwijst naar onbekende tabel '{ref_table}'")
+                    continue
+                target = target_fields.get(ref_field)
+                if target is None:
+                    self._add("error", title, f"{location} verwijst naar onbekend veld '{ref_table}.{ref_field}'")
+                    continue
+                if ref_table != title and title in graph:
+                    graph[title].append(ref_table)
+                if target.get("type") != "PK" and not target.get("unique"):
+                    self._add("warning", title, f"{location} verwijst naar '{ref_table}.{ref_field}' "
+                                                f"dat geen PK of UNIQUE is")
+                datatype, target_datatype = field.get("datatype"), target.get("datatype")
+                if not datatype:
+                    self._add("error", title, f"{location} heeft geen 'datatype'")
+                elif not target_datatype:
+                    self._add("error", ref_table, f"veld '{ref_field}' heeft geen 'datatype'")
+                elif self._normalize_type(datatype) != self._normalize_type(target_datatype):
+                    self._add("error", title, f"{location} is {datatype}, maar "
+                                              f"'{ref_table}.{ref_field}' is {target_datatype}")
+
+        self._check_cycles(graph)
+        return self.problems
+
+    def _check_cycles(self, graph):
+        """
+        Iteratieve DFS met kleuren (O(V+E)); elke gevonden cyclus wordt één keer gemeld.
+        De positie van elke grijze knoop op het pad staat in een dict, zodat het begin van
+        een cyclus niet met een lineaire zoektocht gevonden hoeft te worden.
+        """
+        WHITE, GREY, BLACK = 0, 1, 2
+        colour = dict.fromkeys(graph, WHITE)
+        for root in graph:
+            if colour[root] != WHITE:
+                continue
+            path, stack = [root], [iter(graph[root])]
+            on_path = {root: 0}
+            colour[root] = GREY
+            while stack:
+                target = next(stack[-1], None)
+                if target is None:
+                    node = path.pop()
+                    del on_path[node]
+                    colour[node] = BLACK
+                    stack.pop()
+                elif colour[target] == WHITE:
+                    colour[target] = GREY
+                    on_path[target] = len(path)
+                    path.append(target)
+                    stack.append(iter(graph[target]))
+                elif colour[target] == GREY:
+                    cycle = path[on_path[target]:] + [target]
+                    self._add(self.cycles, target, "FK-cyclus: " + " -> ".join(cycle))
+
+    @property
+    def errors(self):
+        return [p for p in self.problems if p["severity"] == "error"]
+
+    def report(self):
+        for problem in self.problems:
+            icon = "❌" if problem["severity"] == "error" else "⚠"
+            print(f"{icon} {problem['table']}: {problem['message']}")
+        if not self.problems:
+            print("✅ Schema is geldig.")
+
+    def check(self):
+        """Valideert, rapporteert en gooit SchemaValidationError bij fouten."""
+        self.validate()
+        self.report()
+        if self.errors:
+            raise SchemaValidationError(self.errors)
+
+
+if __name__ == "__main__":
+    SchemaValidator.from_json("data/tables.json").check()
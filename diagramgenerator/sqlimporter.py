@@ -28,7 +28,8 @@ class SQLImporter:
             self.conn = mysql.connector.connect(
                 host=kwargs.get('host', 'localhost'),
                 user=kwargs['user'],
-                password=kwargs['password']
+                password=kwargs['password'],
+                database=kwargs.get('database')
             )
             self.cursor = self.conn.cursor()
         elif self.db_type == 'postgresql':
@@ -44,7 +45,8 @@ class SQLImporter:
         else:
             raise ValueError(f"Unsupported db_type '{self.db_type}'")
 
-    def import_sql_file(self, filepath):
+    @staticmethod
+    def parse_sql_file(filepath):
         if not os.path.isfile(filepath):
             raise FileNotFoundError(f"SQL file '{filepath}' not found.")
 
@@ -52,24 +54,84 @@ class SQLImporter:
             sql_script = file.read()
 
         # Split statements on ';' - let op, dit is simpel en werkt niet als ; in strings voorkomt
-        statements = [stmt.strip() for stmt in sql_script.split(';') if stmt.strip()]
+        return [stmt.strip() for stmt in sql_script.split(';') if stmt.strip()]
+
+    # Statements die binnen een transactie geweigerd (PostgreSQL) of genegeerd (SQLite) worden
+    AUTOCOMMIT_STATEMENTS = {
+        'postgresql': ('CREATE DATABASE', 'DROP DATABASE', 'VACUUM', 'CREATE INDEX CONCURRENTLY',
+                       'DROP INDEX CONCURRENTLY', 'REINDEX DATABASE'),
+        'sqlite': ('PRAGMA FOREIGN_KEYS', 'VACUUM'),
+    }
+
+    @staticmethod
+    def is_database_statement(stmt):
+        """DROP/CREATE DATABASE en USE: werken op de server, niet binnen de verbonden database."""
+        return stmt.upper().startswith(('DROP DATABASE', 'CREATE DATABASE', 'USE '))
+
+    @staticmethod
+    def is_supported(stmt, db_type):
+        # Filter SQLite incompatible statements
+        if db_type == 'sqlite':
+            return not SQLImporter.is_database_statement(stmt)
+        return True
 
+    def needs_autocommit(self, stmt):
+        return stmt.upper().startswith(self.AUTOCOMMIT_STATEMENTS.get(self.db_type, ()))
+
+    def execute_statements(self, statements):
+        """
+        Execute already parsed statements as one transaction.
+        Statements that cannot run inside a transaction (PostgreSQL DROP DATABASE, VACUUM, SQLite
+        PRAGMA foreign_keys, ...) run in autocommit mode; the statements before them are committed first.
+        Note: MySQL commits implicitly after DDL, so there a failure cannot undo earlier statements.
+        """
+        batch = []
+        for stmt in statements:
+            if self.needs_autocommit(stmt):
+                self._execute_transaction(batch)
+                batch = []
+                self._execute_autocommit(stmt)
+            else:
+                batch.append(stmt)
+        self._execute_transaction(batch)
+
+    def _execute_autocommit(self, stmt):
+        if self.db_type == 'sqlite':
+            # Na de commit van de vorige batch is er geen open transactie meer
+            self.cursor.execute(stmt)
+            return
+        self.conn.autocommit = True
         try:
-            for stmt in statements:
-                # Filter SQLite incompatible statements
-                if self.db_type == 'sqlite':
-                    stmt_upper = stmt.upper()
-                    if (stmt_upper.startswith('DROP DATABASE') or
-                        stmt_upper.startswith('CREATE DATABASE') or
-                        stmt_upper.startswith('USE ')):
-                        print(f"Skipping incompatible statement for SQLite: {stmt[:40]}...")
-                        continue
+            self.cursor.execute(stmt)
+        finally:
+            self.conn.autocommit = False
 
+    def _execute_transaction(self, statements):
+        if not statements:
+            return
+        try:
+            if self.db_type == 'sqlite':
+                # sqlite3 start zelf geen transactie voor DDL
+                self.cursor.execute('BEGIN')
+            for stmt in statements:
                 self.cursor.execute(stmt)
             self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def import_sql_file(self, filepath):
+        statements = []
+        for stmt in self.parse_sql_file(filepath):
+            if not self.is_supported(stmt, self.db_type):
+                print(f"Skipping incompatible statement for SQLite: {stmt[:40]}...")
+                continue
+            statements.append(stmt)
+
+        try:
+            self.execute_statements(statements)
             print(f"Successfully imported '{filepath}' into {self.db_type} database.")
         except Exception as e:
-            self.conn.rollback()
             print(f"Error executing SQL script: {e}")
             raise e
 
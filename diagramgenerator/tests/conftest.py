@@ -0,0 +1,5 @@
+import os
+import sys
+
+# De modules importeren elkaar plat (from createsql import ...), net als vanuit diagramgenerator/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,130 @@
+import pytest
+
+from createcrudtestscripts import CRUDGenerator
+from crudtester import CRUDExecutor, PKResultCache
+
+SPELER = {"title": "Speler", "fields": [
+    {"type": "PK", "name": "SpelerID", "datatype": "INTEGER"},
+    {"type": "", "name": "Naam", "datatype": "VARCHAR(50)"},
+    {"type": "", "name": "Level", "datatype": "INT"},
+]}
+
+
+def test_cache_counts_hits_and_misses():
+    cache = PKResultCache(max_size=2)
+    assert cache.get(("Speler", 1)) is None
+    cache.put(("Speler", 1), [(1, "Alex")])
+    assert cache.get(("Speler", 1)) == [(1, "Alex")]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"], stats["size"]) == (1, 1, 0.5, 1)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PKResultCache(max_size=2)
+    cache.put(("Speler", 1), ["a"])
+    cache.put(("Speler", 2), ["b"])
+    cache.get(("Speler", 1))
+    cache.put(("Speler", 3), ["c"])
+    assert cache.get(("Speler", 2)) is None
+    assert cache.get(("Speler", 1)) == ["a"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_entries_expire_after_ttl():
+    cache = PKResultCache(ttl=0)
+    cache.put(("Speler", 1), ["a"])
+    assert cache.get(("Speler", 1)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_invalidate_and_clear():
+    cache = PKResultCache()
+    cache.put(("Speler", 1), ["a"])
+    cache.put(("Speler", 2), ["b"])
+    cache.invalidate(("Speler", 1))
+    cache.invalidate(("Speler", 9))
+    assert cache.get(("Speler", 1)) is None
+    assert cache.stats()["invalidations"] == 1
+    cache.clear()
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["invalidations"] == 2
+
+
+@pytest.fixture
+def crud():
+    generator = CRUDGenerator(None, db_type="sqlite", tables=[SPELER], variants=True)
+    generator.generate_crud()
+    return generator.get_crud()
+
+
+@pytest.fixture
+def executor(crud):
+    executor = CRUDExecutor(db_name=":memory:", cache_size=16)
+    executor.execute("CREATE TABLE Speler (SpelerID INTEGER PRIMARY KEY, Naam VARCHAR(50), Level INT)")
+    executor.register_crud(crud)
+    executor.execute(crud["Speler"]["INSERT"], ("Alex", 1))
+    yield executor
+    executor.close()
+
+
+def test_pk_read_is_served_from_cache(executor, crud):
+    read = crud["Speler"]["READ"]
+    assert executor.execute(read, (1,), fetch=True) == [(1, "Alex", 1)]
+    assert executor.execute(read, (1,), fetch=True) == [(1, "Alex", 1)]
+    assert executor.execute(read, ("1",), fetch=True) == [(1, "Alex", 1)]
+    stats = executor.cache_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+
+
+def test_missing_rows_are_not_cached(executor, crud):
+    read = crud["Speler"]["READ"]
+    assert executor.execute(read, (2,), fetch=True) == []
+    executor.execute(crud["Speler"]["INSERT"], ("Sam", 3))
+    assert executor.execute(read, (2,), fetch=True) == [(2, "Sam", 3)]
+
+
+def test_read_without_fetch_bypasses_cache(executor, crud):
+    executor.execute(crud["Speler"]["READ"], (1,))
+    assert executor.cache_stats()["misses"] == 0
+    assert executor.cache_stats()["size"] == 0
+
+
+def test_registered_update_invalidates_only_its_row(executor, crud):
+    read = crud["Speler"]["READ"]
+    executor.execute(crud["Speler"]["INSERT"], ("Sam", 3))
+    executor.execute(read, (1,), fetch=True)
+    executor.execute(read, (2,), fetch=True)
+    executor.execute(crud["Speler"]["UPDATE"], ("Alex", 5, "1"))
+    assert executor.execute(read, (1,), fetch=True) == [(1, "Alex", 5)]
+    assert executor.cache_stats()["invalidations"] == 1
+    assert executor.cache_stats()["size"] == 2
+
+
+def test_registered_delete_in_invalidates_each_key(executor, crud):
+    executor.execute(crud["Speler"]["READ"], (1,), fetch=True)
+    executor.execute(crud["Speler"]["DELETE_IN_10"], (1,) + (None,) * 9)
+    assert executor.execute(crud["Speler"]["READ"], (1,), fetch=True) == []
+
+
+def test_unregistered_select_keeps_cache(executor, crud):
+    executor.execute(crud["Speler"]["READ"], (1,), fetch=True)
+    executor.execute("SELECT COUNT(*) FROM Speler", fetch=True)
+    assert executor.cache_stats()["size"] == 1
+
+
+def test_unregistered_write_clears_cache(executor, crud):
+    read = crud["Speler"]["READ"]
+    executor.execute(read, (1,), fetch=True)
+    executor.execute("UPDATE Speler SET Level = 9")
+    assert executor.cache_stats()["size"] == 0
+    assert executor.execute(read, (1,), fetch=True) == [(1, "Alex", 9)]
+
+
+def test_format_query_converts_placeholders():
+    executor = CRUDExecutor(db_name=":memory:")
+    try:
+        assert executor.format_query("SELECT * FROM Speler WHERE SpelerID = %s;") == \
+            "SELECT * FROM Speler WHERE SpelerID = ?;"
+        assert executor.cache_stats() is None
+    finally:
+        executor.close()
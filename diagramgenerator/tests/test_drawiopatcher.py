@@ -0,0 +1,141 @@
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from compiler import DrawioERDGenerator
+from drawiopatcher import DrawioPatcher, split_cell_id
+
+
+def pk(name):
+    return {"type": "PK", "name": name, "datatype": "INT", "not_null": True}
+
+
+def fk(name, table, field):
+    return {"type": "FK", "name": name, "datatype": "INT", "references": {"table": table, "field": field}}
+
+
+TABLES = [
+    {"title": "Speler", "fields": [pk("SpelerID"), {"type": "", "name": "Naam", "datatype": "VARCHAR(50)"}]},
+    {"title": "Wereld", "fields": [pk("WereldID")]},
+    {"title": "Ban", "fields": [pk("BanID"), fk("SpelerID", "Speler", "SpelerID")]},
+]
+
+
+def generate(tmp_path, tables, patch=True):
+    json_file = tmp_path / "tables.json"
+    json_file.write_text(json.dumps(tables), encoding="utf-8")
+    generator = DrawioERDGenerator(json_file=str(json_file), output_file=str(tmp_path / "erd.drawio"))
+    return generator.run(patch=patch)
+
+
+def cells(tmp_path):
+    root = ET.parse(tmp_path / "erd.drawio").getroot().find(".//root")
+    return {cell.get("id"): cell for cell in root}
+
+
+def geometry(cell):
+    return {k: float(v) for k, v in cell.find("mxGeometry").attrib.items() if k in ("x", "y")}
+
+
+@pytest.mark.parametrize("cell_id, expected", [
+    ("tbl:Speler:3", ("tbl", "Speler", 3)),
+    ("tbl:Speler:0", ("tbl", "Speler", 0)),
+    ("fk:Ban.SpelerID", ("fk", "Ban.SpelerID", None)),
+    ("42", (None, None, None)),
+])
+def test_split_cell_id(cell_id, expected):
+    assert split_cell_id(cell_id) == expected
+
+
+def test_first_patch_run_generates_stable_ids(tmp_path):
+    assert generate(tmp_path, TABLES) is None
+    ids = cells(tmp_path)
+    assert {"tbl:Speler:0", "tbl:Wereld:0", "tbl:Ban:0", "fk:Ban.SpelerID"} <= set(ids)
+    assert "erdHash=" in ids["tbl:Speler:0"].get("style")
+    assert ";;" not in ids["tbl:Speler:0"].get("style")
+
+
+def test_unchanged_schema_keeps_every_cell(tmp_path):
+    generate(tmp_path, TABLES)
+    before = cells(tmp_path)
+    result = generate(tmp_path, TABLES)
+    assert (result["changed"], result["removed"], result["dropped"]) == ([], [], 0)
+    assert result["kept"] == len(before)
+    assert set(cells(tmp_path)) == set(before)
+
+
+def test_patch_keeps_manual_layout_and_regenerates_changed_table(tmp_path):
+    generate(tmp_path, TABLES)
+    path = tmp_path / "erd.drawio"
+    tree = ET.parse(path)
+    root = tree.getroot().find(".//root")
+    # De gebruiker verplaatst Wereld en voegt een eigen notitie toe
+    for cell in root:
+        if cell.get("id") == "tbl:Wereld:0":
+            cell.find("mxGeometry").set("x", "1234")
+    note = ET.SubElement(root, "mxCell", id="notitie", value="Let op", vertex="1", parent="1")
+    ET.SubElement(note, "mxGeometry", {"x": "0", "y": "900", "width": "80", "height": "30", "as": "geometry"})
+    tree.write(path, encoding="utf-8")
+    old_hash = cells(tmp_path)["tbl:Speler:0"].get("style")
+
+    tables = json.loads(json.dumps(TABLES))
+    tables[0]["fields"].append({"type": "", "name": "Level", "datatype": "INT"})
+    result = generate(tmp_path, tables)
+
+    assert result["changed"] == ["Speler"]
+    after = cells(tmp_path)
+    assert geometry(after["tbl:Wereld:0"])["x"] == 1234
+    assert after["notitie"].get("value") == "Let op"
+    assert after["tbl:Speler:0"].get("style") != old_hash
+    assert any((cell.get("value") or "").startswith("Level") for cell in after.values())
+    # De relatie naar de gewijzigde tabel is vervangen, niet verdubbeld
+    ids = [cell.get("id") for cell in ET.parse(path).getroot().find(".//root")]
+    assert ids.count("fk:Ban.SpelerID") == 1
+    assert len(ids) == len(set(ids))
+
+
+def test_new_table_goes_below_existing_content(tmp_path):
+    generate(tmp_path, TABLES)
+    bottom = max(geometry(c).get("y", 0) + float(c.find("mxGeometry").get("height", 0))
+                 for c in cells(tmp_path).values() if c.get("vertex") == "1")
+    result = generate(tmp_path, TABLES + [{"title": "Item", "fields": [pk("ItemID")]}])
+    assert result["changed"] == ["Item"]
+    assert geometry(cells(tmp_path)["tbl:Item:0"])["y"] >= bottom
+
+
+def test_removed_table_is_dropped_with_its_relations(tmp_path):
+    generate(tmp_path, TABLES)
+    result = generate(tmp_path, [t for t in TABLES if t["title"] != "Ban"])
+    assert result["removed"] == ["Ban"]
+    ids = set(cells(tmp_path))
+    assert not any(cell_id.startswith("tbl:Ban:") for cell_id in ids)
+    assert "fk:Ban.SpelerID" not in ids
+
+
+def test_file_with_numeric_ids_is_regenerated(tmp_path, capsys):
+    generate(tmp_path, TABLES, patch=False)
+    assert "tbl:Speler:0" not in cells(tmp_path)
+    with pytest.raises(ValueError):
+        DrawioPatcher(str(tmp_path / "erd.drawio")).scan("tbl")
+
+    assert generate(tmp_path, TABLES) is None
+    assert "Patchen niet mogelijk" in capsys.readouterr().out
+    assert "tbl:Speler:0" in cells(tmp_path)
+
+
+def test_compressed_diagram_cannot_be_patched(tmp_path):
+    path = tmp_path / "erd.drawio"
+    path.write_text('<mxfile><diagram id="d" name="Page-1">7VpNc5swEP01</diagram></mxfile>', encoding="utf-8")
+    with pytest.raises(ValueError, match="gecomprimeerd"):
+        DrawioPatcher(str(path)).scan("tbl")
+
+
+def test_write_refuses_file_changed_after_scan(tmp_path):
+    generate(tmp_path, TABLES)
+    path = tmp_path / "erd.drawio"
+    patcher = DrawioPatcher(str(path))
+    patcher.scan("tbl")
+    path.write_text(path.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="gewijzigd"):
+        patcher.write(lambda cell_id: False, [])
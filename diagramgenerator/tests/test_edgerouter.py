@@ -0,0 +1,113 @@
+import json
+import os
+
+import pytest
+
+from compiler import DrawioERDGenerator
+from edgerouter import LaneAllocator, OrthogonalRouter, SpatialGrid
+
+
+def test_lanes_alternate_around_the_channel():
+    lanes = LaneAllocator(step=10, max_offset=25)
+    assert lanes.lane_count == 5
+    assert [lanes.offset("A") for _ in range(7)] == [0, 10, -10, 20, -20, 0, 10]
+
+
+def test_lanes_are_counted_per_channel():
+    lanes = LaneAllocator(step=10, max_offset=25)
+    assert [lanes.offset("A"), lanes.offset("B"), lanes.offset("A"), lanes.offset("B")] == [0, 0, 10, 10]
+
+
+def test_step_larger_than_max_offset_keeps_one_lane():
+    lanes = LaneAllocator(step=50, max_offset=20)
+    assert [lanes.offset("A") for _ in range(3)] == [0, 0, 0]
+
+
+@pytest.fixture
+def grid():
+    return SpatialGrid.from_boxes({"A": (0, 0, 100, 100), "B": (300, 0, 100, 100), "C": (900, 900, 50, 50)})
+
+
+def test_query_finds_boxes_whose_interior_is_crossed(grid):
+    assert sorted(grid.query(50, 50, 350, 50)) == ["A", "B"]
+    assert grid.query(350, 50, 50, 50) == grid.query(50, 50, 350, 50)
+    assert grid.query(150, 50, 250, 50) == []
+    assert grid.query(925, 0, 925, 2000) == ["C"]
+
+
+def test_query_ignores_touching_edges_and_ignored_keys(grid):
+    assert grid.query(100, 0, 300, 100) == []
+    assert grid.query(50, 50, 350, 50, ignore=("A",)) == ["B"]
+
+
+def test_margin_grows_the_boxes():
+    grid = SpatialGrid.from_boxes({"A": (0, 0, 100, 100)}, margin=5)
+    assert grid.query(103, -50, 103, 150) == ["A"]
+    assert grid.query(106, -50, 106, 150) == []
+
+
+def test_query_counter(grid):
+    grid.query(0, 0, 1, 1)
+    grid.query(0, 0, 1, 1)
+    assert grid.queries == 2
+
+
+BOXES = {"bron": (0, 0, 100, 50), "doel": (0, 400, 100, 50), "blok": (120, 150, 100, 100)}
+START, END = (100, 25), (100, 425)
+
+
+def crosses(points, boxes, clearance):
+    """Brute force: raakt een segment van de route het inwendige van een (vergroot) blok?"""
+    path = [START] + points + [END]
+    for i, ((x1, y1), (x2, y2)) in enumerate(zip(path, path[1:])):
+        for key, (x, y, w, h) in boxes.items():
+            if (i == 0 and key == "bron") or (i == len(path) - 2 and key == "doel"):
+                continue
+            m = clearance // 2
+            if min(x1, x2) < x + w + m and max(x1, x2) > x - m and min(y1, y2) < y + h + m and max(y1, y2) > y - m:
+                return True
+    return False
+
+
+def test_free_route_is_left_alone():
+    router = OrthogonalRouter({"bron": BOXES["bron"], "doel": BOXES["doel"]})
+    points = router.route(START, END, 150, source="bron", target="doel")
+    assert points == [(150, 25), (150, 425)]
+    assert (router.metrics()["rerouted"], router.metrics()["blocked"]) == (0, 0)
+
+
+def test_blocked_channel_is_moved_past_the_block():
+    router = OrthogonalRouter(BOXES, clearance=10)
+    points = router.route(START, END, 150, source="bron", target="doel")
+    assert crosses([(150, 25), (150, 425)], BOXES, 10)
+    assert not crosses(points, BOXES, 10)
+    assert points[0][0] == points[1][0] != 150
+    metrics = router.metrics()
+    assert (metrics["edges"], metrics["rerouted"], metrics["blocked"]) == (1, 1, 0)
+    assert metrics["max_queries_per_edge"] <= 6
+
+
+def test_blocked_corridor_is_moved():
+    boxes = {"bron": (0, 0, 100, 50), "doel": (600, 0, 100, 50), "blok": (250, 60, 100, 100)}
+    router = OrthogonalRouter(boxes, clearance=10)
+    start, end = (100, 25), (600, 25)
+    points = router.route(start, end, 150, 550, corridor_y=100, source="bron", target="doel")
+    corridor = points[1][1]
+    assert points[1][1] == points[2][1] and not (55 < corridor < 165)
+    assert router.metrics()["blocked"] == 0
+
+
+def test_unroutable_edge_falls_back_to_default_route():
+    router = OrthogonalRouter(BOXES, max_attempts=1)
+    assert router.route(START, END, 150, source="bron", target="doel") == [(150, 25), (150, 425)]
+    assert router.metrics()["blocked"] == 1
+
+
+def test_repository_erd_routes_without_overlap():
+    json_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "tables.json")
+    with open(json_file, encoding="utf-8") as f:
+        generator = DrawioERDGenerator(None, tables=json.load(f))
+    generator.load_json()
+    generator.create_full_drawio_xml()
+    assert generator.routing_stats["edges"] > 0
+    assert generator.routing_stats["blocked"] == 0
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from erdfocus import RelationshipIndex, main
+
+
+def table(title, *references):
+    fields = [{"type": "PK", "name": f"{title}ID", "datatype": "INT"}]
+    fields += [{"type": "FK", "name": f"{ref}ID", "datatype": "INT", "references": {"table": ref, "field": f"{ref}ID"}}
+               for ref in references]
+    return {"title": title, "fields": fields}
+
+
+# Wereld <- Speler <- Ban, Speler <- Inventaris -> Item, CraftingRecept -> Item, Los heeft geen FK's
+TABLES = [
+    table("Wereld"),
+    table("Speler", "Wereld"),
+    table("Ban", "Speler"),
+    table("Item"),
+    table("Inventaris", "Speler", "Item"),
+    table("CraftingRecept", "Item"),
+    table("CraftingStation"),
+    table("Los"),
+]
+
+
+def titles(tables):
+    return [t["title"] for t in tables]
+
+
+@pytest.fixture
+def index():
+    return RelationshipIndex(TABLES)
+
+
+def test_neighbourhood_follows_fks_in_both_directions(index):
+    assert titles(index.neighbourhood("Speler", 0)) == ["Speler"]
+    assert titles(index.neighbourhood("Speler")) == ["Wereld", "Speler", "Ban", "Inventaris"]
+    assert titles(index.neighbourhood("Speler", 2)) == ["Wereld", "Speler", "Ban", "Item", "Inventaris"]
+    assert titles(index.neighbourhood("Speler", 3)) == ["Wereld", "Speler", "Ban", "Item", "Inventaris",
+                                                         "CraftingRecept"]
+
+
+def test_neighbourhood_of_isolated_table(index):
+    assert titles(index.neighbourhood("Los", 5)) == ["Los"]
+
+
+def test_neighbourhood_of_unknown_table(index):
+    with pytest.raises(KeyError):
+        index.neighbourhood("Onbekend")
+
+
+def test_matching_adds_outgoing_fk_closure(index):
+    assert titles(index.matching("Crafting*")) == ["Item", "CraftingRecept", "CraftingStation"]
+    assert titles(index.matching("Ban")) == ["Wereld", "Speler", "Ban"]
+    assert titles(index.matching("*")) == titles(TABLES)
+
+
+def test_matching_is_case_sensitive(index):
+    assert index.matching("crafting*") == []
+
+
+def test_fk_to_unknown_table_is_ignored():
+    index = RelationshipIndex([table("Ban", "Speler")])
+    assert titles(index.neighbourhood("Ban")) == ["Ban"]
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    path = tmp_path / "tables.json"
+    path.write_text(json.dumps(TABLES), encoding="utf-8")
+    return str(path)
+
+
+def test_main_renders_focus_view(json_file, tmp_path):
+    output = tmp_path / "focus.drawio"
+    assert main([json_file, "--table", "Ban", "--hops", "1", "-o", str(output)]) == 0
+    xml = output.read_text(encoding="utf-8")
+    assert 'value="Ban"' in xml
+    assert 'value="Speler"' in xml
+    assert 'value="Wereld"' not in xml
+
+
+@pytest.mark.parametrize("args", [["--table", "Onbekend"], ["--pattern", "Geen*"]])
+def test_main_fails_without_tables(json_file, tmp_path, args):
+    output = tmp_path / "focus.drawio"
+    assert main([json_file] + args + ["-o", str(output)]) == 1
+    assert not output.exists()
@@ -0,0 +1,153 @@
+import json
+import sqlite3
+
+import pytest
+
+from schemadiff import SchemaDiffer
+from sqlimporter import SQLImporter
+
+
+def pk(name, datatype="INT"):
+    return {"type": "PK", "name": name, "datatype": datatype, "not_null": True}
+
+
+def fk(name, table, field, datatype="INT"):
+    return {"type": "FK", "name": name, "datatype": datatype, "references": {"table": table, "field": field}}
+
+
+def column(name, datatype="VARCHAR(50)", **extra):
+    return dict({"type": "", "name": name, "datatype": datatype}, **extra)
+
+
+OLD = [
+    {"title": "Speler", "fields": [pk("SpelerID"), column("Naam")]},
+    {"title": "Wereld", "fields": [pk("WereldID"), column("Naam")]},
+    {"title": "Ban", "fields": [pk("BanID"), fk("SpelerID", "Speler", "SpelerID"), column("Reden")]},
+]
+
+
+def write(tmp_path, name, tables):
+    path = tmp_path / name
+    path.write_text(json.dumps(tables), encoding="utf-8")
+    return str(path)
+
+
+def migrate(tmp_path, new_tables, dialect, old_tables=OLD):
+    differ = SchemaDiffer(write(tmp_path, "old.json", old_tables), write(tmp_path, "new.json", new_tables),
+                          dialect=dialect)
+    differ.load()
+    return differ.generate_migration_sql().splitlines()
+
+
+def with_table(title, fields, tables=OLD):
+    return [dict(t, fields=fields) if t["title"] == title else t for t in tables]
+
+
+def test_identical_schemas_have_no_changes(tmp_path):
+    assert migrate(tmp_path, OLD, "mysql") == ["-- Geen schemawijzigingen gevonden."]
+
+
+def test_new_tables_are_created_in_fk_order(tmp_path):
+    new = OLD + [
+        {"title": "Item", "fields": [pk("ItemID"), fk("KistID", "Kist", "KistID")]},
+        {"title": "Kist", "fields": [pk("KistID"), fk("WereldID", "Wereld", "WereldID")]},
+    ]
+    creates = [line for line in migrate(tmp_path, new, "mysql") if line.startswith("CREATE TABLE")]
+    assert creates == ["CREATE TABLE Kist (", "CREATE TABLE Item ("]
+
+
+@pytest.mark.parametrize("dialect", ["mysql", "postgresql"])
+def test_retargeted_fk_is_dropped_before_modify_and_added_after(tmp_path, dialect):
+    new = with_table("Ban", [pk("BanID"), fk("SpelerID", "Wereld", "WereldID"), column("Reden")])
+    lines = migrate(tmp_path, new, dialect)
+    if dialect == "mysql":
+        drop = lines.index("ALTER TABLE Ban DROP FOREIGN KEY fk_Ban_SpelerID;")
+        modify = lines.index("ALTER TABLE Ban MODIFY COLUMN SpelerID INT;")
+        assert lines.index("DROP INDEX idx_Ban_SpelerID ON Ban;") < modify
+    else:
+        drop = lines.index("ALTER TABLE Ban DROP CONSTRAINT IF EXISTS fk_Ban_SpelerID;")
+        modify = lines.index("ALTER TABLE Ban ALTER COLUMN SpelerID TYPE INT;")
+        assert "ALTER TABLE Ban DROP CONSTRAINT IF EXISTS ban_spelerid_fkey;" in lines
+        assert lines.index("DROP INDEX IF EXISTS idx_Ban_SpelerID;") < modify
+    index = lines.index("CREATE INDEX idx_Ban_SpelerID ON Ban (SpelerID);")
+    add = lines.index("ALTER TABLE Ban ADD CONSTRAINT fk_Ban_SpelerID FOREIGN KEY (SpelerID) REFERENCES Wereld(WereldID);")
+    assert drop < modify < index < add
+
+
+@pytest.mark.parametrize("dialect, drop_index", [
+    ("mysql", "DROP INDEX idx_Ban_SpelerID ON Ban;"),
+    ("postgresql", "DROP INDEX IF EXISTS idx_Ban_SpelerID;"),
+])
+def test_dropped_fk_column_loses_constraint_first(tmp_path, dialect, drop_index):
+    lines = migrate(tmp_path, with_table("Ban", [pk("BanID"), column("Reden")]), dialect)
+    assert lines.index(drop_index) < lines.index("ALTER TABLE Ban DROP COLUMN SpelerID;")
+
+
+def test_added_column_and_dropped_table(tmp_path):
+    new = with_table("Speler", [pk("SpelerID"), column("Naam"), column("Email", unique=True)])
+    new = [t for t in new if t["title"] != "Wereld"]
+    lines = migrate(tmp_path, new, "postgresql")
+    assert "ALTER TABLE Speler ADD COLUMN Email VARCHAR(50) UNIQUE;" in lines
+    assert lines[-1] == "DROP TABLE IF EXISTS Wereld;"
+
+
+def test_sqlite_adds_nullable_column_without_rebuild(tmp_path):
+    new = with_table("Speler", [pk("SpelerID"), column("Naam"), column("Bijnaam")])
+    assert migrate(tmp_path, new, "sqlite") == ["ALTER TABLE Speler ADD COLUMN Bijnaam VARCHAR(50);"]
+
+
+def test_sqlite_rebuild_is_wrapped_in_foreign_keys_pragmas(tmp_path):
+    new = with_table("Ban", [pk("BanID"), fk("SpelerID", "Speler", "SpelerID"), column("Reden", "TEXT")])
+    lines = migrate(tmp_path, new, "sqlite")
+    assert lines[0] == "PRAGMA foreign_keys = OFF;"
+    assert lines[-1] == "PRAGMA foreign_keys = ON;"
+    assert sum(line.startswith("PRAGMA") for line in lines) == 2
+    assert "INSERT INTO Ban_new (BanID, SpelerID, Reden) SELECT BanID, SpelerID, Reden FROM Ban;" in lines
+    assert lines.index("DROP TABLE Ban;") < lines.index("ALTER TABLE Ban_new RENAME TO Ban;")
+
+
+@pytest.mark.parametrize("field, value", [
+    (column("Level", "INT", not_null=True), "0"),
+    (column("Sinds", "DATE", not_null=True), "'1970-01-01'"),
+    (column("Rang", "VARCHAR(20)", not_null=True), "''"),
+    (column("Rang", "VARCHAR(20)", not_null=True, default="O'Brien"), "'O''Brien'"),
+    (column("Actief", "BOOLEAN", not_null=True, default=True), "1"),
+])
+def test_sqlite_fills_new_not_null_column(tmp_path, field, value):
+    new = with_table("Speler", [pk("SpelerID"), column("Naam"), field])
+    lines = migrate(tmp_path, new, "sqlite")
+    assert (f"INSERT INTO Speler_new (SpelerID, Naam, {field['name']}) "
+            f"SELECT SpelerID, Naam, {value} FROM Speler;") in lines
+
+
+def test_sqlite_migration_applies_to_live_database(tmp_path):
+    db_name = str(tmp_path / "live.db")
+    conn = sqlite3.connect(db_name)
+    conn.executescript("""
+        CREATE TABLE Speler (SpelerID INT NOT NULL, Naam VARCHAR(50), PRIMARY KEY (SpelerID));
+        CREATE TABLE Wereld (WereldID INT NOT NULL, Naam VARCHAR(50), PRIMARY KEY (WereldID));
+        CREATE TABLE Ban (BanID INT NOT NULL, SpelerID INT, Reden VARCHAR(50), PRIMARY KEY (BanID),
+                          CONSTRAINT fk_Ban_SpelerID FOREIGN KEY (SpelerID) REFERENCES Speler(SpelerID));
+        INSERT INTO Speler VALUES (1, 'Alex');
+        INSERT INTO Ban VALUES (1, 1, 'spam');
+    """)
+    conn.close()
+
+    new = with_table("Speler", [pk("SpelerID"), column("Naam"), column("Level", "INT", not_null=True)])
+    new_json = write(tmp_path, "new.json", new)
+    differ = SchemaDiffer(db_name, new_json, output_file=str(tmp_path / "migration.sql"), dialect="sqlite")
+    differ.run()
+
+    importer = SQLImporter(db_name=db_name)
+    try:
+        importer.import_sql_file(differ.output_file)
+        assert importer.cursor.execute("SELECT SpelerID, Naam, Level FROM Speler").fetchall() == [(1, "Alex", 0)]
+        assert importer.cursor.execute("SELECT COUNT(*) FROM Ban").fetchone() == (1,)
+        assert importer.cursor.execute("PRAGMA foreign_keys").fetchone() == (1,)
+    finally:
+        importer.close()
+
+    # Na de migratie is de database gelijk aan het nieuwe schema
+    differ = SchemaDiffer(db_name, new_json, dialect="sqlite")
+    differ.load()
+    assert differ.generate_migration_sql() == "-- Geen schemawijzigingen gevonden."
@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+from schemavalidator import SchemaValidationError, SchemaValidator
+
+
+def pk(name, datatype="INT"):
+    return {"type": "PK", "name": name, "datatype": datatype}
+
+
+def fk(name, table, field, datatype="INT"):
+    return {"type": "FK", "name": name, "datatype": datatype, "references": {"table": table, "field": field}}
+
+
+def messages(tables, severity=None, **kwargs):
+    problems = SchemaValidator(tables, **kwargs).validate()
+    return [(p["severity"], p["table"], p["message"]) for p in problems
+            if severity is None or p["severity"] == severity]
+
+
+def test_repository_schema_is_valid():
+    json_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "tables.json")
+    # Gewone json.load: de test schrijft geen .erdcache naast het bronschema
+    with open(json_file, encoding="utf-8") as f:
+        assert SchemaValidator(json.load(f)).validate() == []
+
+
+def test_fk_cycle_is_an_error_by_default():
+    tables = [{"title": "A", "fields": [pk("AID"), fk("BID", "B", "BID")]},
+              {"title": "B", "fields": [pk("BID"), fk("AID", "A", "AID")]}]
+    assert messages(tables) == [("error", "A", "FK-cyclus: A -> B -> A")]
+    assert messages(tables, cycles="warning") == [("warning", "A", "FK-cyclus: A -> B -> A")]
+
+
+def test_cycle_is_reported_once_with_its_own_path():
+    tables = [{"title": "Start", "fields": [pk("StartID"), fk("AID", "A", "AID")]},
+              {"title": "A", "fields": [pk("AID"), fk("BID", "B", "BID")]},
+              {"title": "B", "fields": [pk("BID"), fk("CID", "C", "CID")]},
+              {"title": "C", "fields": [pk("CID"), fk("AID", "A", "AID")]}]
+    assert messages(tables) == [("error", "A", "FK-cyclus: A -> B -> C -> A")]
+
+
+def test_self_reference_is_not_a_cycle():
+    tables = [{"title": "Werknemer", "fields": [pk("WerknemerID"), fk("ManagerID", "Werknemer", "WerknemerID")]}]
+    assert messages(tables) == []
+
+
+def test_long_chain_does_not_recurse():
+    tables = [{"title": "T0", "fields": [pk("ID")]}]
+    tables += [{"title": f"T{i}", "fields": [pk("ID"), fk("Vorige", f"T{i - 1}", "ID")]} for i in range(1, 5000)]
+    assert messages(tables) == []
+
+
+def test_duplicate_table_and_field():
+    tables = [{"title": "A", "fields": [pk("AID")]},
+              {"title": "A", "fields": [pk("AID"), {"type": "", "name": "X", "datatype": "INT"},
+                                        {"type": "", "name": "X", "datatype": "INT"}]}]
+    assert messages(tables, "error") == [("error", "A", "dubbele tabelnaam"), ("error", "A", "dubbel veld 'X'")]
+
+
+def test_fields_of_duplicate_table_are_checked():
+    tables = [{"title": "A", "fields": [pk("AID")]},
+              {"title": "A", "fields": [pk("AID"), fk("BID", "B", "BID")]}]
+    assert ("error", "A", "FK 'BID' verwijst naar onbekende tabel 'B'") in messages(tables)
+
+
+def test_missing_title_and_name_are_reported():
+    tables = [{"fields": [pk("ID")]},
+              {"title": "A", "fields": [pk("AID"), {"type": "", "datatype": "INT"}]}]
+    assert messages(tables, "error") == [("error", None, "tabel zonder 'title'"),
+                                         ("error", "A", "veld 2 heeft geen 'name'")]
+
+
+def test_fk_problems():
+    tables = [{"title": "A", "fields": [pk("AID"), {"type": "", "name": "Code", "datatype": "VARCHAR(5)"}]},
+              {"title": "B", "fields": [
+                  pk("BID"),
+                  {"type": "FK", "name": "Leeg", "datatype": "INT"},
+                  fk("Onbekend", "A", "Niets"),
+                  {"type": "FK", "name": "ZonderType", "references": {"table": "A", "field": "AID"}},
+                  fk("Code", "A", "Code", "VARCHAR(10)"),
+                  fk("Alias", "A", "AID", "INTEGER"),
+              ]}]
+    assert messages(tables) == [
+        ("error", "B", "FK 'Leeg' heeft geen volledige 'references'"),
+        ("error", "B", "FK 'Onbekend' verwijst naar onbekend veld 'A.Niets'"),
+        ("error", "B", "FK 'ZonderType' heeft geen 'datatype'"),
+        ("warning", "B", "FK 'Code' verwijst naar 'A.Code' dat geen PK of UNIQUE is"),
+        ("error", "B", "FK 'Code' is VARCHAR(10), maar 'A.Code' is VARCHAR(5)"),
+    ]
+
+
+def test_pk_warnings():
+    tables = [{"title": "Geen", "fields": [{"type": "", "name": "X", "datatype": "INT"}]},
+              {"title": "Twee", "fields": [pk("A"), pk("B")]}]
+    assert messages(tables) == [("warning", "Geen", "geen primaire sleutel"),
+                                ("warning", "Twee", "2 PK-velden; alleen het eerste wordt gebruikt")]
+
+
+def test_check_raises_on_errors_only(capsys):
+    SchemaValidator([{"title": "A", "fields": [{"type": "", "name": "X", "datatype": "INT"}]}]).check()
+    with pytest.raises(SchemaValidationError) as info:
+        SchemaValidator([{"title": "A", "fields": [pk("AID")]}, {"title": "A", "fields": [pk("AID")]}]).check()
+    assert info.value.problems == [{"severity": "error", "table": "A", "message": "dubbele tabelnaam"}]
+    assert "❌ A: dubbele tabelnaam" in capsys.readouterr().out
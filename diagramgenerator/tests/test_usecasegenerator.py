@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from usecasegenerator import DrawioUseCaseDiagramGenerator
+
+
+def brute_force_crossings(edges, actor_pos, use_case_pos):
+    return sum(1 for a1, u1 in edges for a2, u2 in edges
+               if actor_pos[a1] < actor_pos[a2] and use_case_pos[u1] > use_case_pos[u2])
+
+
+def model(n_actors, n_use_cases, pairs, includes=()):
+    use_cases = [{"id": f"UC{u}", "name": f"Use case {u}"} for u in range(n_use_cases)]
+    for source, target in includes:
+        use_cases[source].setdefault("includes", []).append(f"UC{target}")
+    return {
+        "actors": [{"id": f"A{a}", "name": f"Actor {a}"} for a in range(n_actors)],
+        "use_cases": use_cases,
+        "relations": [{"actor_id": f"A{a}", "use_case_id": f"UC{u}"} for a, u in pairs],
+    }
+
+
+def random_pairs(rng, n_actors, n_use_cases, n_edges):
+    return sorted({(rng.randrange(n_actors), rng.randrange(n_use_cases)) for _ in range(n_edges)})
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fenwick_count_matches_brute_force(seed):
+    rng = random.Random(seed)
+    n_actors, n_use_cases = rng.randint(1, 12), rng.randint(1, 15)
+    edges = random_pairs(rng, n_actors, n_use_cases, rng.randint(0, 40))
+    actor_pos = rng.sample(range(n_actors), n_actors)
+    use_case_pos = rng.sample(range(n_use_cases), n_use_cases)
+    assert (DrawioUseCaseDiagramGenerator._count_crossings(edges, actor_pos, use_case_pos, n_use_cases)
+            == brute_force_crossings(edges, actor_pos, use_case_pos))
+
+
+def test_shared_endpoints_do_not_cross():
+    edges = [(0, 0), (0, 1), (1, 1), (1, 2)]
+    assert DrawioUseCaseDiagramGenerator._count_crossings(edges, [0, 1], [0, 1, 2], 3) == 0
+
+
+def test_reversed_matching_is_untangled():
+    generator = DrawioUseCaseDiagramGenerator()
+    data = model(5, 5, [(a, 4 - a) for a in range(5)])
+    actor_order, use_case_order, edges = generator._order(data["actors"], data["use_cases"], data["relations"])
+    assert generator.layout_stats["initial_crossings"] == 10
+    assert generator.layout_stats["crossings"] == 0
+    assert sorted(actor_order) == list(range(5))
+    assert sorted(use_case_order) == list(range(5))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_order_never_adds_crossings(seed):
+    rng = random.Random(seed)
+    n_actors, n_use_cases = rng.randint(2, 10), rng.randint(2, 20)
+    data = model(n_actors, n_use_cases, random_pairs(rng, n_actors, n_use_cases, 30))
+    generator = DrawioUseCaseDiagramGenerator()
+    actor_order, use_case_order, edges = generator._order(data["actors"], data["use_cases"], data["relations"])
+    stats = generator.layout_stats
+    assert stats["crossings"] <= stats["initial_crossings"]
+
+    actor_pos, use_case_pos = [0] * n_actors, [0] * n_use_cases
+    for p, a in enumerate(actor_order):
+        actor_pos[a] = p
+    for p, u in enumerate(use_case_order):
+        use_case_pos[u] = p
+    assert brute_force_crossings(edges, actor_pos, use_case_pos) == stats["crossings"]
+
+
+def test_include_chain_stays_together():
+    data = model(2, 5, [(0, 4), (1, 0)], includes=[(4, 2), (2, 1)])
+    generator = DrawioUseCaseDiagramGenerator()
+    _, use_case_order, _ = generator._order(data["actors"], data["use_cases"], data["relations"])
+    start = use_case_order.index(4)
+    assert use_case_order[start:start + 3] == [4, 2, 1]
+
+
+def test_unknown_ids_are_ignored():
+    data = model(1, 1, [(0, 0)])
+    data["relations"].append({"actor_id": "A9", "use_case_id": "UC0"})
+    xml = DrawioUseCaseDiagramGenerator().run(data)
+    assert xml.count('edge="1"') == 1
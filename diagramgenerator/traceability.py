@@ -0,0 +1,412 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import time
+
+STORY_FILE = "userstories.json"
+NARRATIVE_FILE = "naratives.json"
+USE_CASE_FILE = "usecasediagram.json"
+INPUT_FILES = (STORY_FILE, NARRATIVE_FILE, USE_CASE_FILE)
+INDEX_VERSION = 1
+# Wat in de index op schijf staat; de records zelf zitten per bestand als pickle-blob in `files`
+# en worden pas gedecodeerd als een query, koppeling of generatie ze nodig heeft.
+STATE = ("files", "by_actor", "by_keyword", "by_use_case", "use_cases", "links", "dirty")
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+ACTOR_SEPARATORS = re.compile(r"\s*(?:/|,|&|\ben\b|\bof\b)\s*", re.IGNORECASE)
+STOPWORDS = {"de", "het", "een", "en", "van", "op", "in", "te", "ik", "mijn", "zijn", "haar", "kan", "dat",
+             "die", "met", "voor", "naar", "als", "er", "is", "om", "bij", "aan", "uit", "of", "wil", "moet",
+             "the", "a", "an", "to", "of", "and", "as", "so", "that", "my", "i", "want", "can"}
+
+
+def tokens(*texts):
+    """Kleine letters, zonder stopwoorden; de volgorde van eerste voorkomen blijft behouden."""
+    seen = {}
+    for text in texts:
+        for token in TOKEN_PATTERN.findall(str(text or "").lower()):
+            if token not in STOPWORDS and not token.isdigit():
+                seen.setdefault(token, None)
+    return list(seen)
+
+
+def split_actors(text):
+    """'Student / Docent' -> ['student', 'docent']."""
+    return [part.strip().lower() for part in ACTOR_SEPARATORS.split(text or "") if part.strip()]
+
+
+def _hash_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _read_records(path):
+    """Leest stories of narratives; een lijst of een object met één lijst ('narratives', 'user_stories', ...)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠ '{path}' kon niet gelezen worden en wordt overgeslagen: {e}")
+        return []
+    if isinstance(data, dict):
+        data = next((value for value in data.values() if isinstance(value, list)), [])
+    return [record for record in data if isinstance(record, dict) and "id" in record]
+
+
+def _story_record(project, story):
+    user_story = story.get("user_story", {})
+    return {
+        "project": project, "kind": "story", "id": story["id"], "title": story.get("title", ""),
+        "actors": split_actors(user_story.get("as_a", "")),
+        # Naam-tokens bepalen de koppeling met use cases; keywords zijn de volledige tekst
+        "name_tokens": tokens(story.get("title"), user_story.get("i_want")),
+        "keywords": tokens(story.get("title"), *user_story.values(), story.get("description"),
+                           *story.get("acceptance_criteria", [])),
+        "use_cases": list(story.get("use_cases", [])) + ([story["use_case_id"]] if "use_case_id" in story else []),
+        "source": story,
+    }
+
+
+def _narrative_record(project, narrative):
+    return {
+        "project": project, "kind": "narrative", "id": narrative["id"], "title": narrative.get("title", ""),
+        "actors": split_actors(narrative.get("actor", "")),
+        "name_tokens": tokens(narrative.get("title")),
+        "keywords": tokens(narrative.get("title"), narrative.get("goal"), narrative.get("story"),
+                           narrative.get("result")),
+        "use_cases": list(narrative.get("use_cases", []))
+                     + ([narrative["use_case_id"]] if "use_case_id" in narrative else []),
+        "source": narrative,
+    }
+
+
+class TraceabilityIndex:
+    """
+    Traceerbaarheid tussen user stories, narratives en use cases over alle projecten onder
+    `data_root` (elke map met userstories.json, naratives.json en/of usecasediagram.json).
+
+    De inverted indexes (actor, use-case ID en keyword -> stories/narratives) worden één keer
+    opgebouwd en als pickle bewaard. Bij een volgende run worden alleen gewijzigde bestanden
+    (mtime/grootte, daarna sha256) opnieuw gelezen, en alleen de projecten waarin iets
+    veranderde worden opnieuw gekoppeld en als use-case model weggeschreven.
+    """
+
+    def __init__(self, data_root="data", index_file=None, output_name="usecasediagram_traced.json"):
+        self.data_root = data_root
+        self.index_file = index_file or os.path.join(data_root, "traceability.idx")
+        self.output_name = output_name
+        self.stats = {}
+        self._reset()
+
+    def _reset(self):
+        self.files = {}        # pad -> mtime_ns, size, sha256, project, naam, record-sleutels, blob
+        self.by_actor = {}     # actor -> {sleutels}
+        self.by_keyword = {}   # keyword -> {sleutels}
+        self.by_use_case = {}  # use-case ID -> {sleutels}
+        self.use_cases = {}    # project -> use-case model uit usecasediagram.json
+        self.links = {}        # project -> {use-case ID: [sleutels]}
+        self.dirty = set()     # projecten waarvan het gegenereerde model verouderd is
+        self.modified = False
+        self._decoded = {}     # pad -> {sleutel: record}, alleen in het geheugen
+
+    def load(self):
+        try:
+            with open(self.index_file, "rb") as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+        if state.get("version") != INDEX_VERSION or state.get("data_root") != os.path.abspath(self.data_root):
+            return False
+        for name in STATE:
+            setattr(self, name, state[name])
+        return True
+
+    def save(self):
+        state = {name: getattr(self, name) for name in STATE}
+        state.update(version=INDEX_VERSION, data_root=os.path.abspath(self.data_root))
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, self.index_file)
+        self.modified = False
+
+    def _input_files(self):
+        for root, dirs, files in os.walk(self.data_root):
+            dirs.sort()
+            for name in INPUT_FILES:
+                if name in files:
+                    yield os.path.join(root, name), os.path.relpath(root, self.data_root).replace(os.sep, "/"), name
+
+    # --- indexeren ---
+
+    def _file_records(self, path):
+        records = self._decoded.get(path)
+        if records is None:
+            blob = self.files[path].get("blob")
+            records = self._decoded[path] = pickle.loads(blob) if blob else {}
+        return records
+
+    def record(self, key):
+        """Het record achter een sleutel (project, soort, id)."""
+        project, kind, _ = key
+        folder = self.data_root if project == "." else os.path.join(self.data_root, *project.split("/"))
+        return self._file_records(os.path.join(folder, STORY_FILE if kind == "story" else NARRATIVE_FILE))[key]
+
+    def _add(self, key, record):
+        for actor in record["actors"]:
+            self.by_actor.setdefault(actor, set()).add(key)
+        for keyword in record["keywords"]:
+            self.by_keyword.setdefault(keyword, set()).add(key)
+
+    def _remove(self, key, record):
+        for index, terms in ((self.by_actor, record["actors"]), (self.by_keyword, record["keywords"])):
+            for term in terms:
+                postings = index.get(term)
+                if postings is not None:
+                    postings.discard(key)
+                    if not postings:
+                        del index[term]
+
+    def _forget_file(self, path):
+        for key, record in self._file_records(path).items():
+            self._remove(key, record)
+        self._decoded.pop(path, None)
+        entry = self.files.pop(path)
+        if entry["name"] == USE_CASE_FILE:
+            self.use_cases.pop(entry["project"], None)
+        self.dirty.add(entry["project"])
+
+    def _read_file(self, path, project, name):
+        """Leest één bestand, indexeert de records en geeft de sleutels plus de blob voor de index."""
+        if name == USE_CASE_FILE:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.use_cases[project] = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ '{path}' kon niet gelezen worden en wordt overgeslagen: {e}")
+            return [], None
+        make_record = _story_record if name == STORY_FILE else _narrative_record
+        records = {}
+        for source in _read_records(path):
+            record = make_record(project, source)
+            records[(project, record["kind"], str(record["id"]))] = record  # dubbel ID: de laatste telt
+        for key, record in records.items():
+            self._add(key, record)
+        self._decoded[path] = records
+        return list(records), pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def scan(self, save=True):
+        """Leest alleen nieuwe of gewijzigde bestanden en werkt de indexes daarvoor bij."""
+        if not self.files:
+            self.load()
+        seen, parsed, changed = set(), 0, set()
+        for path, project, name in self._input_files():
+            seen.add(path)
+            stat = os.stat(path)
+            entry = self.files.get(path)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            digest = _hash_file(path)
+            if entry and entry["sha256"] == digest:
+                entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                self.modified = True
+                continue
+            if entry:
+                self._forget_file(path)
+            changed.add(project)
+            keys, blob = self._read_file(path, project, name)
+            self.files[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest,
+                                "project": project, "name": name, "keys": keys, "blob": blob}
+            self.dirty.add(project)
+            parsed += 1
+        for path in [path for path in self.files if path not in seen]:
+            changed.add(self.files[path]["project"])
+            self._forget_file(path)
+            parsed += 1
+
+        keys_by_project = self._keys_by_project()
+        for project in changed:
+            self._link(project, keys_by_project.get(project, []))
+        self.stats = {"files": len(self.files), "parsed": parsed,
+                      "records": sum(len(keys) for keys in keys_by_project.values()),
+                      "projects": len(keys_by_project)}
+        self.modified = self.modified or bool(parsed)
+        if save and self.modified:
+            self.save()
+        return self.stats
+
+    # --- koppelen aan use cases ---
+
+    def _keys_by_project(self):
+        keys_by_project = {}
+        for entry in self.files.values():
+            keys_by_project.setdefault(entry["project"], []).extend(entry["keys"])
+        return keys_by_project
+
+    def _link(self, project, keys):
+        """
+        Koppelt de stories en narratives van één project aan zijn use cases: expliciet via
+        'use_cases'/'use_case_id', anders als alle naam-tokens van de use case in de titel
+        (of 'i_want') van de story of narrative voorkomen.
+        """
+        for use_case_id, old_keys in self.links.pop(project, {}).items():
+            postings = self.by_use_case.get(use_case_id)
+            if postings is not None:
+                postings.difference_update(old_keys)
+                if not postings:
+                    del self.by_use_case[use_case_id]
+
+        if not keys:
+            return
+        name_index = {}
+        for key in keys:
+            for token in self.record(key)["name_tokens"]:
+                name_index.setdefault(token, set()).add(key)
+
+        links = {}
+        for use_case in self.use_cases.get(project, {}).get("use_cases", []):
+            name_tokens = tokens(use_case.get("name"))
+            if not name_tokens:
+                continue
+            matches = set.intersection(*(name_index.get(token, set()) for token in name_tokens))
+            if matches:
+                links[use_case["id"]] = set(matches)
+        for key in keys:
+            for use_case_id in self.record(key)["use_cases"]:
+                links.setdefault(use_case_id, set()).add(key)
+
+        self.links[project] = {use_case_id: sorted(linked) for use_case_id, linked in links.items()}
+        for use_case_id, linked in self.links[project].items():
+            self.by_use_case.setdefault(use_case_id, set()).update(linked)
+
+    # --- queries ---
+
+    def _result(self, keys, project=None):
+        keys = sorted(key for key in keys if project is None or key[0] == project)
+        return [self.record(key) for key in keys]
+
+    def for_actor(self, actor, project=None):
+        return self._result(self.by_actor.get(actor.strip().lower(), ()), project)
+
+    def for_use_case(self, use_case_id, project=None):
+        return self._result(self.by_use_case.get(use_case_id, ()), project)
+
+    def search(self, *keywords, project=None):
+        """Stories en narratives die alle keywords bevatten."""
+        terms = tokens(*keywords)
+        if not terms:
+            return []
+        postings = sorted((self.by_keyword.get(term, set()) for term in terms), key=len)
+        return self._result(set.intersection(*postings), project)
+
+    def trace(self, use_case_id, project=None):
+        """Alle stories en narratives achter een use case, gescheiden per soort."""
+        records = self.for_use_case(use_case_id, project)
+        return {"stories": [r for r in records if r["kind"] == "story"],
+                "narratives": [r for r in records if r["kind"] == "narrative"]}
+
+    # --- use-case model genereren ---
+
+    def build_usecase_model(self, project, keys=None):
+        """
+        Bouwt de invoer voor DrawioUseCaseDiagramGenerator uit de gekoppelde stories en narratives.
+        Bestaande use cases en actoren uit usecasediagram.json houden hun ID; een narrative zonder
+        use case wordt een nieuwe use case, en een story die daar ook niet bij past ook.
+        """
+        base = self.use_cases.get(project, {})
+        actors = [dict(actor) for actor in base.get("actors", [])]
+        use_cases = [dict(use_case) for use_case in base.get("use_cases", [])]
+        links = {use_case_id: list(keys) for use_case_id, keys in self.links.get(project, {}).items()}
+        actor_ids = {actor["name"].strip().lower(): actor["id"] for actor in actors}
+
+        def next_id(prefix, existing):
+            numbers = [int(value[len(prefix):]) for value in existing
+                       if value.startswith(prefix) and value[len(prefix):].isdigit()]
+            return f"{prefix}{max(numbers, default=0) + 1}"
+
+        if keys is None:
+            keys = self._keys_by_project().get(project, [])
+        linked = {key for linked_keys in links.values() for key in linked_keys}
+        name_tokens = {use_case["id"]: set(tokens(use_case.get("name"))) for use_case in use_cases}
+        # Narratives eerst: hun titels zijn doorgaans de use-case namen waar stories bij horen
+        for kind in ("narrative", "story"):
+            name_index = {}
+            for use_case_id, use_case_tokens in name_tokens.items():
+                for token in use_case_tokens:
+                    name_index.setdefault(token, set()).add(use_case_id)
+            for key in keys:
+                record = self.record(key)
+                if record["kind"] != kind or key in linked:
+                    continue
+                record_tokens = set(record["name_tokens"])
+                candidates = set().union(*(name_index.get(token, set()) for token in record_tokens))
+                matches = sorted(use_case_id for use_case_id in candidates
+                                 if name_tokens[use_case_id] <= record_tokens)
+                if not matches:
+                    use_case_id = next_id("UC", name_tokens)
+                    use_cases.append({"id": use_case_id, "name": record["title"] or record["id"]})
+                    name_tokens[use_case_id] = set(tokens(use_cases[-1]["name"]))
+                    for token in name_tokens[use_case_id]:
+                        name_index.setdefault(token, set()).add(use_case_id)
+                    matches = [use_case_id]
+                for use_case_id in matches:
+                    links.setdefault(use_case_id, []).append(key)
+                linked.add(key)
+
+        relations, seen = [], set()
+        for relation in base.get("relations", []):
+            pair = (relation.get("actor_id"), relation.get("use_case_id"))
+            if pair not in seen:
+                seen.add(pair)
+                relations.append(dict(relation))
+        for use_case in use_cases:
+            for key in links.get(use_case["id"], []):
+                for actor in self.record(key)["actors"]:
+                    if actor not in actor_ids:
+                        actor_ids[actor] = next_id("A", actor_ids.values())
+                        actors.append({"id": actor_ids[actor], "name": actor[:1].upper() + actor[1:]})
+                    pair = (actor_ids[actor], use_case["id"])
+                    if pair not in seen:
+                        seen.add(pair)
+                        relations.append({"actor_id": pair[0], "use_case_id": pair[1]})
+
+        system = base.get("system") or (os.path.basename(project) if project != "." else
+                                        os.path.basename(os.path.abspath(self.data_root)))
+        return {"system": system, "actors": actors, "use_cases": use_cases, "relations": relations}
+
+    def generate(self, force=False):
+        """Schrijft het use-case model alleen voor projecten die sinds de vorige run veranderd zijn."""
+        keys_by_project = self._keys_by_project()
+        written = []
+        for project in sorted(keys_by_project):
+            output_file = os.path.join(self.data_root, project, self.output_name)
+            if not (force or project in self.dirty or not os.path.exists(output_file)):
+                continue
+            model = self.build_usecase_model(project, keys_by_project[project])
+            with open(output_file, "w", encoding="utf-8") as f:
+                json.dump(model, f, indent=2, ensure_ascii=False)
+            written.append(output_file)
+        if written or self.dirty or self.modified:
+            self.dirty.clear()
+            self.save()
+        return written
+
+    def run(self):
+        start = time.perf_counter()
+        self.scan(save=False)
+        written = self.generate()
+        elapsed = time.perf_counter() - start
+        print(f"✅ {self.stats['records']} stories/narratives uit {self.stats['projects']} project(en) geïndexeerd "
+              f"({self.stats['parsed']} bestand(en) opnieuw gelezen), {len(written)} use-case model(len) "
+              f"bijgewerkt in {elapsed:.2f}s.")
+        return written
+
+
+if __name__ == "__main__":
+    index = TraceabilityIndex(data_root="data")
+    index.run()
+    for use_case_id in ("UC1", "UC2", "UC3"):
+        trace = index.trace(use_case_id)
+        print(f"{use_case_id}: stories {[r['id'] for r in trace['stories']]}, "
+              f"narratives {[r['id'] for r in trace['narratives']]}")
@@ -0,0 +1,103 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from schemacache import load_schema
+from usecasegenerator import DrawioUseCaseDiagramGenerator
+
+
+def _render_to_file(job):
+    """Worker: rendert één model en schrijft het direct naar een eigen .drawio-bestand."""
+    model_file, output_file = job
+    generator = DrawioUseCaseDiagramGenerator()
+    xml = generator.run(load_schema(model_file))
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(xml)
+    return model_file, output_file, len(xml.encode("utf-8"))
+
+
+def _render_page(job):
+    """Worker: rendert één model als <diagram>-pagina; de hoofdprocess schrijft die weg."""
+    model_file, page_id = job
+    generator = DrawioUseCaseDiagramGenerator()
+    return model_file, generator.build_diagram(load_schema(model_file), diagram_id=page_id)
+
+
+class UseCaseBatchGenerator:
+    """
+    Genereert use-case diagrammen voor veel modelbestanden tegelijk op een process pool.
+
+    - output_dir: elk model naar een eigen <naam>.drawio in deze map
+    - single_file: alle modellen als pagina's in één .drawio-bestand
+    Resultaten worden weggeschreven zodra ze binnenkomen; er wordt nooit een volledige
+    batch in het geheugen opgebouwd.
+    """
+
+    def __init__(self, model_files, output_dir="usecases", single_file=None, max_workers=None):
+        self.model_files = model_files
+        self.output_dir = output_dir
+        self.single_file = single_file
+        self.max_workers = max_workers
+        self.stats = {}
+
+    @classmethod
+    def from_pattern(cls, pattern, **kwargs):
+        return cls(sorted(glob.glob(pattern, recursive=True)), **kwargs)
+
+    def _output_names(self):
+        """
+        <pad t.o.v. de gemeenschappelijke map van alle invoer>.drawio, met '_' voor mappen:
+        projA/data/usecasediagram.json -> projA_data_usecasediagram.drawio. Twee modellen die op
+        dezelfde naam uitkomen zouden elkaar overschrijven; dat wordt vooraf geweigerd.
+        """
+        paths = [os.path.abspath(model_file) for model_file in self.model_files]
+        root = os.path.commonpath([os.path.dirname(path) for path in paths]) if paths else ""
+        names, seen = [], {}
+        for model_file, path in zip(self.model_files, paths):
+            name = os.path.splitext(os.path.relpath(path, root))[0].replace(os.sep, "_") + ".drawio"
+            if name in seen:
+                raise ValueError(f"'{seen[name]}' en '{model_file}' zouden allebei naar '{name}' geschreven worden.")
+            seen[name] = model_file
+            names.append(os.path.join(self.output_dir, name))
+        return names
+
+    def run(self):
+        start = time.perf_counter()
+        total_bytes = 0
+        chunksize = max(1, len(self.model_files) // ((self.max_workers or os.cpu_count() or 1) * 4))
+        # Namen controleren voordat er iets naar de pool gaat
+        output_files = None if self.single_file else self._output_names()
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            if self.single_file:
+                generator = DrawioUseCaseDiagramGenerator()
+                jobs = [(model_file, f"diagram{i + 1}") for i, model_file in enumerate(self.model_files)]
+                with open(self.single_file, "w", encoding="utf-8") as f:
+                    f.write(generator.file_header())
+                    for _, page in pool.map(_render_page, jobs, chunksize=chunksize):
+                        f.write(page)
+                        total_bytes += len(page.encode("utf-8"))
+                    f.write(generator.file_footer())
+            else:
+                os.makedirs(self.output_dir, exist_ok=True)
+                jobs = list(zip(self.model_files, output_files))
+                for _, _, size in pool.map(_render_to_file, jobs, chunksize=chunksize):
+                    total_bytes += size
+
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            "models": len(self.model_files),
+            "seconds": elapsed,
+            "models_per_second": len(self.model_files) / elapsed if elapsed else 0.0,
+            "megabytes_per_second": total_bytes / 1e6 / elapsed if elapsed else 0.0,
+        }
+        target = self.single_file or self.output_dir
+        print(f"✅ {self.stats['models']} use-case diagrammen gegenereerd in '{target}' in {elapsed:.2f}s "
+              f"({self.stats['models_per_second']:.0f} modellen/s, {self.stats['megabytes_per_second']:.1f} MB/s)")
+        return self.stats
+
+
+if __name__ == "__main__":
+    batch = UseCaseBatchGenerator.from_pattern("data/**/usecasediagram.json", output_dir="usecases")
+    batch.run()
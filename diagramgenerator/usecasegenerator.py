@@ -15,7 +15,11 @@ class DrawioUseCaseDiagramGenerator:
         self.padding = 80
         self.actor_x = 50
         self.use_case_x_start = self.actor_x + self.actor_width + self.padding * 2
-        self.container_style = "swimlane;fontStyle=0;childLayout=stackLayout;horizontal=1;startSize=30;horizontalStack=0;resizeParent=1;resizeParentCheck=0;collapsible=0;marginBottom=0;html=1;"
+        self.use_case_y_offset = 30
+        self.layout_sweeps = 8
+        self.layout_stats = {}
+        # Geen stackLayout: die zou de use cases bij de eerste wijziging in één kolom zetten
+        self.container_style = "swimlane;fontStyle=0;horizontal=1;startSize=30;container=1;collapsible=0;html=1;"
         self.actor_style = "umlActor;verticalLabelPosition=bottom;html=1;verticalAlign=top;strokeColor=#000000;fillColor=#FFFFFF;rounded=0;"
         self.use_case_style = "html=1;ellipse;whiteSpace=wrap;fillColor=#dae8fc;strokeColor=#6c8ebf;fontColor=#000000;verticalAlign=middle;align=center;"
         self.relationship_styles = {
@@ -33,8 +37,167 @@ class DrawioUseCaseDiagramGenerator:
     def _create_edge(self, id_: int, source: str, target: str, label: str, style: str) -> str:
         return f'\n<mxCell id="{id_}" value="{label}" style="{style}" edge="1" parent="1" source="{source}" target="{target}">\n<mxGeometry relative="1" as="geometry" />\n</mxCell>'
 
-    def run(self, json_data: Dict[str, Any]) -> str:
-        """Hoofdfunctie om de volledige Draw.io XML te genereren."""
+    def _use_case_groups(self, use_cases: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Groepeert use cases die via include/extend verbonden zijn (union-find). Binnen een groep
+        komt een use case vóór wat hij include of extend, zodat een keten aaneengesloten blijft.
+        """
+        index = {uc['id']: i for i, uc in enumerate(use_cases)}
+        cluster = list(range(len(use_cases)))
+        targets: List[List[int]] = [[] for _ in use_cases]
+        has_source = [False] * len(use_cases)
+
+        def find(i: int) -> int:
+            while cluster[i] != i:
+                cluster[i] = cluster[cluster[i]]
+                i = cluster[i]
+            return i
+
+        for i, uc in enumerate(use_cases):
+            for target_id in uc.get('includes', []) + uc.get('extends', []):
+                target = index.get(target_id)
+                if target is not None and target != i:
+                    targets[i].append(target)
+                    has_source[target] = True
+                    cluster[find(i)] = find(target)
+
+        groups: Dict[int, List[int]] = {}
+        visited = [False] * len(use_cases)
+        # DFS vanaf de use cases zonder inkomende include/extend; de rest vangt cycli op
+        for start in [i for i in range(len(use_cases)) if not has_source[i]] + list(range(len(use_cases))):
+            if visited[start]:
+                continue
+            group = groups.setdefault(find(start), [])
+            stack = [start]
+            visited[start] = True
+            while stack:
+                i = stack.pop()
+                group.append(i)
+                for target in reversed(targets[i]):
+                    if not visited[target]:
+                        visited[target] = True
+                        stack.append(target)
+        return sorted(groups.values(), key=min)
+
+    @staticmethod
+    def _count_crossings(edges: List[Tuple[int, int]], actor_pos: List[int], use_case_pos: List[int],
+                         size: int) -> int:
+        """Kruisingen tussen actor-lijnen als inversies na sortering (Fenwick tree, O(E log n))."""
+        ordered = sorted((actor_pos[a], use_case_pos[u]) for a, u in edges)
+        tree = [0] * (size + 1)
+        crossings = 0
+        for seen, (_, u) in enumerate(ordered):
+            # Eerdere lijnen die op een latere use case uitkomen kruisen deze lijn
+            i, not_after = u + 1, 0
+            while i > 0:
+                not_after += tree[i]
+                i -= i & -i
+            crossings += seen - not_after
+            i = u + 1
+            while i <= size:
+                tree[i] += 1
+                i += i & -i
+        return crossings
+
+    def _order(self, actors: List[Dict[str, Any]], use_cases: List[Dict[str, Any]],
+               relations: List[Dict[str, Any]]) -> Tuple[List[int], List[int], List[Tuple[int, int]]]:
+        """
+        Ordent actoren en use cases met barycenter-iteraties: afwisselend worden de use-case-groepen
+        gesorteerd op de gemiddelde positie van hun actoren en de actoren op de gemiddelde positie
+        van hun use cases. De volgorde met de minste kruisingen wordt bewaard.
+        """
+        actor_index = {a['id']: i for i, a in enumerate(actors)}
+        use_case_index = {uc['id']: i for i, uc in enumerate(use_cases)}
+        edges = sorted({(actor_index[rel.get("actor_id")], use_case_index[rel.get("use_case_id")])
+                        for rel in relations
+                        if rel.get("actor_id") in actor_index and rel.get("use_case_id") in use_case_index})
+        actors_of: List[List[int]] = [[] for _ in use_cases]
+        use_cases_of: List[List[int]] = [[] for _ in actors]
+        for a, u in edges:
+            actors_of[u].append(a)
+            use_cases_of[a].append(u)
+
+        groups = self._use_case_groups(use_cases)
+        n_actors, n_use_cases = len(actors), len(use_cases)
+        actor_order = list(range(n_actors))
+        group_order = list(range(len(groups)))
+
+        def positions(order: List[int], flatten: bool) -> List[int]:
+            pos = [0] * (n_use_cases if flatten else n_actors)
+            items = (i for g in order for i in groups[g]) if flatten else iter(order)
+            for p, i in enumerate(items):
+                pos[i] = p
+            return pos
+
+        actor_pos, use_case_pos = positions(actor_order, False), positions(group_order, True)
+        best_crossings = self._count_crossings(edges, actor_pos, use_case_pos, n_use_cases)
+        best = (actor_order, group_order)
+        initial_crossings, stale = best_crossings, 0
+
+        for _ in range(self.layout_sweeps if edges else 0):
+            # Groepen zonder actoren houden hun relatieve plek
+            group_rank = {g: r for r, g in enumerate(group_order)}
+            group_key = {}
+            for g, members in enumerate(groups):
+                linked = [actor_pos[a] for u in members for a in actors_of[u]]
+                group_key[g] = (sum(linked) / len(linked) if linked
+                                else group_rank[g] * n_actors / len(groups), group_rank[g])
+            group_order = sorted(group_order, key=group_key.__getitem__)
+            use_case_pos = positions(group_order, True)
+
+            actor_key = {}
+            for a in actor_order:
+                linked = [use_case_pos[u] for u in use_cases_of[a]]
+                actor_key[a] = (sum(linked) / len(linked) if linked
+                                else actor_pos[a] * n_use_cases / max(1, n_actors), actor_pos[a])
+            actor_order = sorted(actor_order, key=actor_key.__getitem__)
+            actor_pos = positions(actor_order, False)
+
+            crossings = self._count_crossings(edges, actor_pos, use_case_pos, n_use_cases)
+            if crossings < best_crossings:
+                best_crossings, best, stale = crossings, (actor_order, group_order), 0
+            else:
+                stale += 1
+            if best_crossings == 0 or stale >= 2:
+                break
+
+        self.layout_stats = {"actors": n_actors, "use_cases": n_use_cases, "relations": len(edges),
+                             "groups": len(groups), "initial_crossings": initial_crossings,
+                             "crossings": best_crossings}
+        actor_order, group_order = best
+        return actor_order, [u for g in group_order for u in groups[g]], edges
+
+    def _layout(self, actors: List[Dict[str, Any]], use_cases: List[Dict[str, Any]],
+                relations: List[Dict[str, Any]]) -> Tuple[List[int], List[Tuple[int, int]], int, int]:
+        """
+        Geeft de y per actor, de (x, y) per use case binnen de container en de gridgrootte.
+        De use cases vullen het grid rij voor rij in de gevonden volgorde; elke actor staat ter
+        hoogte van het gemiddelde van zijn use cases, zonder andere actoren te overlappen.
+        """
+        actor_order, use_case_order, edges = self._order(actors, use_cases, relations)
+        cols = max(1, math.ceil(math.sqrt(len(use_cases))))
+        rows = max(1, math.ceil(len(use_cases) / cols))
+        container_y = self.padding
+
+        use_case_pos: List[Tuple[int, int]] = [(0, 0)] * len(use_cases)
+        for k, i in enumerate(use_case_order):
+            row, col = divmod(k, cols)
+            use_case_pos[i] = (20 + col * (self.use_case_width + self.padding),
+                               self.use_case_y_offset + row * (self.use_case_height + self.padding))
+
+        centers: Dict[int, List[int]] = {}
+        for a, u in edges:
+            centers.setdefault(a, []).append(container_y + use_case_pos[u][1] + self.use_case_height // 2)
+        actor_y = [0] * len(actors)
+        next_free = container_y
+        for a in actor_order:
+            wanted = sum(centers[a]) // len(centers[a]) - self.actor_height // 2 if a in centers else next_free
+            actor_y[a] = max(wanted, next_free)
+            next_free = actor_y[a] + self.actor_height + self.padding
+        return actor_y, use_case_pos, cols, rows
+
+    def build_diagram(self, json_data: Dict[str, Any], diagram_id: str = "diagram1") -> str:
+        """Genereert één <diagram>-element; meerdere hiervan kunnen als pagina's in één bestand."""
         actors = json_data.get("actors", [])
         use_cases = json_data.get("use_cases", [])
         relations = json_data.get("relations", [])
@@ -43,9 +206,8 @@ class DrawioUseCaseDiagramGenerator:
         # Start Cell ID counter, 0 and 1 are reserved.
         cell_id = 2
 
-        header = '''<?xml version="1.0" encoding="UTF-8"?>
-<mxfile host="app.diagrams.net" agent="python-script-v3" version="24.0.0" type="device">
-<diagram name="Use-Case Diagram" id="diagram1">
+        header = f'''
+<diagram name="{self._escape(system_name)}" id="{diagram_id}">
 <mxGraphModel dx="1400" dy="900" grid="1" gridSize="10" guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" pageScale="1" pageWidth="1169" pageHeight="827" background="#FFFFFF" math="0" shadow="0">
 <root><mxCell id="0"/><mxCell id="1" parent="0"/>'''
 
@@ -53,13 +215,11 @@ class DrawioUseCaseDiagramGenerator:
         actor_map = {}
         use_case_map = {}
 
-        # Determine total height for container and calculate layout
-        # (calculations remain correct, no need to change)
-        total_use_case_height = len(use_cases) * self.use_case_height + (len(use_cases) - 1) * self.padding + 40
+        # Layout: volgorde van actoren en use cases met minimale kruisingen, grid op ware grootte
+        actor_y, use_case_pos, cols, rows = self._layout(actors, use_cases, relations)
         container_y = self.padding
-        container_w = self.use_case_width * math.ceil(math.sqrt(len(use_cases))) + self.padding * (
-                math.ceil(math.sqrt(len(use_cases))) - 1) + 40
-        container_h = total_use_case_height
+        container_w = cols * (self.use_case_width + self.padding) - self.padding + 40
+        container_h = self.use_case_y_offset + rows * (self.use_case_height + self.padding) - self.padding + 20
 
         # 1. Create container cell and increment ID
         container_id = cell_id
@@ -69,22 +229,15 @@ class DrawioUseCaseDiagramGenerator:
         cell_id += 1
 
         # 2. Create actor cells and increment ID for each
-        actor_y = container_y
-        for actor in actors:
+        for i, actor in enumerate(actors):
             actor_map[actor['id']] = str(cell_id)
-            cells_xml.append(self._create_cell(cell_id, self.actor_x, actor_y, self.actor_width, self.actor_height,
-                                               actor['name'], self.actor_style, 1))
-            actor_y += self.actor_height + self.padding
+            cells_xml.append(self._create_cell(cell_id, self.actor_x, actor_y[i], self.actor_width,
+                                               self.actor_height, actor['name'], self.actor_style, 1))
             cell_id += 1
 
         # 3. Create use case cells inside the container and increment ID for each
-        use_case_y_offset = 30
-        cols = math.ceil(math.sqrt(len(use_cases)))
         for i, use_case in enumerate(use_cases):
-            col = i % cols
-            row = i // cols
-            x = 20 + col * (self.use_case_width + self.padding)
-            y = use_case_y_offset + row * (self.use_case_height + self.padding)
+            x, y = use_case_pos[i]
             use_case_map[use_case['id']] = str(cell_id)
             cells_xml.append(self._create_cell(cell_id, x, y, self.use_case_width, self.use_case_height,
                                                use_case['name'], self.use_case_style, container_id))
@@ -116,58 +269,23 @@ class DrawioUseCaseDiagramGenerator:
                                               "&lt;&lt;extend&gt;&gt;", self.relationship_styles["extends"]))
                         cell_id += 1
 
-        # Footer of the XML
-        footer = '''\n</root></mxGraphModel></diagram></mxfile>'''
+        footer = '''\n</root></mxGraphModel></diagram>'''
         return header + "".join(cells_xml) + footer
 
+    def file_header(self) -> str:
+        return '''<?xml version="1.0" encoding="UTF-8"?>
+<mxfile host="app.diagrams.net" agent="python-script-v3" version="24.0.0" type="device">'''
+
+    def file_footer(self) -> str:
+        return '''\n</mxfile>'''
+
+    def run(self, json_data: Dict[str, Any]) -> str:
+        """Hoofdfunctie om de volledige Draw.io XML te genereren."""
+        return self.file_header() + self.build_diagram(json_data) + self.file_footer()
+
 if __name__ == "__main__":
-    json_data = {
-        "system": "Schoolportaal",
-        "actors": [
-            {
-                "id": "A1",
-                "name": "Student"
-            },
-            {
-                "id": "A2",
-                "name": "Docent"
-            }
-        ],
-        "use_cases": [
-            {
-                "id": "UC1",
-                "name": "Inloggen"
-            },
-            {
-                "id": "UC2",
-                "name": "Cijfers bekijken",
-                "includes": ["UC1"]
-            },
-            {
-                "id": "UC3",
-                "name": "Cijfers invoeren",
-                "includes": ["UC1"]
-            }
-        ],
-        "relations": [
-            {
-                "actor_id": "A1",
-                "use_case_id": "UC1"
-            },
-            {
-                "actor_id": "A1",
-                "use_case_id": "UC2"
-            },
-            {
-                "actor_id": "A2",
-                "use_case_id": "UC1"
-            },
-            {
-                "actor_id": "A2",
-                "use_case_id": "UC3"
-            }
-        ]
-    }
+    with open("data/usecasediagram.json", "r", encoding="utf-8") as f:
+        json_data = json.load(f)
 
     generator = DrawioUseCaseDiagramGenerator()
     drawio_xml = generator.run(json_data)